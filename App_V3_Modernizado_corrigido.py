@@ -1,92 +1,173 @@
 import tkinter as tk
 from tkinter import ttk, messagebox, filedialog
-import sqlite3
+import base64
+import multiprocessing
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from datetime import datetime, timedelta
 import pandas as pd
-import matplotlib.pyplot as plt
 import matplotlib.dates as mdates
-from contextlib import closing
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+from analise import (STATUS_ESPERA, agregados_barras, dia_de, dias_para_datas, formatar_duracao, idades_abertas,
+                     indicadores_tratados, percentis_por_status, resumo_para_arrays)
+from autocompletar import IndicePrefixos, carregar_usos
+from banco_dados import SUMMARY_MARK, DatabaseManager
+from compressao import abrir_arquivo, eh_csv
+from graficos import CacheImagens, indice_barra, renderizar_analise, renderizar_barras, renderizar_calendario
+from importacao import criar_executor, gravar_resultado, processar_arquivo
+from instantaneo import caminho_instantaneo, carregar_instantaneo, contar_distintos_mes, ler_painel, salvar_instantaneo
+from monitoramento import memoria_processo
+from relatorio import FORMATOS_RELATORIO, gerar_relatorio_processo, mes_anterior
 # A linha abaixo para Axes3D não é mais estritamente necessária para gráficos 2D,
 # mas mantê-la não causa problemas se não for usada.
 # from mpl_toolkits.mplot3d import Axes3D
 
-class DatabaseManager:
-    def __init__(self, db_name='tickets.db'):
-        self.db_name = db_name
-        self._create_table()
-
-    def _create_table(self):
-        query = (
-            "CREATE TABLE IF NOT EXISTS registros ("
-            "id INTEGER PRIMARY KEY AUTOINCREMENT, "
-            "data TEXT NOT NULL, "
-            "numero_ticket TEXT NOT NULL, "
-            "descricao TEXT NOT NULL, "
-            "acao_realizada TEXT, "
-            "status TEXT)"
-        )
-        self._execute_query(query)
-
-    def conectar(self):
-        return sqlite3.connect(self.db_name)
-
-    def _execute_query(self, query, params=(), fetch=None):
-        try:
-            with self.conectar() as conn:
-                with closing(conn.cursor()) as cursor:
-                    cursor.execute(query, params)
-                    conn.commit()
-                    if fetch == 'one':
-                        return cursor.fetchone()
-                    if fetch == 'all':
-                        return cursor.fetchall()
-        except sqlite3.Error as e:
-            messagebox.showerror("Erro de Banco de Dados", f"Ocorreu um erro: {e}")
-            return None
-
-    def add_record(self, data, numero, descricao, acao, status):
-        query = "INSERT INTO registros (data, numero_ticket, descricao, acao_realizada, status) VALUES (?, ?, ?, ?, ?)"
-        self._execute_query(query, (data, numero, descricao, acao, status))
-
-    def update_record(self, record_id, data, numero, descricao, acao, status):
-        query = "UPDATE registros SET data=?, numero_ticket=?, descricao=?, acao_realizada=?, status=? WHERE id=?"
-        self._execute_query(query, (data, numero, descricao, acao, status, record_id))
-
-    def delete_record(self, record_id):
-        query = "DELETE FROM registros WHERE id=?"
-        self._execute_query(query, (record_id,))
-
-    def fetch_all_records(self):
-        # Consulta SQL que ordena a data convertendo de 'DD/MM/AAAA' para 'AAAA-MM-DD' para ordenação correta.
-        query = "SELECT id, data, numero_ticket, descricao, acao_realizada, status FROM registros ORDER BY SUBSTR(data, 7, 4) || '-' || SUBSTR(data, 4, 2) || '-' || SUBSTR(data, 1, 2) DESC"
-        return self._execute_query(query, fetch='all')
-
-    def search_by_number(self, numero):
-        query = "SELECT * FROM registros WHERE numero_ticket LIKE ? ORDER BY SUBSTR(data, 7, 4) || '-' || SUBSTR(data, 4, 2) || '-' || SUBSTR(data, 1, 2) DESC"
-        return self._execute_query(query, (f'%{numero}%',), fetch='all')
-
-    def fetch_record_by_ticket_number(self, numero_ticket):
-        """Busca um registro pelo número do ticket exato."""
-        query = "SELECT * FROM registros WHERE numero_ticket = ?"
-        return self._execute_query(query, (numero_ticket,), fetch='one')
-
-
 class TicketApp:
     def __init__(self, root_window):
         self.root = root_window
         self.root.title("Gestão de Tickets de Suporte")
-        self.root.state("zoomed")  # Tela cheia
+        self._maximize_window(self.root)  # Tela cheia
         self.db = DatabaseManager('tickets.db')
 
         # Dicionário para armazenar as referências dos labels dos balões de estatísticas
         self.stats_labels = {}
 
+        # Gráfico: renderizado fora da thread da interface; agregados em cache por versão dos dados
+        # e imagens em cache (memória e disco) por (período, versão dos dados, tamanho)
+        self.chart_window = None
+        self.chart_label = None
+        self._chart_image = None
+        self._chart_shown = None  # (chave, rótulos das barras) da imagem exibida, para localizar os cliques
+        self._chart_resize_job = None
+        self._chart_executor = None
+        self._chart_pending = {}
+        self._chart_failed = set()  # Chaves cuja renderização antecipada falhou (não são tentadas de novo)
+        self._chart_cache = CacheImagens(os.path.join(os.path.dirname(os.path.abspath(self.db.db_name)), "cache_graficos"))
+        self._chart_aggregates = None
+        self._chart_aggregates_version = None
+
+        # Instantâneo do painel (balões, primeira página e agregados) para desenhar a janela sem esperar o banco
+        self._snapshot_path = caminho_instantaneo(self.db.db_name)
+        self._snapshot_version = None
+        # Preenchimento da tabela em partes; cada carga completa incrementa a geração e cancela a anterior
+        self._table_fill_job = None
+        self._table_generation = 0
+        # Contagem de tickets distintos do mês em segundo plano; só a mais recente atualiza o balão
+        self._distinct_generation = 0
+        # Sugestões de Descrição e Ação (autocompletar.py): índices montados em segundo plano a partir do banco
+        # e atualizados a cada inclusão; até a montagem terminar os campos funcionam sem sugestões
+        self.suggestions = {"descricao": IndicePrefixos(), "acao_realizada": IndicePrefixos()}
+
         # Configurações de estilo para os balões de estatísticas
         self._configure_styles()
 
         self._create_widgets()
-        self._load_table() # Carrega a tabela e as estatísticas iniciais
+
+        # Diagnóstico (Ctrl+Shift+D, sem botão): o atraso do laço de eventos é amostrado o tempo todo
+        # pelo desvio entre o horário previsto e o real de um after() periódico (último minuto)
+        self.diagnostics_window = None
+        self._lag_interval_ms = 100
+        self._lag_samples = deque(maxlen=600)
+        self.root.bind_all("<Control-Shift-D>", lambda event: self._open_diagnostics_window())
+        self.root.after(self._lag_interval_ms, self._sample_event_loop_lag,
+                        time.perf_counter() + self._lag_interval_ms / 1000)
+
+        # Carga inicial: desenha a partir do instantâneo e lê a tabela e as estatísticas em segundo plano
+        self._paint_snapshot()
+        self.root.after_idle(self._start_reconcile)
+        self.root.after_idle(self._start_suggestions_load)
+
+    @staticmethod
+    def _maximize_window(window):
+        """Maximiza a janela; o estado 'zoomed' só existe no Windows e no macOS, no X11 usa o atributo equivalente."""
+        try:
+            window.state("zoomed")
+        except tk.TclError:
+            window.attributes("-zoomed", True)
+
+    def _paint_snapshot(self):
+        """Preenche os balões, as primeiras linhas da tabela e os agregados dos gráficos a partir do instantâneo."""
+        snapshot = carregar_instantaneo(self._snapshot_path)
+        if snapshot is None:
+            return
+        for key, text in snapshot["cartoes"].items():
+            if key in self.stats_labels:
+                self.stats_labels[key].config(text=text)
+        for row in snapshot["registros"]:
+            self.tree.insert("", tk.END, values=row)
+        self._chart_aggregates = snapshot["agregados"]
+        self._chart_aggregates_version = snapshot["versao"]
+        self._snapshot_version = snapshot["versao"]
+
+    def _start_reconcile(self):
+        """Lê o painel completo em uma thread (apenas banco de dados, sem acesso aos widgets)."""
+        executor = ThreadPoolExecutor(max_workers=1)
+        future = executor.submit(ler_painel, self.db.db_name)
+        executor.shutdown(wait=False)
+        self.root.after(50, self._poll_reconcile, future, self._table_generation)
+
+    def _poll_reconcile(self, future, generation):
+        """Aplica a leitura em segundo plano: estatísticas, tabela (se o usuário ainda não a recarregou) e instantâneo."""
+        if not future.done():
+            self.root.after(50, self._poll_reconcile, future, generation)
+            return
+        try:
+            result = future.result()
+        except Exception as e:
+            messagebox.showerror("Erro de Banco de Dados", f"Ocorreu um erro: {e}")
+            return
+
+        self._update_statistics_cards(result["resumo_diario"], result["distintos_mes"])
+        if generation != self._table_generation:
+            return  # A tabela já foi recarregada (filtro, busca, edição) enquanto a leitura acontecia
+        records = result["registros"]
+        # As linhas exibidas vêm da leitura em segundo plano: o cache de registros passa a segui-las
+        self.db.sync_record_cache(result["versao"])
+        self.db.cache_records(records, summary=True)
+        if self._snapshot_version is not None and result["versao"] == self._snapshot_version:
+            # Instantâneo atualizado: as primeiras linhas já estão na tela, basta acrescentar o restante
+            self._fill_table(records, len(self.tree.get_children()))
+        else:
+            self.tree.delete(*self.tree.get_children())
+            self._fill_table(records)
+        self._save_snapshot(records)
+
+    def _start_suggestions_load(self):
+        """Lê em uma thread os textos já usados em Descrição e Ação, com a frequência e o uso mais recente."""
+        executor = ThreadPoolExecutor(max_workers=1)
+        future = executor.submit(carregar_usos, self.db.db_name)
+        executor.shutdown(wait=False)
+        self.root.after(50, self._poll_suggestions_load, future)
+
+    def _poll_suggestions_load(self, future):
+        """Monta os índices de sugestões quando a leitura termina (sem erro: os campos seguem sem sugestões)."""
+        if not future.done():
+            self.root.after(50, self._poll_suggestions_load, future)
+            return
+        try:
+            usage = future.result()
+        except Exception:
+            return
+        for column, index in self.suggestions.items():
+            index.carregar(usage[column])
+
+    def _fill_table(self, records, start=0, chunk=2000):
+        """Insere os registros na Treeview em partes, devolvendo o controle à interface entre elas."""
+        end = min(start + chunk, len(records))
+        for row in records[start:end]:
+            self.tree.insert("", tk.END, values=row)
+        self._table_fill_job = self.root.after(1, self._fill_table, records, end, chunk) if end < len(records) else None
+
+    def _save_snapshot(self, records):
+        """Grava o instantâneo com os valores exibidos nos balões, a primeira página e os agregados dos gráficos."""
+        aggregates = self._get_chart_aggregates()
+        cards = {key: label.cget("text") for key, label in self.stats_labels.items()}
+        # Os painéis por dia são lidos do resumo diário sob demanda; o instantâneo guarda só as barras
+        bars = {period: aggregates[period] for period in ("Total", "Mês", "Ano")}
+        salvar_instantaneo(self._snapshot_path, self._chart_aggregates_version, cards, records, bars)
+        self._snapshot_version = self._chart_aggregates_version
 
     def _configure_styles(self):
         """Configura os estilos para os balões de estatísticas e balões arredondados."""
@@ -151,6 +232,8 @@ class TicketApp:
         ttk.Label(input_frame, text="Ação Realizada:").grid(row=2, column=0, padx=5, pady=5, sticky="w")
         self.acao_entry = ttk.Entry(input_frame)
         self.acao_entry.grid(row=2, column=1, columnspan=3, padx=5, pady=5, sticky="ew")
+        self._bind_autocomplete(self.descricao_entry, "descricao")
+        self._bind_autocomplete(self.acao_entry, "acao_realizada")
 
         ttk.Label(input_frame, text="Status:").grid(row=2, column=4, padx=5, pady=5, sticky="w")
         status_options = ["Aguardando Parceiro", "Cancelado", "Em Andamento", "Fechado", "Pendente de Resposta", "Resolvido"]
@@ -164,6 +247,7 @@ class TicketApp:
         button_frame.grid(row=1, column=0, padx=10, sticky="ew") # Posicionado abaixo do input_frame
 
         ttk.Button(button_frame, text="Adicionar", command=self._add_record).pack(side="left", padx=5)
+        ttk.Button(button_frame, text="Inclusão em Lote", command=self._open_batch_window).pack(side="left", padx=5)
         ttk.Button(button_frame, text="Editar", command=self._open_edit_window).pack(side="left", padx=5)
         ttk.Button(button_frame, text="Deletar", command=self._open_delete_window).pack(side="left", padx=5)
         ttk.Button(button_frame, text="Buscar por Nº", command=self._search_record).pack(side="left", padx=5)
@@ -171,6 +255,9 @@ class TicketApp:
         ttk.Button(button_frame, text="Resumo e Gráfico", command=self._show_chart_popup).pack(side="left", padx=5)
         ttk.Button(button_frame, text="Importar Dados", command=self._import_data).pack(side="left", padx=5)
         ttk.Button(button_frame, text="Exportar Dados", command=self._export_data).pack(side="left", padx=5)
+        ttk.Button(button_frame, text="Duplicados", command=self._open_duplicates_window).pack(side="left", padx=5)
+        ttk.Button(button_frame, text="Envelhecimento", command=self._open_aging_window).pack(side="left", padx=5)
+        ttk.Button(button_frame, text="Gerar Relatório", command=self._open_report_window).pack(side="left", padx=5)
 
 
         # Frame para a Treeview (tabela de tickets)
@@ -205,6 +292,7 @@ class TicketApp:
         scrollbar.pack(side="right", fill="y") # Usa pack em vez de grid
 
         self.tree.bind("<<TreeviewSelect>>", self._fill_fields_on_select)
+        self._bind_full_text_tooltip(self.tree)
 
         # --- Seção Inferior: Balões de Estatísticas ---
         self.statistics_frame = ttk.Frame(self.root, padding=10)
@@ -234,157 +322,477 @@ class TicketApp:
         _create_balloon(parent_frame, "Tratados Hoje", "treated_today", "green")
         _create_balloon(parent_frame, "Tratados Semana", "treated_week", "orange")
         _create_balloon(parent_frame, "Tratados Mês", "treated_month", "purple")
-
-    def _update_statistics_cards(self):
-        """Atualiza os valores exibidos nos balões de estatísticas."""
-        records = self.db.fetch_all_records()
-        if not records:
-            for key in self.stats_labels:
-                self.stats_labels[key].config(text="0")
-            return
-
-        df = pd.DataFrame(records, columns=["id", "data", "numero", "descricao", "acao", "status"])
-        df['data'] = pd.to_datetime(df['data'], format='%d/%m/%Y', errors='coerce')
-        df.dropna(subset=['data'], inplace=True)
-
-        if df.empty:
+        _create_balloon(parent_frame, "Tickets Distintos Mês", "distinct_month", "blue")
+
+    def _update_statistics_cards(self, daily_counts=None, distinct=None):
+        """
+        Atualiza os valores exibidos nos balões de estatísticas. 'distinct' é o resultado de
+        contar_distintos_mes; se omitido, a contagem é feita em segundo plano e o balão atualizado ao terminar.
+        """
+        # Calculados pelo módulo de análise sobre o resumo diário (dia × status), sem carregar os registros
+        if daily_counts is None:
+            daily_counts = self.db.fetch_daily_status_counts() or []
+        dias, status, totais, nomes = resumo_para_arrays(daily_counts)
+        if not len(dias):
             for key in self.stats_labels:
                 self.stats_labels[key].config(text="0")
             return
 
-        hoje = datetime.now().date()
-        # Calcula o início da semana (segunda-feira)
-        inicio_semana = hoje - timedelta(days=hoje.weekday())
-        inicio_mes = hoje.replace(day=1)
-
-        total_tickets = df.shape[0]
-        df_treated = df[df['status'].isin(['Resolvido', 'Fechado'])]
-
-        treated_today = df_treated[df_treated['data'].dt.date == hoje].shape[0]
-        treated_week = df_treated[df_treated['data'].dt.date >= inicio_semana].shape[0]
-        treated_month = df_treated[df_treated['data'].dt.date >= inicio_mes].shape[0]
+        stats = indicadores_tratados(dias, status, nomes, dia_de(datetime.now().date()), totais)
+        inicio_semana, inicio_mes = dias_para_datas([stats["inicio_semana"], stats["inicio_mes"]]).astype(object)
 
-        self.stats_labels["total_tickets"].config(text=str(total_tickets))
-        self.stats_labels["treated_today"].config(text=str(treated_today))
+        self.stats_labels["total_tickets"].config(text=str(stats["total"]))
+        self.stats_labels["treated_today"].config(text=str(stats["hoje"]))
         # Formata a data para exibir no balão da semana
-        self.stats_labels["treated_week"].config(text=f"{treated_week} ({inicio_semana.strftime('%d/%m')}-{ (inicio_semana + timedelta(days=6)).strftime('%d/%m')})")
-        self.stats_labels["treated_month"].config(text=f"{treated_month} ({inicio_mes.strftime('%m/%Y')})")
-
+        self.stats_labels["treated_week"].config(text=f"{stats['semana']} ({inicio_semana.strftime('%d/%m')}-{ (inicio_semana + timedelta(days=6)).strftime('%d/%m')})")
+        self.stats_labels["treated_month"].config(text=f"{stats['mes']} ({inicio_mes.strftime('%m/%Y')})")
+        if distinct is None:
+            self._start_distinct_count()
+        else:
+            self._show_distinct_count(distinct)
+
+    def _start_distinct_count(self):
+        """
+        Conta os tickets distintos do mês em uma thread: com muitos registros a contagem refaz os esboços
+        dos dias alterados, em uma transação de escrita que não pode prender a interface.
+        """
+        self._distinct_generation += 1
+        executor = ThreadPoolExecutor(max_workers=1)
+        future = executor.submit(contar_distintos_mes, self.db.db_name)
+        executor.shutdown(wait=False)
+        self.root.after(50, self._poll_distinct_count, future, self._distinct_generation)
+
+    def _poll_distinct_count(self, future, generation):
+        """Mostra a contagem quando a thread termina, se nenhuma outra foi iniciada depois."""
+        if not future.done():
+            self.root.after(50, self._poll_distinct_count, future, generation)
+            return
+        if generation != self._distinct_generation:
+            return  # Uma contagem mais recente já foi iniciada
+        try:
+            distinct = future.result()
+        except Exception:
+            return  # O balão mantém o valor anterior
+        self._show_distinct_count(distinct)
+
+    def _show_distinct_count(self, distinct):
+        """Números de ticket distintos no mês: exato em intervalos pequenos, estimado (≈) pelos esboços nos grandes."""
+        first_day, count, exact = distinct
+        month = dias_para_datas([first_day]).astype(object)[0]
+        self.stats_labels["distinct_month"].config(text=f"{'' if exact else '≈ '}{count} ({month.strftime('%m/%Y')})")
+
+
+    def _get_chart_aggregates(self):
+        """
+        Retorna os agregados dos gráficos (Total por status, Mês e Ano), calculados uma única vez
+        por versão dos dados: enquanto nada for alterado no banco, o resultado em memória é reutilizado.
+        """
+        version = self.db.get_data_version()
+        if self._chart_aggregates is not None and version is not None and version == self._chart_aggregates_version:
+            if "Análise Detalhada" not in self._chart_aggregates:
+                # Agregados vindos do instantâneo, que não guarda o resumo diário
+                daily_counts = self.db.fetch_daily_status_counts() or []
+                self._chart_aggregates.update({"Análise Detalhada": daily_counts, "Calendário e Tendência": daily_counts})
+            return self._chart_aggregates
+
+        # Datas inválidas ficam fora do resumo diário, como na limpeza feita antes de desenhar o gráfico
+        daily_counts = self.db.fetch_daily_status_counts() or []
+        self._chart_aggregates = {
+            **agregados_barras(daily_counts),
+            # Painéis diário/semanal/mensal por status, reamostrados a partir do resumo diário pré-calculado
+            "Análise Detalhada": daily_counts,
+            # Mapa de calor por dia da semana × semana e tendência com previsão, também a partir do resumo diário
+            "Calendário e Tendência": daily_counts,
+        }
+        self._chart_aggregates_version = version
+        return self._chart_aggregates
 
     def _show_chart_popup(self):
         """Exibe o gráfico dinâmico e interativo em uma nova janela pop-up."""
-        records = self.db.fetch_all_records()
-        if not records:
-            messagebox.showinfo("Gráfico", "Não há dados para gerar o gráfico.")
+        # Apenas uma janela de gráfico por vez
+        if self.chart_window is not None and self.chart_window.winfo_exists():
+            self.chart_window.lift()
+            self._update_chart()
             return
 
-        df = pd.DataFrame(records, columns=["id", "data", "numero", "descricao", "acao", "status"])
-        df['data'] = pd.to_datetime(df['data'], format='%d/%m/%Y', errors='coerce')
-        df.dropna(subset=['data'], inplace=True)
-
-        if df.empty:
-            messagebox.showinfo("Gráfico", "Não há dados válidos para gerar o gráfico após a limpeza.")
+        if not self._get_chart_aggregates()["Total"][1][-1]:
+            messagebox.showinfo("Gráfico", "Não há dados válidos para gerar o gráfico.")
             return
 
         chart_window = tk.Toplevel(self.root)
         chart_window.title("Resumo e Gráficos de Tickets")
-        chart_window.state("zoomed")
+        self._maximize_window(chart_window)
+        self.chart_window = chart_window
 
         # Frame para controles de filtro
         filter_controls_frame = ttk.Frame(chart_window, padding=10)
         filter_controls_frame.pack(fill="x", pady=(0, 10))
 
         ttk.Label(filter_controls_frame, text="Filtrar por Período:").pack(side="left", padx=5)
-        # Opções de filtro para o gráfico: Total (por status), Mês, Ano
-        period_options = ["Total", "Mês", "Ano"]
+        # Opções de filtro para o gráfico: Total (por status), Mês, Ano, a análise detalhada em painéis e o calendário
+        period_options = ["Total", "Mês", "Ano", "Análise Detalhada", "Calendário e Tendência"]
         self.chart_period_combobox = ttk.Combobox(filter_controls_frame, values=period_options, state="readonly")
         self.chart_period_combobox.set("Total") # Padrão: mostrar por status e total geral
         self.chart_period_combobox.pack(side="left", padx=5)
 
-        # Configurar o gráfico inicial
-        self.fig_chart = plt.figure(figsize=(10, 6))
-        self.chart_ax = self.fig_chart.add_subplot(111)
-        self.chart_canvas = FigureCanvasTkAgg(self.fig_chart, master=chart_window)
-        self.chart_canvas_widget = self.chart_canvas.get_tk_widget()
-        self.chart_canvas_widget.pack(side=tk.TOP, fill=tk.BOTH, expand=True, padx=20, pady=10)
-
-        # Atualiza o gráfico inicialmente com os filtros padrão
-        self._update_chart(df, self.chart_canvas, self.chart_ax)
+        # O gráfico chega como imagem pronta, renderizada no processo de renderização
+        self.chart_label = ttk.Label(chart_window, text="Gerando gráfico...", anchor="center")
+        self.chart_label.pack(side=tk.TOP, fill=tk.BOTH, expand=True, padx=20, pady=10)
+        # Clique em uma barra abre a lista dos tickets daquele status/período
+        self.chart_label.bind("<Button-1>", self._on_chart_click)
+
+        def close_chart():
+            self.chart_window = None
+            self.chart_label = None
+            self._chart_image = None
+            self._chart_shown = None
+            chart_window.destroy()
+
+        def on_resize(event):
+            # Re-renderiza no novo tamanho só quando o redimensionamento termina
+            if event.widget is chart_window:
+                if self._chart_resize_job:
+                    chart_window.after_cancel(self._chart_resize_job)
+                self._chart_resize_job = chart_window.after(300, self._update_chart)
+
+        chart_window.protocol("WM_DELETE_WINDOW", close_chart)
+        chart_window.bind("<Configure>", on_resize)
 
         # Bind para atualizar o gráfico automaticamente quando o combobox de período muda
-        self.chart_period_combobox.bind("<<ComboboxSelected>>", lambda event: self._update_chart(df, self.chart_canvas, self.chart_ax))
-
-
-    def _update_chart(self, df, canvas, ax):
-        """Atualiza o gráfico com base nos filtros selecionados, mostrando status e total."""
-        ax.clear() # Limpa o gráfico anterior
-
+        self.chart_period_combobox.bind("<<ComboboxSelected>>", lambda event: self._update_chart())
+        chart_window.after(50, self._update_chart)
+
+    def _chart_key(self, period):
+        """Chave do cache de imagens: (período, versão dos dados, largura, altura)."""
+        width, height = self.chart_label.winfo_width(), self.chart_label.winfo_height()
+        if width < 200 or height < 200:
+            width = int(self.root.winfo_screenwidth() * 0.95)
+            height = int(self.root.winfo_screenheight() * 0.8)
+        # Arredonda o tamanho para que pequenos ajustes da janela reaproveitem a mesma imagem
+        return (period, self._chart_aggregates_version, width // 50 * 50, height // 50 * 50)
+
+    def _update_chart(self):
+        """Exibe o gráfico do período selecionado a partir do cache ou solicita a renderização em segundo plano."""
+        self._chart_resize_job = None
+        if self.chart_window is None:
+            return
+        aggregates = self._get_chart_aggregates()
         selected_period = self.chart_period_combobox.get()
-        
-        filtered_df = df.copy()
+        key = self._chart_key(selected_period)
 
-        if filtered_df.empty:
-            ax.text(0.5, 0.5, "Não há dados para os filtros selecionados.", transform=ax.transAxes, ha="center", va="center")
-            canvas.draw()
+        image = self._chart_cache.obter(key)
+        if image is not None:
+            self._display_chart(key, image)
+            self._prerender_next_chart()
+        else:
+            if self._chart_image is None:
+                self.chart_label.config(text="Gerando gráfico...")
+            self._request_chart(key, aggregates[selected_period])
+
+    def _prerender_next_chart(self):
+        """
+        Adianta o próximo período que ainda não está no cache, para que a troca no combobox seja imediata.
+        Só um por vez e só com o processo de renderização livre: o período exibido é enviado primeiro e,
+        ao trocar de período, espera no máximo uma renderização antecipada.
+        """
+        if self.chart_window is None or self._chart_pending:
             return
+        aggregates = self._get_chart_aggregates()
+        for period in aggregates:
+            key = self._chart_key(period)
+            if key not in self._chart_failed and self._chart_cache.obter(key) is None:
+                self._request_chart(key, aggregates[period])
+                return
 
-        x_labels = [] # Rótulos no eixo X (Status ou Período)
-        values = []   # Valores no eixo Y (Contagem de Tickets)
-        title = ""
-
-        if selected_period == "Mês":
-            # Agrupa por mês e ano
-            monthly_counts = filtered_df.groupby(filtered_df['data'].dt.to_period('M')).size().sort_index()
-            x_labels = [p.strftime('%m/%Y') for p in monthly_counts.index]
-            values = monthly_counts.values
-            title = "Tickets por Mês"
-        elif selected_period == "Ano":
-            # Agrupa por ano
-            yearly_counts = filtered_df.groupby(filtered_df['data'].dt.year).size().sort_index()
-            x_labels = [str(y) for y in yearly_counts.index]
-            values = yearly_counts.values
-            title = "Tickets por Ano"
-        else: # selected_period == "Total" (inclui status e total geral)
-            # Agrupa por status
-            status_counts = filtered_df['status'].value_counts().sort_index()
-            x_labels = status_counts.index.tolist()
-            values = status_counts.values.tolist()
-
-            # Adiciona a coluna de "Total Geral"
-            x_labels.append("Total Geral")
-            values.append(filtered_df.shape[0]) # Total de todos os tickets
-
-            title = "Total de Tickets por Status e Geral"
-
-        # Configurar o gráfico de barras verticais
-        x_pos = range(len(x_labels))
-        
-        # Usar um colormap para cores mais bonitas
-        colors = 'skyblue' # Cor padrão
-        if len(values) > 0 and max(values) > 0:
-            normalized_values = [v / max(values) for v in values]
-            colors = plt.cm.viridis(normalized_values)
+    def _request_chart(self, key, aggregate):
+        """Envia a renderização ao processo de renderização (Agg), sem bloquear a interface."""
+        if key in self._chart_pending:
+            return
+        if self._chart_executor is None:
+            self._chart_executor = ProcessPoolExecutor(max_workers=1)
+        period, _, width, height = key
+        if period == "Análise Detalhada":
+            future = self._chart_executor.submit(renderizar_analise, aggregate, width, height)
+        elif period == "Calendário e Tendência":
+            future = self._chart_executor.submit(renderizar_calendario, aggregate, width, height)
         else:
-            colors = ['lightgray'] * len(values)
-        
-        ax.bar(x_pos, values, color=colors) # Usando ax.bar para gráfico vertical
-
-        ax.set_title(title, fontsize=14)
-        ax.set_xlabel("Período/Status", fontsize=12) # Eixo X é o período/status
-        ax.set_ylabel("Contagem de Tickets", fontsize=12) # Eixo Y é a contagem
-
-        ax.set_xticks(x_pos)
-        ax.set_xticklabels(x_labels, rotation=45, ha='right', fontsize=10) # Rotação para rótulos longos
-
-        # Adicionar valores nas barras para melhor leitura
-        for i, v in enumerate(values):
-            ax.text(i, v + 0.5, str(v), color='black', ha='center', va='bottom', fontsize=9) # Posição acima da barra
-
-        ax.grid(True, linestyle='--', alpha=0.6, axis='y') # Grade no eixo Y
-        
-        plt.tight_layout()
-        canvas.draw()
+            labels, values, title = aggregate
+            future = self._chart_executor.submit(renderizar_barras, period, labels, values, title, width, height)
+        self._chart_pending[key] = future
+        if len(self._chart_pending) == 1:
+            self.root.after(50, self._poll_chart_renders)
+
+    def _poll_chart_renders(self):
+        """Recolhe as imagens prontas, guarda no cache e exibe a do período selecionado."""
+        for key in [k for k, future in self._chart_pending.items() if future.done()]:
+            future = self._chart_pending.pop(key)
+            visible = self.chart_window is not None and key == self._chart_key(self.chart_period_combobox.get())
+            try:
+                image = future.result()
+            except Exception as e:
+                self._chart_failed.add(key)
+                if visible:
+                    self._chart_shown = None
+                    self.chart_label.config(text=f"Erro ao gerar o gráfico: {e}", image="")
+                continue
+            self._chart_cache.guardar(key, image)
+            if visible:
+                self._display_chart(key, image)
+        if self._chart_pending:
+            self.root.after(50, self._poll_chart_renders)
+        else:
+            self._prerender_next_chart()
+
+    def _display_chart(self, key, image):
+        """Exibe a imagem e guarda a chave e os rótulos das barras dela (os agregados da mesma versão dos dados)."""
+        self._chart_image = tk.PhotoImage(data=base64.b64encode(image))
+        period = key[0]
+        clickable = period in ("Total", "Mês", "Ano")
+        self._chart_shown = (key, self._chart_aggregates[period][0] if clickable else None)
+        self.chart_label.config(image=self._chart_image, text="", cursor="hand2" if clickable else "")
+
+    def _on_chart_click(self, event):
+        """Localiza a barra clicada na imagem exibida e abre a lista dos tickets correspondentes."""
+        shown = self._chart_shown
+        # Só vale a imagem do período selecionado no tamanho atual: com uma renderização pendente (troca de
+        # período ou redimensionamento), a imagem na tela ainda é a anterior e o clique cairia na barra errada
+        if shown is None or shown[1] is None or shown[0] != self._chart_key(self.chart_period_combobox.get()):
+            return
+        key, labels = shown
+        period = key[0]
+        width, height = self._chart_image.width(), self._chart_image.height()
+        # A imagem fica centralizada no label
+        x = event.x - (self.chart_label.winfo_width() - width) / 2
+        y = event.y - (self.chart_label.winfo_height() - height) / 2
+        index = indice_barra(x, y, width, height, len(labels))
+        if index is None:
+            return
 
+        label = labels[index]
+        if period == "Total":
+            status = None if label == "Total Geral" else label
+            self._open_drill_down(f"Status: {label}", status=status)
+        elif period == "Mês":
+            month, year = (int(part) for part in label.split("/"))
+            first_day = dia_de(datetime(year, month, 1).date())
+            self._open_drill_down(f"Mês: {label}", first_day=first_day,
+                                  last_day=dia_de((datetime(year, month, 28) + timedelta(days=4)).replace(day=1).date()) - 1)
+        else:
+            year = int(label)
+            self._open_drill_down(f"Ano: {label}", first_day=dia_de(datetime(year, 1, 1).date()),
+                                  last_day=dia_de(datetime(year, 12, 31).date()))
+
+    def _open_drill_down(self, title, status=None, first_day=None, last_day=None):
+        """
+        Lista paginada dos tickets de um status e/ou intervalo de dias, lida direto dos índices do banco.
+        Apenas a página exibida fica na Treeview; a tabela principal não é recarregada. O total é contado
+        com o mesmo filtro a cada página (não vem dos agregados do gráfico, que podem estar desatualizados).
+        """
+        page_size = 200
+        # Chave (dia, id) do início de cada página já visitada, para voltar sem recalcular
+        page_keys = [None]
+        state = {"page": 0, "next": None}
+
+        drill_window = tk.Toplevel(self.root)
+        drill_window.title(f"Tickets - {title}")
+        drill_window.geometry("1100x600")
+
+        info_label = ttk.Label(drill_window, padding=(10, 10, 10, 0))
+        info_label.pack(anchor="w")
+
+        drill_tree_frame = ttk.Frame(drill_window, padding=10)
+        drill_tree_frame.pack(fill="both", expand=True)
+        cols = ("ID", "Data", "Nº Ticket", "Descrição", "Ação Realizada", "Status")
+        drill_tree = ttk.Treeview(drill_tree_frame, columns=cols, show='headings', selectmode='browse')
+        for col in cols:
+            drill_tree.heading(col, text=col)
+        drill_tree.column("ID", width=50, anchor="center")
+        drill_tree.column("Data", width=90, anchor="center")
+        drill_tree.column("Nº Ticket", width=100, anchor="center")
+        drill_tree.column("Descrição", width=350)
+        drill_tree.column("Ação Realizada", width=350)
+        drill_tree.column("Status", width=130, anchor="center")
+        drill_tree.pack(side="left", fill="both", expand=True)
+        drill_scrollbar = ttk.Scrollbar(drill_tree_frame, orient="vertical", command=drill_tree.yview)
+        drill_tree.configure(yscrollcommand=drill_scrollbar.set)
+        drill_scrollbar.pack(side="right", fill="y")
+        self._bind_full_text_tooltip(drill_tree)
+
+        def load_page():
+            # Uma linha a mais indica se existe próxima página
+            rows = self.db.fetch_records_page(status, first_day, last_day, after=page_keys[state["page"]],
+                                              limit=page_size + 1, summary=True) or []
+            state["next"] = (rows[page_size - 1][6], rows[page_size - 1][0]) if len(rows) > page_size else None
+            drill_tree.delete(*drill_tree.get_children())
+            for row in rows[:page_size]:
+                drill_tree.insert("", tk.END, values=row[:6])
+            count = self.db.count_records_page(status, first_day, last_day)
+            pages = max(1, -(-count // page_size), state["page"] + 1)
+            info_label.config(text=f"{count} ticket(s) - página {state['page'] + 1} de {pages}")
+            previous_button.config(state="normal" if state["page"] > 0 else "disabled")
+            next_button.config(state="normal" if state["next"] else "disabled")
+
+        def previous_page():
+            state["page"] -= 1
+            load_page()
+
+        def next_page():
+            del page_keys[state["page"] + 1:]
+            page_keys.append(state["next"])
+            state["page"] += 1
+            load_page()
+
+        def edit_selected(event=None):
+            item = drill_tree.focus()
+            if not item:
+                messagebox.showwarning("Nenhum Selecionado", "Selecione um registro para editar.", parent=drill_window)
+                return
+            self._open_edit_window(drill_tree.item(item, 'values')[0], on_saved=load_page)
+
+        drill_button_frame = ttk.Frame(drill_window, padding=10)
+        drill_button_frame.pack(fill="x")
+        previous_button = ttk.Button(drill_button_frame, text="< Anterior", command=previous_page)
+        previous_button.pack(side="left", padx=5)
+        next_button = ttk.Button(drill_button_frame, text="Próxima >", command=next_page)
+        next_button.pack(side="left", padx=5)
+        ttk.Button(drill_button_frame, text="Editar Selecionado", command=edit_selected).pack(side="left", padx=5)
+        drill_tree.bind("<Double-1>", edit_selected)
+        load_page()
+
+
+    def _bind_full_text_tooltip(self, tree):
+        """
+        Ao parar o mouse sobre uma Descrição ou Ação cortada (listagens resumidas), mostra o texto completo,
+        lido pelo id do registro só nesse momento.
+        """
+        state = {"job": None, "tip": None, "cell": None}
+
+        def hide(event=None):
+            if state["job"]:
+                tree.after_cancel(state["job"])
+                state["job"] = None
+            if state["tip"] is not None:
+                state["tip"].destroy()
+                state["tip"] = None
+            state["cell"] = None
+
+        def show(item, column, x, y):
+            state["job"] = None
+            if not tree.exists(item):
+                return
+            record = self.db.fetch_record_by_id(tree.item(item, 'values')[0])
+            if not record:
+                return
+            tip = tk.Toplevel(tree)
+            tip.wm_overrideredirect(True)
+            tip.geometry(f"+{x + 12}+{y + 12}")
+            ttk.Label(tip, text=record[3] if column == "Descrição" else record[4], wraplength=500,
+                      background="#ffffe0", relief="solid", borderwidth=1, padding=4).pack()
+            state["tip"] = tip
+
+        def on_motion(event):
+            item = tree.identify_row(event.y)
+            column_ref = tree.identify_column(event.x) if item else ""
+            column = tree.column(column_ref, "id") if column_ref else None
+            if (item, column) == state["cell"]:
+                return
+            hide()
+            if column in ("Descrição", "Ação Realizada") and tree.set(item, column).endswith(SUMMARY_MARK):
+                state["cell"] = (item, column)
+                state["job"] = tree.after(500, show, item, column, event.x_root, event.y_root)
+
+        tree.bind("<Motion>", on_motion, add="+")
+        tree.bind("<Leave>", hide, add="+")
+        tree.bind("<Destroy>", hide, add="+")
+
+    def _bind_autocomplete(self, entry, column):
+        """
+        Lista de sugestões abaixo do campo enquanto se digita, com os textos já usados em 'column' que começam
+        com o que foi digitado (mais usados e mais recentes primeiro). Setas escolhem, Enter ou Tab aceitam
+        a sugestão marcada e Esc fecha a lista.
+        """
+        state = {"popup": None, "listbox": None}
+
+        def hide(event=None):
+            if state["popup"] is not None:
+                state["popup"].destroy()
+                state["popup"] = state["listbox"] = None
+
+        def show():
+            text = entry.get()
+            suggestions = self.suggestions[column].sugerir(text)
+            if not suggestions or suggestions == [text.strip()]:
+                hide()
+                return
+            if state["popup"] is None:
+                popup = tk.Toplevel(entry)
+                popup.wm_overrideredirect(True)
+                listbox = tk.Listbox(popup, activestyle="none", exportselection=False)
+                listbox.pack(fill="both", expand=True)
+                listbox.bind("<ButtonRelease-1>", accept)
+                state["popup"], state["listbox"] = popup, listbox
+            listbox = state["listbox"]
+            listbox.delete(0, tk.END)
+            listbox.insert(tk.END, *suggestions)
+            listbox.configure(height=len(suggestions))
+            state["popup"].update_idletasks()
+            state["popup"].geometry(f"{entry.winfo_width()}x{listbox.winfo_reqheight()}"
+                                    f"+{entry.winfo_rootx()}+{entry.winfo_rooty() + entry.winfo_height()}")
+
+        def accept(event=None):
+            listbox = state["listbox"]
+            if listbox is None or not listbox.curselection():
+                return None
+            value = listbox.get(listbox.curselection()[0])
+            entry.delete(0, tk.END)
+            entry.insert(0, value)
+            entry.icursor(tk.END)
+            hide()
+            entry.focus_set()
+            return "break"
+
+        def move(step):
+            if state["listbox"] is None:
+                show()
+            listbox = state["listbox"]
+            if listbox is None:
+                return "break"
+            current = listbox.curselection()
+            index = current[0] + step if current else (0 if step > 0 else listbox.size() - 1)
+            index = min(max(index, 0), listbox.size() - 1)
+            listbox.selection_clear(0, tk.END)
+            listbox.selection_set(index)
+            listbox.see(index)
+            return "break"
+
+        def hide_if_unfocused():
+            try:
+                focused = entry.focus_get()
+            except (KeyError, tk.TclError):
+                focused = None
+            if focused is not entry:
+                hide()
+
+        def on_escape(event):
+            if state["popup"] is None:
+                return None
+            hide()
+            return "break"
+
+        def on_key_release(event):
+            if event.keysym not in ("Up", "Down", "Return", "KP_Enter", "Tab", "Escape"):
+                show()
+
+        entry.bind("<KeyRelease>", on_key_release, add="+")
+        entry.bind("<Down>", lambda event: move(1))
+        entry.bind("<Up>", lambda event: move(-1))
+        entry.bind("<Return>", accept)
+        entry.bind("<KP_Enter>", accept)
+        entry.bind("<Tab>", accept)
+        entry.bind("<Escape>", on_escape)
+        # O clique na lista tira o foco do campo antes de chegar à lista: a lista fecha com atraso
+        entry.bind("<FocusOut>", lambda event: entry.after(200, hide_if_unfocused), add="+")
+        entry.bind("<Destroy>", hide, add="+")
 
     def _validate_date_input(self, event=None):
         """Valida o formato da data no campo de entrada."""
@@ -401,24 +809,31 @@ class TicketApp:
 
     def _load_table(self, records=None):
         """Carrega os dados na Treeview e atualiza os balões de estatísticas."""
+        # Interrompe um preenchimento em partes ainda em andamento
+        self._table_generation += 1
+        if self._table_fill_job:
+            self.root.after_cancel(self._table_fill_job)
+            self._table_fill_job = None
         for row in self.tree.get_children():
             self.tree.delete(row)
-        if records is None:
-            records = self.db.fetch_all_records()
+        full_table = records is None
+        if full_table:
+            records = self.db.fetch_all_records(summary=True)
         if records:
             for row in records:
                 self.tree.insert("", tk.END, values=row)
         self._update_statistics_cards() # Chama a atualização das estatísticas após carregar a tabela
+        if full_table:
+            self._save_snapshot(records or [])
 
     def _apply_status_filter(self, event=None):
         """Aplica o filtro de status na tabela."""
         selected_status = self.filter_status_combobox.get()
-        all_records = self.db.fetch_all_records()
         if selected_status == "Todos":
-            filtered_records = all_records
+            self._load_table()
         else:
-            filtered_records = [record for record in all_records if record[5] == selected_status] # record[5] é o status
-        self._load_table(filtered_records)
+            # Só os registros do status, pelo índice (status, dia)
+            self._load_table(self.db.fetch_records_by_status(selected_status, summary=True) or [])
 
 
     def _validate_inputs(self):
@@ -446,20 +861,180 @@ class TicketApp:
         date = self.data_entry.get() # Já validado pelo _validate_inputs
         self.db.add_record(date, self.numero_entry.get(), self.descricao_entry.get(),
                            self.acao_entry.get(), self.status_combobox.get())
+        self.suggestions["descricao"].registrar(self.descricao_entry.get())
+        self.suggestions["acao_realizada"].registrar(self.acao_entry.get())
         messagebox.showinfo("Sucesso", "Registro adicionado com sucesso!")
-        self._load_table()
-        self._update_statistics_cards()
-        self._update_statistics_cards()
+        self._load_table() # Já atualiza os balões de estatísticas
         self._clear_fields()
 
-    def _open_edit_window(self):
-        selected_item = self.tree.selection()
-        if not selected_item:
-            messagebox.showwarning("Nenhum Selecionado", "Selecione um registro para editar.")
-            return
+    def _open_batch_window(self):
+        """
+        Inclusão de vários registros pelo teclado: cada linha é validada ao entrar na lista (Enter), as linhas
+        ficam em memória e "Gravar Todos" (Ctrl+S) grava todas em uma única transação, recarregando a tabela
+        e os balões uma só vez.
+        """
+        batch_window = tk.Toplevel(self.root)
+        batch_window.title("Inclusão em Lote")
+        batch_window.transient(self.root)
+        batch_window.grab_set()
+        batch_window.geometry("1100x600")
+
+        staged = {}  # Item da lista -> (data, numero, descricao, acao, status)
+
+        entry_frame = ttk.LabelFrame(batch_window, text="Nova linha (Enter adiciona à lista)", padding=10)
+        entry_frame.pack(fill="x", padx=10, pady=(10, 0))
+        entry_frame.columnconfigure(5, weight=1)
+        entry_frame.columnconfigure(7, weight=1)
+
+        ttk.Label(entry_frame, text="Data:").grid(row=0, column=0, padx=5, pady=5, sticky="w")
+        date_entry = ttk.Entry(entry_frame, width=12)
+        date_entry.grid(row=0, column=1, padx=5, pady=5)
+        date_entry.insert(0, self.data_entry.get().strip() or datetime.now().strftime("%d/%m/%Y"))
+
+        ttk.Label(entry_frame, text="Nº Ticket:").grid(row=0, column=2, padx=5, pady=5, sticky="w")
+        numero_entry = ttk.Entry(entry_frame, width=16)
+        numero_entry.grid(row=0, column=3, padx=5, pady=5)
+
+        ttk.Label(entry_frame, text="Descrição:").grid(row=0, column=4, padx=5, pady=5, sticky="w")
+        descricao_entry = ttk.Entry(entry_frame)
+        descricao_entry.grid(row=0, column=5, padx=5, pady=5, sticky="ew")
+        self._bind_autocomplete(descricao_entry, "descricao")
+
+        ttk.Label(entry_frame, text="Ação:").grid(row=0, column=6, padx=5, pady=5, sticky="w")
+        acao_entry = ttk.Entry(entry_frame)
+        acao_entry.grid(row=0, column=7, padx=5, pady=5, sticky="ew")
+        self._bind_autocomplete(acao_entry, "acao_realizada")
+
+        ttk.Label(entry_frame, text="Status:").grid(row=0, column=8, padx=5, pady=5, sticky="w")
+        status_combobox = ttk.Combobox(entry_frame, values=self.status_combobox.cget("values"), state="readonly", width=20)
+        status_combobox.grid(row=0, column=9, padx=5, pady=5)
+        status_combobox.set(self.status_combobox.get() or "Em Andamento")
+
+        message_label = ttk.Label(batch_window, text="", foreground="red")
+        message_label.pack(anchor="w", padx=10, pady=(5, 0))
+
+        button_frame = ttk.Frame(batch_window, padding=10)
+        button_frame.pack(side="bottom", fill="x")
+        count_label = ttk.Label(button_frame, text="")
+
+        tree_frame = ttk.Frame(batch_window, padding=10)
+        tree_frame.pack(fill="both", expand=True)
+        cols = ("Data", "Nº Ticket", "Descrição", "Ação Realizada", "Status")
+        batch_tree = ttk.Treeview(tree_frame, columns=cols, show='headings', selectmode='extended')
+        for col in cols:
+            batch_tree.heading(col, text=col)
+        batch_tree.column("Data", width=100, anchor="center")
+        batch_tree.column("Nº Ticket", width=120, anchor="center")
+        batch_tree.column("Descrição", width=350)
+        batch_tree.column("Ação Realizada", width=350)
+        batch_tree.column("Status", width=150, anchor="center")
+        batch_tree.pack(side="left", fill="both", expand=True)
+        batch_scrollbar = ttk.Scrollbar(tree_frame, orient="vertical", command=batch_tree.yview)
+        batch_tree.configure(yscrollcommand=batch_scrollbar.set)
+        batch_scrollbar.pack(side="right", fill="y")
+
+        def update_count():
+            count_label.config(text=f"{len(staged)} linha(s) na lista. Delete remove as selecionadas; "
+                                    "duplo clique volta a linha para correção.")
+
+        def row_error(date, numero, descricao):
+            """Mensagem e campo do primeiro problema da linha, ou None se a linha for válida."""
+            try:
+                datetime.strptime(date, "%d/%m/%Y")
+            except ValueError:
+                return "A data deve estar no formato DD/MM/AAAA.", date_entry
+            if not numero:
+                return "O campo 'Nº Ticket' é obrigatório.", numero_entry
+            if not descricao:
+                return "O campo 'Descrição' é obrigatório.", descricao_entry
+            return None
+
+        def stage_row(event=None):
+            row = (date_entry.get().strip(), numero_entry.get().strip(), descricao_entry.get().strip(),
+                   acao_entry.get().strip(), status_combobox.get())
+            error = row_error(*row[:3])
+            if error:
+                message_label.config(text=error[0])
+                error[1].focus_set()
+                return "break"
+            item = batch_tree.insert("", tk.END, values=row)
+            staged[item] = row
+            batch_tree.see(item)
+            message_label.config(text="")
+            update_count()
+            # Data e status costumam se repetir no lote: só os campos da linha são limpos
+            for entry in (numero_entry, descricao_entry, acao_entry):
+                entry.delete(0, tk.END)
+            numero_entry.focus_set()
+            return "break"
+
+        def remove_selected(event=None):
+            for item in batch_tree.selection():
+                staged.pop(item, None)
+                batch_tree.delete(item)
+            update_count()
+
+        def edit_selected(event=None):
+            selected = batch_tree.selection()
+            if not selected:
+                return
+            row = staged.pop(selected[0])
+            batch_tree.delete(selected[0])
+            for entry, value in zip((date_entry, numero_entry, descricao_entry, acao_entry), row):
+                entry.delete(0, tk.END)
+                entry.insert(0, value)
+            status_combobox.set(row[4])
+            update_count()
+            numero_entry.focus_set()
+
+        def save_all(event=None):
+            if not staged:
+                message_label.config(text="Nenhuma linha na lista. Preencha os campos e tecle Enter.")
+                return "break"
+            records = [staged[item] for item in batch_tree.get_children()]
+            if not self.db.add_records(records):
+                return "break"  # O erro já foi exibido; as linhas continuam na lista
+            for _, _, descricao, acao, _ in records:
+                self.suggestions["descricao"].registrar(descricao)
+                self.suggestions["acao_realizada"].registrar(acao)
+            batch_window.destroy()
+            self._load_table()
+            messagebox.showinfo("Sucesso", f"{len(records)} registro(s) adicionado(s) com sucesso!")
+            return "break"
 
-        record_id = self.tree.item(selected_item, 'values')[0]
-        record_data = self.db.fetch_record_by_ticket_number(self.tree.item(selected_item, 'values')[2]) # Busca pelo número do ticket
+        def close_window(event=None):
+            if staged and not messagebox.askyesno("Descartar Linhas", f"Descartar as {len(staged)} linha(s) que não foram gravadas?",
+                                                  parent=batch_window):
+                return
+            batch_window.destroy()
+
+        # Enter nos campos de texto primeiro aceita a sugestão marcada (quando houver) e só depois adiciona a linha
+        batch_window.bind("<Return>", stage_row)
+        batch_window.bind("<KP_Enter>", stage_row)
+        batch_window.bind("<Control-s>", save_all)
+        batch_window.bind("<Escape>", close_window)
+        batch_window.protocol("WM_DELETE_WINDOW", close_window)
+        batch_tree.bind("<Delete>", remove_selected)
+        batch_tree.bind("<Double-1>", edit_selected)
+
+        ttk.Button(button_frame, text="Adicionar à Lista", command=stage_row).pack(side="left", padx=5)
+        ttk.Button(button_frame, text="Remover Selecionadas", command=remove_selected).pack(side="left", padx=5)
+        ttk.Button(button_frame, text="Gravar Todos (Ctrl+S)", command=save_all).pack(side="left", padx=5)
+        ttk.Button(button_frame, text="Cancelar", command=close_window).pack(side="right", padx=5)
+        count_label.pack(side="left", padx=15)
+        update_count()
+        numero_entry.focus_set()
+
+    def _open_edit_window(self, record_id=None, on_saved=None):
+        """Abre a edição do registro selecionado na tabela ou do 'record_id' informado (ex.: a partir do gráfico)."""
+        if record_id is None:
+            selected_item = self.tree.selection()
+            if not selected_item:
+                messagebox.showwarning("Nenhum Selecionado", "Selecione um registro para editar.")
+                return
+            record_id = self.tree.item(selected_item, 'values')[0]
+        # Busca pelo ID: o número do ticket pode se repetir entre registros
+        record_data = self.db.fetch_record_by_id(record_id)
 
         if not record_data:
             messagebox.showerror("Erro", "Registro não encontrado para edição.")
@@ -474,8 +1049,8 @@ class TicketApp:
         # Posicionar a janela de edição no centro da tela
         screen_width = self.root.winfo_screenwidth()
         screen_height = self.root.winfo_screenheight()
-        window_width = 400
-        window_height = 300
+        window_width = 560
+        window_height = 520
         x_pos = int((screen_width - window_width) / 2)
         y_pos = int((screen_height - window_height) / 2)
         edit_window.geometry(f"{window_width}x{window_height}+{x_pos}+{y_pos}")
@@ -525,9 +1100,29 @@ class TicketApp:
             messagebox.showinfo("Sucesso", "Registro atualizado com sucesso!")
             edit_window.destroy()
             self._load_table()
+            if on_saved:
+                on_saved()
 
         ttk.Button(edit_frame, text="Salvar", command=save_edit).grid(row=len(labels), column=0, columnspan=2, pady=10)
 
+        # Histórico de status do registro (gravado por gatilhos a cada mudança), pelo índice do registro
+        history_frame = ttk.LabelFrame(edit_window, text="Histórico de Status", padding=10)
+        history_frame.pack(padx=10, pady=(0, 10), fill="both", expand=True)
+        history_cols = ("De", "Para", "Alterado em", "Tempo no Anterior")
+        history_tree = ttk.Treeview(history_frame, columns=history_cols, show='headings', height=6)
+        for col in history_cols:
+            history_tree.heading(col, text=col)
+            history_tree.column(col, width=120, anchor="center")
+        history_tree.pack(side="left", fill="both", expand=True)
+        history_scrollbar = ttk.Scrollbar(history_frame, orient="vertical", command=history_tree.yview)
+        history_tree.configure(yscrollcommand=history_scrollbar.set)
+        history_scrollbar.pack(side="right", fill="y")
+        for previous, status, changed_at, duration in self.db.fetch_status_history(record_id) or []:
+            history_tree.insert("", tk.END, values=(
+                previous or "(inclusão)", status or "",
+                datetime.fromtimestamp(changed_at).strftime("%d/%m/%Y %H:%M"),
+                formatar_duracao(duration) if previous else ""))
+
 
     def _open_delete_window(self):
         delete_window = tk.Toplevel(self.root)
@@ -563,10 +1158,32 @@ class TicketApp:
         delete_tree.configure(yscrollcommand=delete_scrollbar.set)
         delete_scrollbar.pack(side="right", fill="y")
 
-        records = self.db.fetch_all_records()
-        if records:
-            for row in records:
+        self._bind_full_text_tooltip(delete_tree)
+
+        # Paginação por chave (id), como na lista detalhada: só a página exibida é lida do banco
+        page_size = 200
+        page_keys = [None]  # Id que antecede cada página já visitada
+        state = {"page": 0, "next": None}
+
+        def load_page():
+            rows = self.db.fetch_records_before(page_keys[state["page"]], limit=page_size + 1, summary=True) or []
+            state["next"] = rows[page_size - 1][0] if len(rows) > page_size else None
+            delete_tree.delete(*delete_tree.get_children())
+            for row in rows[:page_size]:
                 delete_tree.insert("", tk.END, values=row)
+            page_label.config(text=f"Página {state['page'] + 1}")
+            previous_button.config(state="normal" if state["page"] > 0 else "disabled")
+            next_button.config(state="normal" if state["next"] else "disabled")
+
+        def previous_page():
+            state["page"] -= 1
+            load_page()
+
+        def next_page():
+            del page_keys[state["page"] + 1:]
+            page_keys.append(state["next"])
+            state["page"] += 1
+            load_page()
 
         def perform_delete():
             selected_items = delete_tree.selection()
@@ -575,18 +1192,274 @@ class TicketApp:
                 return
 
             if messagebox.askyesno("Confirmar Deleção", f"Tem certeza que deseja deletar {len(selected_items)} registro(s) selecionado(s)?"):
-                deleted_count = 0
-                for item_id in selected_items:
-                    record_id = delete_tree.item(item_id, 'values')[0]
-                    self.db.delete_record(record_id)
-                    deleted_count += 1
-                messagebox.showinfo("Sucesso", f"{deleted_count} registro(s) deletado(s) com sucesso!")
-                delete_window.destroy()
-                self._load_table()
+                # Todos os selecionados em uma única transação (uma só mudança de versão dos dados)
+                record_ids = [delete_tree.item(item_id, 'values')[0] for item_id in selected_items]
+                if self.db.delete_records(record_ids):
+                    messagebox.showinfo("Sucesso", f"{len(record_ids)} registro(s) deletado(s) com sucesso!")
+                    delete_window.destroy()
+                    self._load_table()
 
         delete_button_frame = ttk.Frame(delete_window, padding=10)
         delete_button_frame.pack(fill="x")
         ttk.Button(delete_button_frame, text="Deletar Selecionados", command=perform_delete).pack(side="left", padx=5)
+        next_button = ttk.Button(delete_button_frame, text="Próxima >", command=next_page)
+        next_button.pack(side="right", padx=5)
+        previous_button = ttk.Button(delete_button_frame, text="< Anterior", command=previous_page)
+        previous_button.pack(side="right", padx=5)
+        page_label = ttk.Label(delete_button_frame)
+        page_label.pack(side="right", padx=10)
+        load_page()
+
+
+    def _open_duplicates_window(self):
+        """Lista os grupos de registros com o mesmo conteúdo (Nº Ticket, Data, Descrição e Ação normalizados)."""
+        groups = self.db.fetch_duplicate_groups()
+        if not groups:
+            messagebox.showinfo("Duplicados", "Nenhum registro duplicado encontrado.")
+            return
+
+        dup_window = tk.Toplevel(self.root)
+        dup_window.title("Registros Duplicados")
+        dup_window.transient(self.root)
+        dup_window.grab_set()
+        dup_window.geometry("1100x600")
+
+        ttk.Label(dup_window, text=f"{len(groups)} grupo(s) de registros duplicados. "
+                                   "Expanda um grupo para ver os IDs.").pack(anchor="w", padx=10, pady=(10, 0))
+
+        dup_tree_frame = ttk.Frame(dup_window, padding=10)
+        dup_tree_frame.pack(fill="both", expand=True)
+
+        cols = ("Qtd.", "Nº Ticket", "Data", "Descrição", "Ação Realizada")
+        dup_tree = ttk.Treeview(dup_tree_frame, columns=cols, show='tree headings', selectmode='extended')
+        dup_tree.heading("#0", text="ID")
+        dup_tree.column("#0", width=120)
+        for col in cols:
+            dup_tree.heading(col, text=col)
+        dup_tree.column("Qtd.", width=50, anchor="center")
+        dup_tree.column("Nº Ticket", width=100, anchor="center")
+        dup_tree.column("Data", width=90, anchor="center")
+        dup_tree.column("Descrição", width=350)
+        dup_tree.column("Ação Realizada", width=350)
+        dup_tree.pack(side="left", fill="both", expand=True)
+
+        dup_scrollbar = ttk.Scrollbar(dup_tree_frame, orient="vertical", command=dup_tree.yview)
+        dup_tree.configure(yscrollcommand=dup_scrollbar.set)
+        dup_scrollbar.pack(side="right", fill="y")
+
+        # Guarda os IDs de cada grupo; o primeiro (mais antigo) é o que permanece ao remover duplicados
+        group_ids = {}
+        for _, count, ids, numero, data, descricao, acao in groups:
+            record_ids = sorted(int(record_id) for record_id in ids.split(','))
+            parent = dup_tree.insert("", tk.END, text=f"Grupo ({record_ids[0]})", values=(count, numero, data, descricao, acao))
+            for record_id in record_ids:
+                dup_tree.insert(parent, tk.END, text=str(record_id))
+            group_ids[parent] = record_ids
+
+        def remove_duplicates():
+            selected_groups = {item if item in group_ids else dup_tree.parent(item) for item in dup_tree.selection()}
+            selected_groups.discard("")
+            if not selected_groups:
+                messagebox.showwarning("Nenhum Selecionado", "Selecione um ou mais grupos.", parent=dup_window)
+                return
+            extra_ids = [record_id for group in selected_groups for record_id in group_ids[group][1:]]
+            if not messagebox.askyesno("Confirmar Remoção",
+                                       f"Remover {len(extra_ids)} registro(s) duplicado(s), mantendo o mais antigo de cada grupo?",
+                                       parent=dup_window):
+                return
+            if self.db.delete_records(extra_ids):
+                messagebox.showinfo("Sucesso", f"{len(extra_ids)} registro(s) duplicado(s) removido(s).", parent=dup_window)
+                dup_window.destroy()
+                self._load_table()
+
+        dup_button_frame = ttk.Frame(dup_window, padding=10)
+        dup_button_frame.pack(fill="x")
+        ttk.Button(dup_button_frame, text="Remover Duplicados dos Grupos Selecionados", command=remove_duplicates).pack(side="left", padx=5)
+
+    def _open_aging_window(self):
+        """Painel de envelhecimento: tempo em cada status (percentis) e tickets parados nos status de espera."""
+        aging_window = tk.Toplevel(self.root)
+        aging_window.title("Envelhecimento dos Tickets")
+        aging_window.geometry("1000x650")
+
+        controls_frame = ttk.Frame(aging_window, padding=10)
+        controls_frame.pack(fill="x")
+        ttk.Label(controls_frame, text="Parado há mais de (dias):").pack(side="left", padx=5)
+        stale_days = tk.Spinbox(controls_frame, from_=1, to=365, width=5)
+        stale_days.delete(0, tk.END)
+        stale_days.insert(0, "3")
+        stale_days.pack(side="left", padx=5)
+        ttk.Label(controls_frame, text="Transições dos últimos (dias):").pack(side="left", padx=5)
+        window_days = tk.Spinbox(controls_frame, from_=1, to=3650, width=5)
+        window_days.delete(0, tk.END)
+        window_days.insert(0, "90")
+        window_days.pack(side="left", padx=5)
+
+        # Percentis do tempo no status (transições concluídas no período) e idade dos tickets ainda no status
+        ttk.Label(aging_window, text="Tempo em cada status", font=("Arial", 11, "bold")).pack(anchor="w", padx=10)
+        stats_cols = ("Status", "Transições", "P50", "P90", "P95", "Máximo", "Em Aberto", "Idade Mediana", "Mais Antigo")
+        stats_tree = ttk.Treeview(aging_window, columns=stats_cols, show='headings', height=8)
+        for col in stats_cols:
+            stats_tree.heading(col, text=col)
+            stats_tree.column(col, width=90, anchor="center")
+        stats_tree.column("Status", width=170, anchor="w")
+        stats_tree.pack(fill="x", padx=10, pady=(0, 10))
+
+        stale_label = ttk.Label(aging_window, text="Tickets parados", font=("Arial", 11, "bold"))
+        stale_label.pack(anchor="w", padx=10)
+        stale_frame = ttk.Frame(aging_window, padding=(10, 0, 10, 10))
+        stale_frame.pack(fill="both", expand=True)
+        stale_cols = ("ID", "Data", "Nº Ticket", "Status", "No Status Desde", "Tempo no Status")
+        stale_tree = ttk.Treeview(stale_frame, columns=stale_cols, show='headings')
+        for col in stale_cols:
+            stale_tree.heading(col, text=col)
+            stale_tree.column(col, width=130, anchor="center")
+        stale_tree.column("ID", width=60)
+        stale_tree.pack(side="left", fill="both", expand=True)
+        stale_scrollbar = ttk.Scrollbar(stale_frame, orient="vertical", command=stale_tree.yview)
+        stale_tree.configure(yscrollcommand=stale_scrollbar.set)
+        stale_scrollbar.pack(side="right", fill="y")
+
+        def refresh():
+            try:
+                stale_seconds = int(stale_days.get()) * 86400
+                window_seconds = int(window_days.get()) * 86400
+            except ValueError:
+                messagebox.showwarning("Valor Inválido", "Informe a quantidade de dias em números inteiros.", parent=aging_window)
+                return
+            now = datetime.now().timestamp()
+
+            # Consultas indexadas: transições do período e status atual dos tickets em espera
+            durations = self.db.fetch_status_durations(int(now - window_seconds)) or []
+            completed = percentis_por_status([row[0] for row in durations], [row[1] for row in durations])
+            current = self.db.fetch_current_status_since(STATUS_ESPERA) or []
+            open_ages = idades_abertas([row[0] for row in current], [row[1] for row in current], now)
+
+            stats_tree.delete(*stats_tree.get_children())
+            for status in list(STATUS_ESPERA) + sorted(set(completed) - set(STATUS_ESPERA)):
+                done = completed.get(status, {})
+                count, median_age, oldest = open_ages.get(status, (0, None, None))
+                stats_tree.insert("", tk.END, values=(
+                    status, done.get("quantidade", 0),
+                    formatar_duracao(done.get("p50")), formatar_duracao(done.get("p90")),
+                    formatar_duracao(done.get("p95")), formatar_duracao(done.get("max")),
+                    count if status in STATUS_ESPERA else "-",
+                    formatar_duracao(median_age), formatar_duracao(oldest)))
+
+            stale = self.db.fetch_stale_tickets(STATUS_ESPERA, int(now - stale_seconds)) or []
+            stale_tree.delete(*stale_tree.get_children())
+            for record_id, data, numero, status, since in stale:
+                stale_tree.insert("", tk.END, values=(
+                    record_id, data, numero, status,
+                    datetime.fromtimestamp(since).strftime("%d/%m/%Y %H:%M"), formatar_duracao(now - since)))
+            stale_label.config(text=f"Tickets parados em {' / '.join(STATUS_ESPERA)} ({len(stale)})")
+
+        def show_in_main_table(event):
+            # Duplo clique: localiza o ticket na tabela principal para edição
+            item = stale_tree.focus()
+            if not item:
+                return
+            record_id, _, numero = stale_tree.item(item, 'values')[:3]
+            self._load_table(self.db.search_by_number(numero, summary=True))
+            for row in self.tree.get_children():
+                if str(self.tree.item(row, 'values')[0]) == str(record_id):
+                    self.tree.selection_set(row)
+                    self.tree.focus(row)
+                    self.tree.see(row)
+                    break
+            self.root.lift()
+
+        ttk.Button(controls_frame, text="Atualizar", command=refresh).pack(side="left", padx=10)
+        stale_tree.bind("<Double-1>", show_in_main_table)
+        refresh()
+
+    def _open_report_window(self):
+        """Escolha do mês e dos formatos do relatório; a geração roda em um processo separado."""
+        report_window = tk.Toplevel(self.root)
+        report_window.title("Gerar Relatório")
+        report_window.geometry("420x220")
+        report_window.transient(self.root)
+        report_window.grab_set()
+
+        form_frame = ttk.Frame(report_window, padding=10)
+        form_frame.pack(fill="both", expand=True)
+        ttk.Label(form_frame, text="Mês (MM/AAAA):").grid(row=0, column=0, sticky="w", pady=5)
+        month_entry = ttk.Entry(form_frame, width=12)
+        month_entry.insert(0, mes_anterior().strftime("%m/%Y"))
+        month_entry.grid(row=0, column=1, sticky="w", pady=5)
+
+        format_vars = {formato: tk.BooleanVar(value=True) for formato in FORMATOS_RELATORIO}
+        ttk.Label(form_frame, text="Formatos:").grid(row=1, column=0, sticky="w", pady=5)
+        for column, (formato, var) in enumerate(format_vars.items(), start=1):
+            ttk.Checkbutton(form_frame, text=formato.upper(), variable=var).grid(row=1, column=column, sticky="w", pady=5)
+
+        def generate():
+            try:
+                month = datetime.strptime(month_entry.get().strip(), "%m/%Y").date()
+            except ValueError:
+                messagebox.showwarning("Mês Inválido", "Informe o mês no formato MM/AAAA.", parent=report_window)
+                return
+            formats = tuple(formato for formato, var in format_vars.items() if var.get())
+            if not formats:
+                messagebox.showwarning("Formato", "Selecione ao menos um formato.", parent=report_window)
+                return
+            folder = filedialog.askdirectory(title="Pasta do Relatório", parent=report_window)
+            if not folder:
+                return
+            report_window.destroy()
+            self._run_report(month, formats, folder)
+
+        ttk.Button(form_frame, text="Escolher Pasta e Gerar", command=generate).grid(row=2, column=0, columnspan=3, pady=20)
+
+    def _run_report(self, month, formats, folder):
+        """Gera o relatório em um processo separado, acompanhando o progresso enviado por uma fila."""
+        progress_window = tk.Toplevel(self.root)
+        progress_window.title("Gerando Relatório")
+        progress_window.geometry("420x140")
+        progress_window.transient(self.root)
+
+        status_label = ttk.Label(progress_window, text="Iniciando...")
+        status_label.pack(pady=10)
+        progress_bar = ttk.Progressbar(progress_window, maximum=1)
+        progress_bar.pack(fill="x", padx=10)
+
+        # Fila do gerenciador: pode ser enviada ao processo de trabalho (uma multiprocessing.Queue não pode)
+        manager = multiprocessing.Manager()
+        queue = manager.Queue()
+        executor = ProcessPoolExecutor(max_workers=1)
+        future = executor.submit(gerar_relatorio_processo, self.db.db_name, folder, month, formats, 10, queue)
+
+        def finish():
+            executor.shutdown(wait=False)
+            manager.shutdown()
+
+        def check_progress():
+            if not progress_window.winfo_exists():
+                return
+            while not queue.empty():
+                step, total, description = queue.get_nowait()
+                progress_bar.config(maximum=total, value=step + 1)
+                status_label.config(text=f"{description}... ({step + 1} de {total})")
+            if not future.done():
+                progress_window.after(100, check_progress)
+                return
+            finish()
+            progress_window.destroy()
+            try:
+                files = future.result()
+            except Exception as e:
+                messagebox.showerror("Erro no Relatório", f"Ocorreu um erro ao gerar o relatório: {e}")
+                return
+            messagebox.showinfo("Relatório Gerado", f"{len(files)} arquivo(s) gerado(s) em:\n{folder}")
+
+        def cancel_report():
+            # Sem o gerenciador, o envio do próximo progresso falha e o processo de trabalho encerra o relatório
+            future.cancel()
+            finish()
+            progress_window.destroy()
+
+        progress_window.protocol("WM_DELETE_WINDOW", cancel_report)
+        progress_window.after(100, check_progress)
 
 
     def _fill_fields_on_select(self, event):
@@ -594,6 +1467,9 @@ class TicketApp:
         selected_item = self.tree.focus()
         if selected_item:
             values = self.tree.item(selected_item, 'values')
+            # A tabela mostra só o início da descrição e da ação: o registro completo é lido pelo id
+            # (e fica no cache do banco para a janela de edição)
+            values = self.db.fetch_record_by_id(values[0]) or values
             self.id_entry.config(state="normal") # Habilita para preencher
             self.id_entry.delete(0, tk.END)
             self.id_entry.insert(0, values[0])
@@ -609,7 +1485,7 @@ class TicketApp:
             self.descricao_entry.insert(0, values[3])
 
             self.acao_entry.delete(0, tk.END)
-            self.acao_entry.insert(0, values[4])
+            self.acao_entry.insert(0, values[4] or "")
 
             self.status_combobox.set(values[5])
         else:
@@ -623,7 +1499,7 @@ class TicketApp:
             self._load_table() # Recarrega a tabela completa se o campo de busca estiver vazio
             return
 
-        records = self.db.search_by_number(search_term)
+        records = self.db.search_by_number(search_term, summary=True)
         if records:
             self._load_table(records)
         else:
@@ -660,50 +1536,109 @@ class TicketApp:
  - acao_realizada (opcional)
  - status (opcional)
 
-Formatos aceitos: .xlsx ou .csv"""
+Formatos aceitos: .xlsx, .csv ou .csv compactado (.csv.gz / .csv.zst)
+Vários arquivos podem ser selecionados de uma só vez."""
         ), wraplength=460, justify="left").pack(pady=10)
 
         def abrir_importador():
             guide_window.destroy()
-            file_path = filedialog.askopenfilename(
-                filetypes=[("Arquivos Excel", "*.xlsx"), ("Arquivos CSV", "*.csv")]
+            file_paths = filedialog.askopenfilenames(
+                filetypes=[("Arquivos suportados", "*.xlsx *.csv *.csv.gz *.csv.zst"),
+                           ("Arquivos Excel", "*.xlsx"), ("Arquivos CSV", "*.csv"),
+                           ("CSV compactado (gzip)", "*.csv.gz"), ("CSV compactado (zstd)", "*.csv.zst")]
             )
-            if not file_path:
+            if not file_paths:
+                return
+            self._run_import(list(file_paths))
+
+        ttk.Button(guide_window, text="Selecionar Arquivos para Importar", command=abrir_importador).pack(pady=20)
+
+    def _run_import(self, file_paths):
+        """
+        Importa os arquivos em paralelo: a leitura/validação roda no pool de processos e
+        cada lote validado é gravado aqui, na thread da interface, um arquivo por vez.
+        """
+        progress_window = tk.Toplevel(self.root)
+        progress_window.title("Importação de Dados")
+        progress_window.geometry("800x400")
+        progress_window.transient(self.root)
+
+        cols = ("Arquivo", "Situação", "Registros", "Duplicados", "Linhas Rejeitadas")
+        progress_tree = ttk.Treeview(progress_window, columns=cols, show='headings', height=10)
+        for col in cols:
+            progress_tree.heading(col, text=col)
+        progress_tree.column("Arquivo", width=300)
+        progress_tree.column("Situação", width=200)
+        progress_tree.column("Registros", width=90, anchor="center")
+        progress_tree.column("Duplicados", width=90, anchor="center")
+        progress_tree.column("Linhas Rejeitadas", width=120, anchor="center")
+        progress_tree.pack(fill="both", expand=True, padx=10, pady=10)
+
+        progress_bar = ttk.Progressbar(progress_window, maximum=len(file_paths))
+        progress_bar.pack(fill="x", padx=10)
+        status_label = ttk.Label(progress_window, text=f"Processando 0 de {len(file_paths)} arquivo(s)...")
+        status_label.pack(pady=5)
+        close_button = ttk.Button(progress_window, text="Fechar", command=progress_window.destroy, state="disabled")
+        close_button.pack(pady=5)
+
+        executor = criar_executor(len(file_paths))
+        pending = {}
+        for path in file_paths:
+            item_id = progress_tree.insert("", tk.END, values=(os.path.basename(path), "Em processamento", "", "", ""))
+            pending[executor.submit(processar_arquivo, path)] = item_id
+
+        totals = {'imported': 0, 'duplicates': 0, 'rejected': 0, 'failed': 0}
+
+        def check_progress():
+            if not progress_window.winfo_exists():
+                return
+            for future in [f for f in pending if f.done()]:
+                item_id = pending.pop(future)
+                try:
+                    result = future.result()
+                except Exception as e:
+                    result = {'arquivo': progress_tree.item(item_id, 'values')[0], 'registros': [], 'hashes': [], 'erros': [], 'erro': str(e)}
+
+                # Único escritor: descarta duplicados e grava o lote deste arquivo em uma transação
+                gravar_resultado(result, self.db)
+
+                for line, reason in result['erros']:
+                    print(f"Erro na linha {line} de {result['arquivo']}: {reason}")
+
+                if result['erro']:
+                    totals['failed'] += 1
+                    situation = f"Falhou: {result['erro']}"
+                else:
+                    situation = "Importado"
+                totals['imported'] += result['importados']
+                totals['duplicates'] += result['duplicados']
+                totals['rejected'] += len(result['erros'])
+                progress_tree.item(item_id, values=(os.path.basename(result['arquivo']), situation, result['importados'],
+                                                    result['duplicados'], len(result['erros'])))
+                progress_bar.step(1)
+
+            done = len(file_paths) - len(pending)
+            status_label.config(text=f"Processando {done} de {len(file_paths)} arquivo(s)...")
+            if pending:
+                progress_window.after(100, check_progress)
                 return
 
-            try:
-                df = pd.read_excel(file_path) if file_path.endswith('.xlsx') else pd.read_csv(file_path)
-
-                expected = ['data', 'numero_ticket', 'descricao']
-                for col in expected:
-                    if col not in df.columns:
-                        messagebox.showerror("Erro", f"A coluna obrigatória '{col}' não foi encontrada no arquivo.")
-                        return
-
-                df.rename(columns=str.lower, inplace=True)
-
-                count = 0
-                for _, row in df.iterrows():
-                    try:
-                        data = pd.to_datetime(row['data']).strftime("%d/%m/%Y")
-                        self.db.add_record(
-                            data,
-                            str(row['numero_ticket']),
-                            str(row['descricao']),
-                            str(row.get('acao_realizada', '')),
-                            str(row.get('status', 'Em Andamento'))
-                        )
-                        count += 1
-                    except Exception as e:
-                        print(f"Erro na linha: {row.to_dict()} - {e}")
-
-                messagebox.showinfo("Importação Concluída", f"{count} registros importados com sucesso.")
-                self._load_table()  # Atualiza tabela e estatísticas automaticamente
-
-            except Exception as e:
-                messagebox.showerror("Erro de Importação", str(e))
+            executor.shutdown(wait=False)
+            status_label.config(text=(f"Importação concluída: {totals['imported']} registro(s) importado(s), "
+                                      f"{totals['duplicates']} duplicado(s) ignorado(s), "
+                                      f"{totals['rejected']} linha(s) rejeitada(s), {totals['failed']} arquivo(s) com falha."))
+            close_button.config(state="normal")
+            self._load_table()  # Atualiza tabela e estatísticas uma única vez
+
+        def cancel_import():
+            # Cancela os arquivos ainda na fila; os já gravados permanecem no banco
+            executor.shutdown(wait=False, cancel_futures=True)
+            progress_window.destroy()
+            if pending:
+                self._load_table()
 
-        ttk.Button(guide_window, text="Selecionar Arquivo para Importar", command=abrir_importador).pack(pady=20)
+        progress_window.protocol("WM_DELETE_WINDOW", cancel_import)
+        progress_window.after(100, check_progress)
 
 
     def _export_data(self):
@@ -717,23 +1652,183 @@ Formatos aceitos: .xlsx ou .csv"""
 
         file_path = filedialog.asksaveasfilename(
             defaultextension=".csv",
-            filetypes=[("Arquivos CSV", "*.csv"), ("Arquivos Excel", "*.xlsx")],
+            filetypes=[("Arquivos CSV", "*.csv"), ("CSV compactado (gzip)", "*.csv.gz"),
+                       ("CSV compactado (zstd)", "*.csv.zst"), ("Arquivos Excel", "*.xlsx")],
             title="Salvar Dados Como"
         )
         if not file_path:
             return
 
         try:
-            if file_path.endswith('.csv'):
-                df.to_csv(file_path, index=False, encoding='utf-8-sig')
+            if eh_csv(file_path):
+                # Compacta em fluxo conforme a extensão: o CSV descompactado não é gravado em disco
+                with abrir_arquivo(file_path, 'wt', encoding='utf-8-sig') as arquivo:
+                    df.to_csv(arquivo, index=False)
             elif file_path.endswith('.xlsx'):
                 df.to_excel(file_path, index=False)
+            else:
+                messagebox.showwarning("Exportar Dados", "Formato não suportado. Use .csv, .csv.gz, .csv.zst ou .xlsx.")
+                return
             messagebox.showinfo("Exportação Concluída", f"Dados exportados com sucesso para:\n{file_path}")
         except Exception as e:
             messagebox.showerror("Erro de Exportação", f"Ocorreu um erro ao exportar os dados: {e}")
 
+    def _sample_event_loop_lag(self, expected):
+        """Registra quanto o after() atrasou em relação ao previsto e agenda a próxima amostra."""
+        now = time.perf_counter()
+        self._lag_samples.append(max(0.0, (now - expected) * 1000))
+        self.root.after(self._lag_interval_ms, self._sample_event_loop_lag, now + self._lag_interval_ms / 1000)
+
+    def _treeview_counts(self):
+        """(janela, tabela, itens) de cada Treeview aberta, exceto as da própria janela de diagnóstico."""
+        counts = []
+        pending = [self.root]
+        while pending:
+            widget = pending.pop()
+            if widget is self.diagnostics_window:
+                continue
+            if isinstance(widget, ttk.Treeview):
+                name = "Principal" if widget is self.tree else str(widget)
+                counts.append((widget.winfo_toplevel().title(), name, len(widget.get_children())))
+            pending.extend(widget.winfo_children())
+        return sorted(counts)
+
+    def _diagnostics(self):
+        """Retrato atual do aplicativo para a janela de diagnóstico (sem acessar o banco)."""
+        samples = sorted(self._lag_samples)
+        lag = {
+            "atual_ms": self._lag_samples[-1] if samples else 0.0,
+            "p50_ms": samples[len(samples) // 2] if samples else 0.0,
+            "p95_ms": samples[min(len(samples) - 1, int(len(samples) * 0.95))] if samples else 0.0,
+            "max_ms": samples[-1] if samples else 0.0,
+        }
+        rss, peak = memoria_processo()
+        # O aplicativo desenha com Figure + Agg; o pyplot só aparece se algum módulo o importar
+        pyplot = sys.modules.get("matplotlib.pyplot")
+        monitor = self.db.monitor
+        if monitor is not None:
+            methods = sorted(monitor.resumo()["metodos"], key=lambda stats: stats["max_ms"], reverse=True)
+            slow = monitor.consultas_lentas()
+        else:
+            methods, slow = [], []
+        return {
+            "laco_eventos": lag,
+            "memoria_kb": {"rss": rss, "pico": peak},
+            "figuras_pyplot": len(pyplot.get_fignums()) if pyplot else 0,
+            "graficos_pendentes": len(self._chart_pending),
+            "graficos_em_cache": len(self._chart_cache),
+            "cache_registros": {"itens": len(self.db.record_cache), "acertos": self.db.record_cache.acertos,
+                                "faltas": self.db.record_cache.faltas},
+            "tabelas": self._treeview_counts(),
+            "monitoramento": monitor is not None,
+            "metodos": methods[:15],
+            "lentas": slow[:20],
+        }
+
+    def _open_diagnostics_window(self):
+        """Janela de diagnóstico: atraso da interface, memória, tabelas abertas e chamadas lentas ao banco."""
+        if self.diagnostics_window is not None and self.diagnostics_window.winfo_exists():
+            self.diagnostics_window.lift()
+            return
+        diagnostics_window = tk.Toplevel(self.root)
+        diagnostics_window.title("Diagnóstico")
+        diagnostics_window.geometry("900x640")
+        self.diagnostics_window = diagnostics_window
+
+        summary_frame = ttk.LabelFrame(diagnostics_window, text="Aplicativo", padding=10)
+        summary_frame.pack(fill="x", padx=10, pady=5)
+        lag_label = ttk.Label(summary_frame)
+        lag_label.pack(anchor="w")
+        memory_label = ttk.Label(summary_frame)
+        memory_label.pack(anchor="w")
+        figures_label = ttk.Label(summary_frame)
+        figures_label.pack(anchor="w")
+        cache_label = ttk.Label(summary_frame)
+        cache_label.pack(anchor="w")
+
+        def create_tree(title, columns, widths, height):
+            frame = ttk.LabelFrame(diagnostics_window, text=title, padding=5)
+            frame.pack(fill="both", expand=True, padx=10, pady=5)
+            tree = ttk.Treeview(frame, columns=columns, show='headings', height=height)
+            for column, width in zip(columns, widths):
+                tree.heading(column, text=column)
+                tree.column(column, width=width, anchor="w" if width > 150 else "center")
+            tree.pack(side="left", fill="both", expand=True)
+            scrollbar = ttk.Scrollbar(frame, orient="vertical", command=tree.yview)
+            tree.configure(yscrollcommand=scrollbar.set)
+            scrollbar.pack(side="right", fill="y")
+            return tree
+
+        tables_tree = create_tree("Tabelas abertas", ("Janela", "Tabela", "Itens"), (300, 200, 100), 4)
+        methods_tree = create_tree("Chamadas ao banco (maior tempo primeiro)",
+                                   ("Método", "Chamadas", "Média (ms)", "p95 (ms)", "Máx. (ms)"),
+                                   (250, 90, 100, 100, 100), 6)
+        slow_tree = create_tree("Consultas lentas recentes", ("Quando", "Método", "ms", "Comando"),
+                                (160, 160, 80, 450), 6)
+
+        def fill(tree, rows):
+            tree.delete(*tree.get_children())
+            for row in rows:
+                tree.insert("", tk.END, values=row)
+
+        def refresh():
+            if not diagnostics_window.winfo_exists():
+                return
+            data = self._diagnostics()
+            lag = data["laco_eventos"]
+            lag_label.config(text=f"Atraso do laço de eventos: atual {lag['atual_ms']:.1f} ms | mediana {lag['p50_ms']:.1f} ms | "
+                                  f"p95 {lag['p95_ms']:.1f} ms | máximo {lag['max_ms']:.1f} ms (último minuto)")
+            memory = data["memoria_kb"]
+            memory_text = " | ".join(f"{name} {value / 1024:.1f} MB" for name, value
+                                     in (("atual", memory["rss"]), ("pico", memory["pico"])) if value is not None)
+            memory_label.config(text=f"Memória (RSS): {memory_text or 'indisponível neste sistema'}")
+            figures_label.config(text=f"Figuras matplotlib abertas (pyplot): {data['figuras_pyplot']} | "
+                                      f"gráficos em renderização: {data['graficos_pendentes']} | "
+                                      f"imagens em cache: {data['graficos_em_cache']}")
+            cache = data["cache_registros"]
+            cache_label.config(text=f"Cache de registros: {cache['itens']} itens | {cache['acertos']} acertos | "
+                                    f"{cache['faltas']} consultas ao banco")
+            fill(tables_tree, data["tabelas"])
+            if data["monitoramento"]:
+                fill(methods_tree, [(stats["metodo"], stats["chamadas"], f"{stats['media_ms']:.2f}", f"<= {stats['p95_ms']:g}",
+                                     f"{stats['max_ms']:.2f}") for stats in data["metodos"]])
+            else:
+                fill(methods_tree, [("Monitoramento desligado (TICKETS_MONITORAMENTO=0)", "", "", "", "")])
+            fill(slow_tree, [(entry["quando"], entry["metodo"] or "", f"{entry['ms']:.1f}", entry["impressao"])
+                             for entry in data["lentas"]])
+            diagnostics_window.after(1000, refresh)
+
+        def copy_report():
+            data = self._diagnostics()
+            lines = [f"Diagnóstico - {datetime.now():%d/%m/%Y %H:%M:%S}",
+                     "Laço de eventos: " + ", ".join(f"{key} {value:.1f}" for key, value in data["laco_eventos"].items()),
+                     f"Memória (KB): RSS {data['memoria_kb']['rss']}, pico {data['memoria_kb']['pico']}",
+                     f"Figuras pyplot: {data['figuras_pyplot']}, gráficos pendentes: {data['graficos_pendentes']}"]
+            lines += [f"Tabela {window} / {name}: {count} itens" for window, name, count in data["tabelas"]]
+            lines += [f"{stats['metodo']}: {stats['chamadas']} chamadas, média {stats['media_ms']} ms, máx. {stats['max_ms']} ms"
+                      for stats in data["metodos"]]
+            lines += [f"Lenta {entry['quando']} {entry['metodo']} {entry['ms']} ms: {entry['impressao']}"
+                      for entry in data["lentas"]]
+            self.root.clipboard_clear()
+            self.root.clipboard_append("\n".join(lines))
+
+        def reset_statistics():
+            if self.db.monitor is not None:
+                self.db.monitor.limpar()
+            self._lag_samples.clear()
+            fill(methods_tree, [])
+            fill(slow_tree, [])
+
+        button_frame = ttk.Frame(diagnostics_window, padding=10)
+        button_frame.pack(fill="x")
+        ttk.Button(button_frame, text="Copiar Relatório", command=copy_report).pack(side="left", padx=5)
+        ttk.Button(button_frame, text="Zerar Estatísticas", command=reset_statistics).pack(side="left", padx=5)
+        ttk.Button(button_frame, text="Fechar", command=diagnostics_window.destroy).pack(side="right", padx=5)
+        refresh()
+
 
 if __name__ == "__main__":
+    multiprocessing.freeze_support()  # Necessário para o pool de importação no executável (PyInstaller)
     root = tk.Tk()
     app = TicketApp(root)
     root.mainloop()
\ No newline at end of file
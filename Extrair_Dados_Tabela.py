@@ -0,0 +1,206 @@
+import argparse
+import csv
+import json
+import os
+import sqlite3
+import sys
+from datetime import date, datetime
+from pathlib import Path
+
+from banco_dados import dia_sql
+from compressao import abrir_arquivo, detectar_codec
+
+# Extração de dados da tabela 'registros' pela linha de comando, sem interface gráfica.
+# Os registros são lidos em lotes direto do SQLite e gravados em fluxo, sem carregar a tabela em memória.
+#
+# Exemplos:
+#   python Extrair_Dados_Tabela.py --db tickets.db -o dados_extraidos.csv.gz
+#   python Extrair_Dados_Tabela.py --status Resolvido --desde 01/07/2025 --colunas data,numero_ticket -o - --formato jsonl
+#   python Extrair_Dados_Tabela.py --agregado mes --agregado status -o resumo.csv
+
+COLUNAS = ["id", "data", "numero_ticket", "descricao", "acao_realizada", "status"]
+# Colunas inteiras na saída Parquet (as demais, e as dimensões de --agregado, são texto)
+COLUNAS_INTEIRAS = ("id", "total")
+
+# Data 'DD/MM/AAAA' convertida para 'AAAA-MM-DD' (rótulo do agrupamento por dia; os filtros usam dia_sql())
+DATA_ISO = "SUBSTR(data, 7, 4) || '-' || SUBSTR(data, 4, 2) || '-' || SUBSTR(data, 1, 2)"
+
+# Dimensões disponíveis para --agregado
+AGRUPAMENTOS = {
+    "status": "COALESCE(status, '')",
+    "dia": DATA_ISO,
+    "mes": "SUBSTR(data, 7, 4) || '-' || SUBSTR(data, 4, 2)",
+    "ano": "SUBSTR(data, 7, 4)",
+}
+
+FORMATOS = ("csv", "jsonl", "parquet")
+CODECS = {"auto": "auto", "nenhuma": None, "gzip": "gzip", "zstd": "zstd"}
+
+
+def _dia(texto):
+    """
+    Converte uma data 'DD/MM/AAAA' ou 'AAAA-MM-DD' no número do dia (dias desde 01/01/1970), o mesmo
+    valor de dia_sql(): o filtro por data usa o índice do dia em vez de percorrer a tabela.
+    """
+    for formato in ("%d/%m/%Y", "%Y-%m-%d"):
+        try:
+            return (datetime.strptime(texto, formato).date() - date(1970, 1, 1)).days
+        except ValueError:
+            continue
+    raise argparse.ArgumentTypeError(f"Data inválida: '{texto}'. Use DD/MM/AAAA ou AAAA-MM-DD.")
+
+
+def _lista_colunas(texto):
+    colunas = [c.strip() for c in texto.split(",") if c.strip()]
+    invalidas = [c for c in colunas if c not in COLUNAS]
+    if invalidas or not colunas:
+        raise argparse.ArgumentTypeError(f"Colunas inválidas: {', '.join(invalidas) or texto}. Disponíveis: {', '.join(COLUNAS)}.")
+    return colunas
+
+
+def criar_parser():
+    parser = argparse.ArgumentParser(
+        description="Extrai os registros do banco de tickets para CSV, JSON Lines ou Parquet.")
+    parser.add_argument("--db", default="tickets.db", help="Caminho do banco SQLite (padrão: tickets.db).")
+    parser.add_argument("-o", "--saida", default="dados_extraidos.csv",
+                        help="Arquivo de saída ou '-' para a saída padrão (padrão: dados_extraidos.csv).")
+    parser.add_argument("--formato", choices=FORMATOS,
+                        help="Formato de saída. Se omitido, é deduzido da extensão do arquivo (padrão: csv).")
+    parser.add_argument("--compressao", choices=list(CODECS), default="auto",
+                        help="Compactação da saída. 'auto' usa a extensão (.gz/.zst).")
+    parser.add_argument("--colunas", type=_lista_colunas, default=COLUNAS,
+                        help=f"Colunas separadas por vírgula (padrão: {','.join(COLUNAS)}).")
+    parser.add_argument("--status", action="append", help="Filtra por status (pode ser repetido).")
+    parser.add_argument("--ticket", help="Filtra pelo número exato do ticket.")
+    parser.add_argument("--desde", type=_dia, help="Data inicial (inclusive), DD/MM/AAAA.")
+    parser.add_argument("--ate", type=_dia, help="Data final (inclusive), DD/MM/AAAA.")
+    parser.add_argument("--contem", help="Filtra registros cuja descrição contém o texto.")
+    parser.add_argument("--agregado", action="append", choices=list(AGRUPAMENTOS),
+                        help="Emite apenas contagens agrupadas pela dimensão (pode ser repetido).")
+    parser.add_argument("--lote", type=int, default=10000, help="Linhas lidas por lote (padrão: 10000).")
+    return parser
+
+
+def montar_consulta(args):
+    """Monta a consulta SQL, os parâmetros e as colunas de saída a partir dos argumentos."""
+    condicoes, params = [], []
+    if args.status:
+        condicoes.append(f"status IN ({', '.join('?' * len(args.status))})")
+        params.extend(args.status)
+    if args.ticket:
+        condicoes.append("numero_ticket = ?")
+        params.append(args.ticket)
+    if args.desde is not None:  # O dia 0 (01/01/1970) também é um limite
+        condicoes.append(f"{dia_sql()} >= ?")
+        params.append(args.desde)
+    if args.ate is not None:
+        condicoes.append(f"{dia_sql()} <= ?")
+        params.append(args.ate)
+    if args.contem:
+        condicoes.append("descricao LIKE ?")
+        params.append(f"%{args.contem}%")
+    where = f" WHERE {' AND '.join(condicoes)}" if condicoes else ""
+
+    if args.agregado:
+        chaves = [f"{AGRUPAMENTOS[d]} AS {d}" for d in args.agregado]
+        grupos = ", ".join(str(i + 1) for i in range(len(args.agregado)))
+        query = f"SELECT {', '.join(chaves)}, COUNT(*) AS total FROM registros{where} GROUP BY {grupos} ORDER BY {grupos}"
+        return query, params, list(args.agregado) + ["total"]
+
+    query = f"SELECT {', '.join(args.colunas)} FROM registros{where} ORDER BY id"
+    return query, params, list(args.colunas)
+
+
+def _lotes(cursor, tamanho):
+    while True:
+        linhas = cursor.fetchmany(tamanho)
+        if not linhas:
+            return
+        yield linhas
+
+
+def escrever_csv(cursor, colunas, destino, codec, lote):
+    with abrir_arquivo(destino, "wt", codec=codec) as arquivo:
+        writer = csv.writer(arquivo)
+        writer.writerow(colunas)
+        for linhas in _lotes(cursor, lote):
+            writer.writerows(linhas)
+
+
+def escrever_jsonl(cursor, colunas, destino, codec, lote):
+    with abrir_arquivo(destino, "wt", codec=codec, newline="\n") as arquivo:
+        for linhas in _lotes(cursor, lote):
+            arquivo.writelines(json.dumps(dict(zip(colunas, linha)), ensure_ascii=False) + "\n" for linha in linhas)
+
+
+def escrever_parquet(cursor, colunas, destino, codec, lote):
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise RuntimeError("A saída Parquet requer o pacote 'pyarrow' (pip install pyarrow).")
+
+    # No Parquet a compactação é interna ao arquivo (por coluna), não um fluxo externo
+    compressao = {"gzip": "gzip", "zstd": "zstd"}.get(codec, "snappy")
+    # Esquema fixo pelas colunas: inferido do primeiro lote, uma coluna só com NULL viraria tipo 'null'
+    # e os lotes seguintes, com valores, não poderiam ser gravados
+    esquema = pa.schema([(c, pa.int64() if c in COLUNAS_INTEIRAS else pa.string()) for c in colunas])
+    with pq.ParquetWriter(destino, esquema, compression=compressao) as writer:
+        for linhas in _lotes(cursor, lote):
+            writer.write_table(pa.Table.from_pydict({c: list(v) for c, v in zip(colunas, zip(*linhas))}, schema=esquema))
+
+
+ESCRITORES = {"csv": escrever_csv, "jsonl": escrever_jsonl, "parquet": escrever_parquet}
+
+
+def _deduzir_formato(saida):
+    nome = saida.lower()
+    if detectar_codec(nome):
+        nome = os.path.splitext(nome)[0]
+    if nome.endswith(".jsonl") or nome.endswith(".ndjson"):
+        return "jsonl"
+    if nome.endswith(".parquet"):
+        return "parquet"
+    return "csv"
+
+
+def main(argv=None):
+    args = criar_parser().parse_args(argv)
+
+    if not os.path.exists(args.db):
+        print(f"Banco de dados não encontrado: {args.db}", file=sys.stderr)
+        return 2
+
+    formato = args.formato or ("csv" if args.saida == "-" else _deduzir_formato(args.saida))
+    codec = CODECS[args.compressao]
+    if args.saida == "-":
+        destino = sys.stdout.buffer
+        if codec == "auto":
+            codec = None
+    else:
+        destino = args.saida
+        if codec == "auto":
+            codec = detectar_codec(args.saida)
+
+    query, params, colunas = montar_consulta(args)
+
+    # Somente leitura: nunca cria um banco vazio nem bloqueia gravações do aplicativo
+    uri = Path(args.db).resolve().as_uri() + "?mode=ro"
+    conn = sqlite3.connect(uri, uri=True)
+    try:
+        cursor = conn.execute(query, params)
+        ESCRITORES[formato](cursor, colunas, destino, codec, max(args.lote, 1))
+    except BrokenPipeError:
+        # Saída interrompida pelo consumidor (ex.: '| head'); encerra silenciosamente
+        sys.stderr.close()
+        return 0
+    except (sqlite3.Error, RuntimeError) as e:
+        print(f"Erro na extração: {e}", file=sys.stderr)
+        return 1
+    finally:
+        conn.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,319 @@
+import numpy as np
+
+# Funções de análise vetorizadas sobre arrays NumPy, sem dependência da interface (Tk) nem do pandas.
+# As datas são representadas como número do dia (dias desde 01/01/1970) e os status como códigos inteiros.
+
+EPOCA = np.datetime64('1970-01-01', 'D')
+
+
+def codificar_status(nomes):
+    """Converte uma sequência de nomes de status em (códigos inteiros, lista ordenada de nomes)."""
+    categorias, codigos = np.unique(np.asarray(nomes, dtype=object).astype(str), return_inverse=True)
+    return codigos.astype(np.int64), categorias.tolist()
+
+
+def resumo_para_arrays(linhas):
+    """Converte as linhas do resumo diário (dia, status, total) em (dias, códigos de status, totais, nomes de status)."""
+    if not linhas:
+        vazio = np.zeros(0, dtype=np.int64)
+        return vazio, vazio, vazio, []
+    dias, status, totais = zip(*linhas)
+    codigos, nomes = codificar_status(status)
+    return np.asarray(dias, dtype=np.int64), codigos, np.asarray(totais, dtype=np.int64), nomes
+
+
+def matriz_dia_status(dias, status, totais=None, quantidade_status=None):
+    """
+    Monta a matriz densa de contagens [dia, status] entre o primeiro e o último dia com dados.
+    Retorna (primeiro_dia, matriz). Dias sem registros ficam com zero.
+    """
+    if len(dias) == 0:
+        return 0, np.zeros((0, quantidade_status or 0), dtype=np.int64)
+    quantidade_status = quantidade_status or int(status.max()) + 1
+    inicio = int(dias.min())
+    quantidade_dias = int(dias.max()) - inicio + 1
+    indices = (dias - inicio) * quantidade_status + status
+    contagens = np.bincount(indices, weights=totais, minlength=quantidade_dias * quantidade_status)
+    return inicio, contagens.round().astype(np.int64).reshape(quantidade_dias, quantidade_status)
+
+
+def _somar_grupos(matriz, grupos):
+    """Soma as linhas consecutivas da matriz que pertencem ao mesmo grupo (grupos em ordem crescente)."""
+    inicios = np.flatnonzero(np.r_[True, grupos[1:] != grupos[:-1]])
+    return grupos[inicios], np.add.reduceat(matriz, inicios, axis=0)
+
+
+def agrupar_semanas(inicio, matriz):
+    """
+    Reamostra a matriz diária para semanas iniciando na segunda-feira.
+    Retorna (primeiro dia de cada semana, matriz semanal).
+    """
+    if len(matriz) == 0:
+        return np.zeros(0, dtype=np.int64), matriz
+    dias = inicio + np.arange(len(matriz))
+    # 01/01/1970 foi uma quinta-feira: deslocando 3 dias, a divisão por 7 separa as semanas nas segundas
+    semanas, somas = _somar_grupos(matriz, (dias + 3) // 7)
+    return semanas * 7 - 3, somas
+
+
+def agrupar_meses(inicio, matriz):
+    """Reamostra a matriz diária para meses. Retorna (meses como datetime64[M], matriz mensal)."""
+    if len(matriz) == 0:
+        return np.zeros(0, dtype='datetime64[M]'), matriz
+    meses = (EPOCA + inicio + np.arange(len(matriz))).astype('datetime64[M]')
+    chaves, somas = _somar_grupos(matriz, meses.astype(np.int64))
+    return chaves.astype('datetime64[M]'), somas
+
+
+def reduzir_serie(valores, max_pontos):
+    """
+    Reduz uma série longa somando blocos de 'passo' pontos consecutivos, para no máximo 'max_pontos' pontos.
+    Retorna (passo, série reduzida). Séries curtas são devolvidas sem alteração (passo 1).
+    """
+    passo = max(1, int(np.ceil(len(valores) / max_pontos)))
+    if passo == 1:
+        return 1, valores
+    sobra = (-len(valores)) % passo
+    completos = np.concatenate([valores, np.zeros((sobra,) + valores.shape[1:], dtype=valores.dtype)])
+    return passo, completos.reshape((-1, passo) + valores.shape[1:]).sum(axis=1)
+
+
+def dias_para_datas(dias):
+    """Converte números de dia em datetime64[D]."""
+    return EPOCA + np.asarray(dias, dtype=np.int64)
+
+
+# Indicadores ------------------------------------------------------------------------------------
+
+# Status considerados como ticket tratado nos indicadores
+STATUS_TRATADOS = ('Resolvido', 'Fechado')
+
+PERIODOS = ('dia', 'semana', 'mes', 'ano')
+
+
+def dia_de(data):
+    """Número do dia (dias desde 01/01/1970) de um date/datetime."""
+    return int((np.datetime64(data, 'D') - EPOCA).astype(np.int64))
+
+
+def inicio_semana(dia):
+    """Número do dia da segunda-feira da semana do dia (funciona com escalares e arrays)."""
+    return (dia + 3) // 7 * 7 - 3
+
+
+def inicio_mes(dia):
+    """Número do dia do primeiro dia do mês do dia (funciona com escalares e arrays)."""
+    return (EPOCA + np.asarray(dia, dtype=np.int64)).astype('datetime64[M]').astype('datetime64[D]').astype(np.int64)
+
+
+def chaves_periodo(dias, periodo):
+    """
+    Converte números de dia na chave do período: o próprio dia, o dia da segunda-feira da semana,
+    o mês (datetime64[M] como inteiro, meses desde 01/1970) ou o ano.
+    """
+    dias = np.asarray(dias, dtype=np.int64)
+    if periodo == 'dia':
+        return dias
+    if periodo == 'semana':
+        return inicio_semana(dias)
+    meses = (EPOCA + dias).astype('datetime64[M]').astype(np.int64)
+    if periodo == 'mes':
+        return meses
+    if periodo == 'ano':
+        return meses // 12 + 1970
+    raise ValueError(f"Período inválido: {periodo}. Use {', '.join(PERIODOS)}.")
+
+
+def rotulo_periodo(chave, periodo):
+    """Rótulo legível da chave de período: DD/MM/AAAA para dia e semana, MM/AAAA para mês, AAAA para ano."""
+    if periodo in ('dia', 'semana'):
+        return (EPOCA + int(chave)).astype(object).strftime('%d/%m/%Y')
+    if periodo == 'mes':
+        return f"{int(chave) % 12 + 1:02d}/{int(chave) // 12 + 1970}"
+    return str(int(chave))
+
+
+def contar_por_periodo(dias, periodo, totais=None):
+    """
+    Conta os registros por período. 'totais' são os pesos de cada linha (ex.: o resumo diário já agregado).
+    Retorna (chaves ordenadas, contagens), sem os períodos vazios.
+    """
+    chaves = chaves_periodo(dias, periodo)
+    if len(chaves) == 0:
+        return chaves, np.zeros(0, dtype=np.int64)
+    inicio = int(chaves.min())
+    contagens = np.bincount(chaves - inicio, weights=totais).round().astype(np.int64)
+    presentes = np.flatnonzero(contagens)
+    return presentes + inicio, contagens[presentes]
+
+
+def contar_por_status(status, quantidade_status, totais=None):
+    """Total por código de status (posição i = status i)."""
+    return np.bincount(status, weights=totais, minlength=quantidade_status).round().astype(np.int64)
+
+
+def contar_periodo_status(dias, status, periodo, quantidade_status, totais=None):
+    """Tabela cruzada período × status. Retorna (chaves ordenadas, matriz [período, status])."""
+    chaves = chaves_periodo(dias, periodo)
+    if len(chaves) == 0:
+        return chaves, np.zeros((0, quantidade_status), dtype=np.int64)
+    unicas, posicoes = np.unique(chaves, return_inverse=True)
+    contagens = np.bincount(posicoes * quantidade_status + status, weights=totais,
+                            minlength=len(unicas) * quantidade_status)
+    return unicas, contagens.round().astype(np.int64).reshape(len(unicas), quantidade_status)
+
+
+def media_movel(valores, janela):
+    """
+    Média móvel simples (janela terminando em cada posição) calculada por soma acumulada.
+    As primeiras posições usam os pontos disponíveis (janela parcial).
+    """
+    valores = np.asarray(valores, dtype=np.float64)
+    if len(valores) == 0:
+        return valores
+    acumulado = np.concatenate([[0.0], np.cumsum(valores, axis=0)])
+    fim = np.arange(1, len(valores) + 1)
+    inicio = np.maximum(fim - janela, 0)
+    return (acumulado[fim] - acumulado[inicio]) / (fim - inicio)
+
+
+def agregados_barras(linhas):
+    """
+    Agregados dos gráficos de barras a partir do resumo diário: {'Total' | 'Mês' | 'Ano': (rótulos, valores, título)}.
+    Registros sem status entram apenas no Total Geral.
+    """
+    dias, status, totais, nomes = resumo_para_arrays(linhas)
+    por_status = contar_por_status(status, len(nomes), totais)
+    meses, mensais = contar_por_periodo(dias, 'mes', totais)
+    anos, anuais = contar_por_periodo(dias, 'ano', totais)
+    return {
+        "Total": ([nome for nome in nomes if nome] + ["Total Geral"],
+                  [int(total) for nome, total in zip(nomes, por_status) if nome] + [int(por_status.sum())],
+                  "Total de Tickets por Status e Geral"),
+        "Mês": ([rotulo_periodo(mes, 'mes') for mes in meses], mensais.tolist(), "Tickets por Mês"),
+        "Ano": ([rotulo_periodo(ano, 'ano') for ano in anos], anuais.tolist(), "Tickets por Ano"),
+    }
+
+
+def indicadores_intervalo(dias, status, nomes, primeiro, ultimo, totais=None, tratados=STATUS_TRATADOS):
+    """Totais de um intervalo de dias (inclusive): registros, tratados e quantidade por status."""
+    dias = np.asarray(dias, dtype=np.int64)
+    pesos = np.ones(len(dias), dtype=np.int64) if totais is None else np.asarray(totais, dtype=np.int64)
+    dentro = (dias >= primeiro) & (dias <= ultimo)
+    por_status = contar_por_status(status[dentro], len(nomes), pesos[dentro])
+    return {
+        'total': int(por_status.sum()),
+        'tratados': int(sum(por_status[i] for i, nome in enumerate(nomes) if nome in tratados)),
+        'por_status': {nome: int(total) for nome, total in zip(nomes, por_status) if total},
+    }
+
+
+def indicadores_tratados(dias, status, nomes, hoje, totais=None, tratados=STATUS_TRATADOS):
+    """
+    Indicadores dos balões de estatísticas: total de tickets e tickets tratados hoje, na semana
+    (desde segunda-feira) e no mês (desde o dia 1). 'hoje' é o número do dia de referência.
+    """
+    dias = np.asarray(dias, dtype=np.int64)
+    pesos = np.ones(len(dias), dtype=np.int64) if totais is None else np.asarray(totais, dtype=np.int64)
+    codigos_tratados = [i for i, nome in enumerate(nomes) if nome in tratados]
+    pesos_tratados = np.where(np.isin(status, codigos_tratados), pesos, 0)
+    semana = int(inicio_semana(hoje))
+    mes = int(inicio_mes(hoje))
+    return {
+        'total': int(pesos.sum()),
+        'hoje': int(pesos_tratados[dias == hoje].sum()),
+        'semana': int(pesos_tratados[dias >= semana].sum()),
+        'mes': int(pesos_tratados[dias >= mes].sum()),
+        'inicio_semana': semana,
+        'inicio_mes': mes,
+    }
+
+
+# Envelhecimento (tempo em cada status) ----------------------------------------------------------
+
+# Status de espera acompanhados no painel de envelhecimento
+STATUS_ESPERA = ('Aguardando Parceiro', 'Pendente de Resposta')
+
+PERCENTIS = (50, 90, 95)
+
+
+def percentis_por_status(status, duracoes, percentis=PERCENTIS):
+    """
+    Percentis do tempo (em segundos) passado em cada status.
+    Retorna {status: {'quantidade': n, 'p50': ..., 'p90': ..., 'p95': ..., 'max': ...}}.
+    """
+    if len(duracoes) == 0:
+        return {}
+    codigos, nomes = codificar_status(status)
+    duracoes = np.asarray(duracoes, dtype=np.float64)
+    # Ordena por status e, dentro de cada status, pela duração: cada grupo vira um intervalo contíguo
+    ordem = np.lexsort((duracoes, codigos))
+    codigos, duracoes = codigos[ordem], duracoes[ordem]
+    limites = np.searchsorted(codigos, np.arange(len(nomes) + 1))
+    resultado = {}
+    for i, nome in enumerate(nomes):
+        grupo = duracoes[limites[i]:limites[i + 1]]
+        valores = np.percentile(grupo, percentis)
+        resultado[nome] = {'quantidade': len(grupo), 'max': float(grupo[-1]),
+                           **{f'p{p}': float(v) for p, v in zip(percentis, valores)}}
+    return resultado
+
+
+def idades_abertas(status, desde, agora):
+    """Para os registros ainda no status: {status: (quantidade, idade mediana, idade máxima)} em segundos."""
+    if len(desde) == 0:
+        return {}
+    idades = agora - np.asarray(desde, dtype=np.float64)
+    return {nome: (valores['quantidade'], valores['p50'], valores['max'])
+            for nome, valores in percentis_por_status(status, idades, (50,)).items()}
+
+
+def formatar_duracao(segundos):
+    """Duração legível: '3d 4h', '5h 20min' ou '12min'."""
+    if segundos is None:
+        return "-"
+    minutos = int(segundos) // 60
+    dias, minutos = divmod(minutos, 1440)
+    horas, minutos = divmod(minutos, 60)
+    if dias:
+        return f"{dias}d {horas}h"
+    if horas:
+        return f"{horas}h {minutos}min"
+    return f"{minutos}min"
+
+
+# Calendário e tendência -------------------------------------------------------------------------
+
+DIAS_SEMANA = ('Seg', 'Ter', 'Qua', 'Qui', 'Sex', 'Sáb', 'Dom')
+
+
+def serie_diaria(linhas):
+    """Total por dia (todos os status) a partir do resumo diário. Retorna (primeiro dia, série densa)."""
+    dias, status, totais, nomes = resumo_para_arrays(linhas)
+    inicio, matriz = matriz_dia_status(dias, status, totais, len(nomes))
+    return inicio, matriz.sum(axis=1)
+
+
+def matriz_calendario(inicio, valores):
+    """
+    Organiza a série diária iniciada em 'inicio' na grade [dia da semana, semana] (segunda-feira na linha 0).
+    Dias fora da série ficam como NaN. Retorna (segunda-feira da primeira semana, grade 7 × semanas).
+    """
+    primeira = int(inicio_semana(inicio))
+    deslocamento = inicio - primeira
+    semanas = -(-(deslocamento + len(valores)) // 7)
+    grade = np.full(semanas * 7, np.nan)
+    grade[deslocamento:deslocamento + len(valores)] = valores
+    return primeira, grade.reshape(semanas, 7).T
+
+
+def previsao_linear(valores, janela, horizonte):
+    """
+    Previsão dos próximos 'horizonte' pontos pela reta de mínimos quadrados dos últimos 'janela' pontos,
+    sem valores negativos.
+    """
+    recentes = np.asarray(valores[-janela:], dtype=np.float64)
+    if len(recentes) < 2:
+        return np.full(horizonte, recentes[-1] if len(recentes) else 0.0)
+    inclinacao, intercepto = np.polyfit(np.arange(len(recentes)), recentes, 1)
+    return np.clip(inclinacao * (len(recentes) + np.arange(horizonte)) + intercepto, 0, None)
@@ -0,0 +1,127 @@
+import heapq
+import math
+from bisect import bisect_left, bisect_right, insort
+from itertools import islice
+
+from banco_dados import DatabaseManager, normalizar_texto
+
+# Sugestões para os campos de texto livre (Descrição e Ação Realizada).
+# Índice de prefixos em memória: lista ordenada de (texto normalizado, texto) consultada por busca binária,
+# dividida em blocos de até 2 * BLOCO itens. Os candidatos são ordenados pela frequência, que perde metade
+# do peso a cada MEIA_VIDA registros sem uso (um texto muito usado há anos cede lugar aos textos usados agora).
+#
+# Como todos os pesos decaem no mesmo ritmo, a ordem não muda com o tempo: cada texto guarda o logaritmo do
+# peso referido ao registro zero, log2(quantidade) + último uso / MEIA_VIDA, que só muda quando o texto é
+# usado de novo. Cada bloco mantém também os seus textos do maior para o menor peso; assim um prefixo curto,
+# que casa com boa parte dos textos, percorre só os blocos das pontas e o início de cada bloco do meio,
+# em vez de ordenar todos os candidatos (centenas de milhares de textos distintos).
+
+SUGESTOES = 8
+MEIA_VIDA = 5000
+BLOCO = 512
+_FIM_PREFIXO = '\U0010ffff'
+
+
+def _somar_log2(a, b):
+    """log2(2**a + 2**b) sem estouro."""
+    maior, menor = max(a, b), min(a, b)
+    return maior + math.log2(1 + 2 ** (menor - maior))
+
+
+class IndicePrefixos:
+    def __init__(self, usos=()):
+        """'usos': (texto, quantidade de registros, id do registro mais recente), como em fetch_text_usage."""
+        self._pontos = {}
+        self._blocos = []   # Partes da lista ordenada de (texto normalizado, texto)
+        self._inicios = []  # Primeiro item de cada bloco, para achar o bloco por busca binária
+        self._ordens = []   # Textos de cada bloco do maior para o menor peso
+        self._ultimo = 0
+        self.carregar(usos)
+
+    def __len__(self):
+        return len(self._pontos)
+
+    def _ordenar_bloco(self, indice):
+        self._ordens[indice] = sorted((texto for _, texto in self._blocos[indice]),
+                                      key=self._pontos.__getitem__, reverse=True)
+
+    def carregar(self, usos):
+        """Substitui o conteúdo do índice (montagem única a partir do banco)."""
+        self._pontos = {}
+        self._ultimo = 0
+        for texto, quantidade, ultimo in usos or ():
+            texto = (texto or '').strip()
+            if not texto or not quantidade:
+                continue
+            ultimo = ultimo or 0
+            pontos = math.log2(quantidade) + ultimo / MEIA_VIDA
+            anterior = self._pontos.get(texto)  # Textos que só diferem pelos espaços das pontas
+            self._pontos[texto] = pontos if anterior is None else _somar_log2(anterior, pontos)
+            self._ultimo = max(self._ultimo, ultimo)
+        chaves = sorted((normalizar_texto(texto), texto) for texto in self._pontos)
+        self._blocos = [chaves[inicio:inicio + BLOCO] for inicio in range(0, len(chaves), BLOCO)]
+        self._inicios = [bloco[0] for bloco in self._blocos]
+        self._ordens = [None] * len(self._blocos)
+        for indice in range(len(self._blocos)):
+            self._ordenar_bloco(indice)
+
+    def registrar(self, texto):
+        """Conta um novo uso do texto (um registro incluído); textos novos entram na posição ordenada."""
+        texto = (texto or '').strip()
+        if not texto:
+            return
+        self._ultimo += 1
+        agora = self._ultimo / MEIA_VIDA
+        anterior = self._pontos.get(texto)
+        self._pontos[texto] = agora if anterior is None else _somar_log2(anterior, agora)
+        item = (normalizar_texto(texto), texto)
+        if not self._blocos:
+            self._blocos, self._inicios, self._ordens = [[item]], [item], [[texto]]
+            return
+        indice = max(bisect_right(self._inicios, item) - 1, 0)
+        bloco = self._blocos[indice]
+        if anterior is None:
+            insort(bloco, item)
+            self._inicios[indice] = bloco[0]
+            if len(bloco) > 2 * BLOCO:
+                self._blocos[indice + 1:indice + 1] = [bloco[BLOCO:]]
+                self._inicios[indice + 1:indice + 1] = [bloco[BLOCO]]
+                self._ordens[indice + 1:indice + 1] = [None]
+                del bloco[BLOCO:]
+                self._ordenar_bloco(indice + 1)
+        self._ordenar_bloco(indice)
+
+    def sugerir(self, prefixo, limite=SUGESTOES):
+        """Até 'limite' textos que começam com 'prefixo' (sem diferença de maiúsculas), dos mais usados para os menos."""
+        chave = normalizar_texto(prefixo)
+        if not chave or not self._blocos:
+            return []
+        menor, maior = (chave,), (chave + _FIM_PREFIXO,)
+        primeiro = max(bisect_right(self._inicios, menor) - 1, 0)
+        ultimo = max(bisect_right(self._inicios, maior) - 1, 0)
+
+        def pontas(indice):
+            bloco = self._blocos[indice]
+            return [texto for _, texto in bloco[bisect_left(bloco, menor):bisect_left(bloco, maior)]]
+
+        candidatos = pontas(primeiro)
+        if ultimo > primeiro:
+            candidatos += pontas(ultimo)
+            # Blocos do meio: todos os textos casam; os melhores saem da intercalação das listas por peso
+            meio = (ordem[:limite] for ordem in self._ordens[primeiro + 1:ultimo])
+            peso = self._pontos.__getitem__
+            candidatos += islice(heapq.merge(*meio, key=peso, reverse=True), limite)
+        return heapq.nlargest(limite, candidatos, key=self._pontos.__getitem__)
+
+
+def carregar_usos(db_name):
+    """
+    Leitura dos usos de cada campo, executada em segundo plano (sem acesso à interface).
+    Retorna {'descricao': [...], 'acao_realizada': [...]}.
+    """
+    erros = []
+    db = DatabaseManager(db_name, on_error=erros.append)
+    usos = {coluna: db.fetch_text_usage(coluna) or [] for coluna in ("descricao", "acao_realizada")}
+    if erros:
+        raise erros[0]
+    return usos
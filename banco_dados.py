@@ -0,0 +1,874 @@
+import hashlib
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from contextlib import closing
+from itertools import islice
+
+import numpy as np
+
+from contagem_distinta import desserializar, esbocos_por_dia, estimar, serializar, unir
+from monitoramento import monitorado, obter_monitor
+
+def dia_sql(prefixo=''):
+    """Expressão SQL do número do dia (dias desde 01/01/1970) da coluna data; NULL se a data for inválida."""
+    data = f"{prefixo}data"
+    return (f"CAST(julianday(SUBSTR({data}, 7, 4) || '-' || SUBSTR({data}, 4, 2) || '-' || SUBSTR({data}, 1, 2))"
+            f" - 2440587.5 AS INTEGER)")
+
+
+def status_sql(prefixo=''):
+    """Expressão SQL do texto do status a partir do status_id de registros_base (para os gatilhos)."""
+    return f"(SELECT valor FROM dicionario_status WHERE id = {prefixo}status_id)"
+
+
+def normalizar_texto(valor):
+    """Normaliza um texto para comparação: Unicode NFC, sem diferença de maiúsculas e espaços repetidos."""
+    return ' '.join(unicodedata.normalize('NFC', str(valor or '')).casefold().split())
+
+
+def hash_conteudo(numero, data, descricao, acao):
+    """Hash de 64 bits do conteúdo normalizado (numero_ticket, data, descricao, acao_realizada)."""
+    chave = '\x1f'.join(normalizar_texto(v) for v in (numero, data, descricao, acao))
+    return int.from_bytes(hashlib.blake2b(chave.encode('utf-8'), digest_size=8).digest(), 'big', signed=True)
+
+
+# Versão do esquema gravada em PRAGMA user_version: quando o banco já está na versão atual, a abertura
+# não repete a criação de tabelas, índices e gatilhos (uma conexão por comando, lenta em unidades de rede).
+# Incrementar a cada alteração do esquema.
+SCHEMA_VERSION = 5
+
+
+# Até esta quantidade de registros no intervalo, os tickets distintos são contados de forma exata
+EXACT_DISTINCT_LIMIT = 50000
+
+# Limites de dia usados quando o intervalo não é informado
+_MIN_DAY, _MAX_DAY = -(1 << 31), 1 << 31
+
+# Registros completos mantidos no cache por id (0 desliga o cache)
+RECORD_CACHE_SIZE = 4096
+
+# Nas listagens resumidas, a descrição e a ação vêm com até SUMMARY_LENGTH caracteres; os textos cortados
+# terminam em SUMMARY_MARK e o texto completo é lido pelo id quando a linha é selecionada
+SUMMARY_LENGTH = 80
+SUMMARY_MARK = "…"
+
+
+def inicio_texto_sql(coluna, tamanho=SUMMARY_LENGTH):
+    """Expressão SQL com o início do texto da coluna; os textos maiores que 'tamanho' terminam em SUMMARY_MARK."""
+    return (f"CASE WHEN LENGTH({coluna}) > {tamanho} "
+            f"THEN SUBSTR({coluna}, 1, {tamanho - 1}) || '{SUMMARY_MARK}' ELSE {coluna} END")
+
+
+def _summary_cut(texto):
+    """Indica se o texto de uma listagem resumida foi cortado (não é o texto completo)."""
+    return texto is not None and len(texto) == SUMMARY_LENGTH and texto.endswith(SUMMARY_MARK)
+
+
+def _record_key(record_id):
+    """Id do registro como inteiro (a Treeview devolve texto); None se não for um id válido."""
+    try:
+        return int(record_id)
+    except (TypeError, ValueError):
+        return None
+
+
+class CacheRegistros:
+    """
+    Cache LRU de registros completos (id, data, numero_ticket, descricao, acao_realizada, status) por id,
+    com um segundo mapa número do ticket → id preenchido pelas buscas por número.
+    As gravações feitas pelo próprio DatabaseManager invalidam as entradas afetadas; as de outros processos
+    (monitor de importação, linha de comando, outra janela do aplicativo) são percebidas pela versão dos dados,
+    conferida a cada recarga da tabela (não a cada busca): se mudou, o cache inteiro é descartado.
+    """
+
+    def __init__(self, limite=RECORD_CACHE_SIZE):
+        self.limite = limite
+        self.acertos = 0
+        self.faltas = 0
+        self._registros = OrderedDict()
+        self._numeros = OrderedDict()
+        self._trava = threading.Lock()
+        self.versao = None
+
+    def __len__(self):
+        return len(self._registros)
+
+    def validar(self, versao):
+        """Descarta todas as entradas se a versão dos dados mudou desde a última conferência."""
+        with self._trava:
+            if versao != self.versao:
+                self._registros.clear()
+                self._numeros.clear()
+                self.versao = versao
+
+    def obter(self, record_id):
+        with self._trava:
+            registro = self._registros.get(record_id)
+            if registro is None:
+                self.faltas += 1
+                return None
+            self._registros.move_to_end(record_id)
+            self.acertos += 1
+            return registro
+
+    def obter_por_numero(self, numero):
+        with self._trava:
+            record_id = self._numeros.get(numero)
+            registro = self._registros.get(record_id) if record_id is not None else None
+            if registro is None:
+                self._numeros.pop(numero, None)
+                self.faltas += 1
+                return None
+            self._numeros.move_to_end(numero)
+            self._registros.move_to_end(record_id)
+            self.acertos += 1
+            return registro
+
+    def guardar(self, registros, numero=None):
+        """
+        Guarda as primeiras linhas de uma lista (as que aparecem no topo da tabela ficam como as mais recentes).
+        'numero' associa o primeiro registro à busca por esse número do ticket.
+        """
+        if not self.limite or not registros:
+            return
+        with self._trava:
+            for registro in reversed(registros[:self.limite]):
+                registro = tuple(registro[:6])
+                self._registros[registro[0]] = registro
+                self._registros.move_to_end(registro[0])
+            if numero is not None:
+                self._numeros[numero] = registros[0][0]
+                self._numeros.move_to_end(numero)
+            while len(self._registros) > self.limite:
+                self._registros.popitem(last=False)
+            while len(self._numeros) > self.limite:
+                self._numeros.popitem(last=False)
+
+    def remover(self, record_ids, numeros=()):
+        """Remove os registros e as buscas por número que apontam para eles ou para os números informados."""
+        with self._trava:
+            record_ids = set(record_ids)
+            for record_id in record_ids:
+                self._registros.pop(record_id, None)
+            for numero in [n for n, record_id in self._numeros.items() if record_id in record_ids or n in numeros]:
+                del self._numeros[numero]
+
+    def limpar(self):
+        with self._trava:
+            self._registros.clear()
+            self._numeros.clear()
+
+
+@monitorado
+class DatabaseManager:
+    def __init__(self, db_name='tickets.db', on_error=None, monitor=None, cache_size=RECORD_CACHE_SIZE):
+        self.db_name = db_name
+        # Por padrão os erros são exibidos em uma caixa de diálogo; os modos sem interface
+        # (linha de comando, monitor de importação) informam o próprio tratador.
+        self.on_error = on_error or self._show_error
+        # Tempo, linhas e impressão digital de cada comando e método (monitoramento.py); None se desligado
+        self.monitor = monitor if monitor is not None else obter_monitor()
+        # Registros lidos recentemente: a edição de uma linha exibida não precisa voltar ao banco
+        self.record_cache = CacheRegistros(cache_size)
+        self._create_table()
+
+    @staticmethod
+    def _show_error(error):
+        # Importado só aqui: os scripts sem interface usam o módulo em Pythons sem Tk
+        from tkinter import messagebox
+        messagebox.showerror("Erro de Banco de Dados", f"Ocorreu um erro: {error}")
+
+    def _create_table(self):
+        row = self._execute_query("PRAGMA user_version", fetch='one')
+        if row and row[0] == SCHEMA_VERSION:
+            return  # Esquema atual: a abertura é só esta consulta
+
+        kind = self._execute_query("SELECT type FROM sqlite_master WHERE name = 'registros'", fetch='one')
+        if kind and kind[0] == 'table' and not self._migrate_dictionary():
+            return  # A conversão falhou (erro já informado): o banco continua no esquema anterior
+        self._create_record_storage()
+        self._backfill_content_hash()
+        self._create_data_version()
+        self._create_daily_summary()
+        self._create_status_history()
+        self._create_distinct_sketches()
+
+        # Índices da navegação a partir dos gráficos: por status e por dia (expressão sobre a coluna data)
+        self._execute_query(f"CREATE INDEX IF NOT EXISTS idx_registros_status_dia ON registros_base (status_id, {dia_sql()})")
+        self._execute_query(f"CREATE INDEX IF NOT EXISTS idx_registros_dia ON registros_base ({dia_sql()})")
+        # Busca pelo número exato do ticket (edição, conferência da importação)
+        self._execute_query("CREATE INDEX IF NOT EXISTS idx_registros_numero_ticket ON registros_base (numero_ticket)")
+
+        # Histórico de arquivos importados automaticamente (impressão digital do conteúdo)
+        query = (
+            "CREATE TABLE IF NOT EXISTS arquivos_importados ("
+            "hash_conteudo TEXT PRIMARY KEY, "
+            "nome TEXT NOT NULL, "
+            "tamanho INTEGER NOT NULL, "
+            "modificado_em INTEGER NOT NULL, "
+            "registros INTEGER NOT NULL, "
+            "rejeitados INTEGER NOT NULL, "
+            "importado_em TEXT NOT NULL)"
+        )
+        self._execute_query(query)
+        self._execute_query(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+    @staticmethod
+    def _storage_tables():
+        """
+        Comandos das tabelas dos registros: os textos de descrição/ação e os status ficam uma única vez nos
+        dicionários e cada registro guarda apenas os ids deles.
+        """
+        return (
+            "CREATE TABLE IF NOT EXISTS dicionario_status (id INTEGER PRIMARY KEY, valor TEXT NOT NULL UNIQUE)",
+            "CREATE TABLE IF NOT EXISTS dicionario_textos (id INTEGER PRIMARY KEY, valor TEXT NOT NULL UNIQUE)",
+            "CREATE TABLE IF NOT EXISTS registros_base ("
+            "id INTEGER PRIMARY KEY AUTOINCREMENT, "
+            "data TEXT NOT NULL, "
+            "numero_ticket TEXT NOT NULL, "
+            "descricao_id INTEGER NOT NULL REFERENCES dicionario_textos (id), "
+            "acao_id INTEGER REFERENCES dicionario_textos (id), "
+            "status_id INTEGER REFERENCES dicionario_status (id), "
+            "hash_conteudo INTEGER)",
+        )
+
+    def _create_record_storage(self):
+        """
+        Cria os dicionários, registros_base e a visão 'registros', que mantém as colunas de sempre
+        (id, data, numero_ticket, descricao, acao_realizada, status, hash_conteudo) para leitura e gravação:
+        gatilhos INSTEAD OF cadastram os textos novos nos dicionários e gravam os ids em registros_base.
+        Os textos que deixam de ser usados continuam nos dicionários.
+        """
+        for query in self._storage_tables():
+            self._execute_query(query)
+        self._execute_query("CREATE INDEX IF NOT EXISTS idx_registros_hash ON registros_base (hash_conteudo)")
+        # LEFT JOIN nos três dicionários: consultas que não leem os textos nem os filtram dispensam a junção
+        self._execute_query(
+            "CREATE VIEW IF NOT EXISTS registros AS "
+            "SELECT r.id AS id, r.data AS data, r.numero_ticket AS numero_ticket, d.valor AS descricao, "
+            "a.valor AS acao_realizada, s.valor AS status, r.hash_conteudo AS hash_conteudo "
+            "FROM registros_base AS r "
+            "LEFT JOIN dicionario_textos AS d ON d.id = r.descricao_id "
+            "LEFT JOIN dicionario_textos AS a ON a.id = r.acao_id "
+            "LEFT JOIN dicionario_status AS s ON s.id = r.status_id"
+        )
+        # Um valor NULL não entra no dicionário (OR IGNORE); a descrição obrigatória falha em registros_base
+        store = (
+            "INSERT OR IGNORE INTO dicionario_textos (valor) VALUES (NEW.descricao); "
+            "INSERT OR IGNORE INTO dicionario_textos (valor) VALUES (NEW.acao_realizada); "
+            "INSERT OR IGNORE INTO dicionario_status (valor) VALUES (NEW.status);"
+        )
+        ids = (
+            "(SELECT id FROM dicionario_textos WHERE valor = NEW.descricao), "
+            "(SELECT id FROM dicionario_textos WHERE valor = NEW.acao_realizada), "
+            "(SELECT id FROM dicionario_status WHERE valor = NEW.status)"
+        )
+        self._execute_query(
+            "CREATE TRIGGER IF NOT EXISTS trg_registros_insert INSTEAD OF INSERT ON registros BEGIN "
+            f"{store} "
+            "INSERT INTO registros_base (id, data, numero_ticket, descricao_id, acao_id, status_id, hash_conteudo) "
+            f"VALUES (NEW.id, NEW.data, NEW.numero_ticket, {ids}, NEW.hash_conteudo); "
+            "END"
+        )
+        self._execute_query(
+            "CREATE TRIGGER IF NOT EXISTS trg_registros_update INSTEAD OF UPDATE ON registros BEGIN "
+            f"{store} "
+            "UPDATE registros_base SET (id, data, numero_ticket, descricao_id, acao_id, status_id, hash_conteudo) = "
+            f"(NEW.id, NEW.data, NEW.numero_ticket, {ids}, NEW.hash_conteudo) WHERE id = OLD.id; "
+            "END"
+        )
+        self._execute_query(
+            "CREATE TRIGGER IF NOT EXISTS trg_registros_delete INSTEAD OF DELETE ON registros "
+            "BEGIN DELETE FROM registros_base WHERE id = OLD.id; END"
+        )
+
+    def _migrate_dictionary(self):
+        """
+        Converte a tabela 'registros' das versões anteriores (textos repetidos em cada linha) para os dicionários
+        e registros_base, em uma única transação. A tabela antiga, com seus índices e gatilhos, é removida;
+        a visão, os gatilhos e os índices novos são criados em seguida. Retorna False se a conversão falhar.
+        """
+        columns = [row[1] for row in self._execute_query("PRAGMA table_info(registros)", fetch='all') or []]
+        content_hash = "r.hash_conteudo" if 'hash_conteudo' in columns else "NULL"
+        try:
+            with self.conectar() as conn:
+                conn.execute("BEGIN IMMEDIATE")
+                for query in self._storage_tables():
+                    conn.execute(query)
+                conn.execute("INSERT OR IGNORE INTO dicionario_status (valor) SELECT status FROM registros")
+                conn.execute("INSERT OR IGNORE INTO dicionario_textos (valor) SELECT descricao FROM registros")
+                conn.execute("INSERT OR IGNORE INTO dicionario_textos (valor) SELECT acao_realizada FROM registros")
+                conn.execute(
+                    "INSERT INTO registros_base (id, data, numero_ticket, descricao_id, acao_id, status_id, hash_conteudo) "
+                    f"SELECT r.id, r.data, r.numero_ticket, d.id, a.id, s.id, {content_hash} FROM registros AS r "
+                    "LEFT JOIN dicionario_textos AS d ON d.valor = r.descricao "
+                    "LEFT JOIN dicionario_textos AS a ON a.valor = r.acao_realizada "
+                    "LEFT JOIN dicionario_status AS s ON s.valor = r.status"
+                )
+                # AUTOINCREMENT: os ids de registros já excluídos também não voltam a ser usados
+                last_id = conn.execute(
+                    "SELECT MAX(seq) FROM sqlite_sequence WHERE name IN ('registros', 'registros_base')").fetchone()[0]
+                conn.execute("DELETE FROM sqlite_sequence WHERE name = 'registros_base'")
+                if last_id is not None:
+                    conn.execute("INSERT INTO sqlite_sequence (name, seq) VALUES ('registros_base', ?)", (last_id,))
+                conn.execute("DROP TABLE registros")
+                conn.commit()
+            return True
+        except sqlite3.Error as e:
+            self.on_error(e)
+            return False
+
+    def _backfill_content_hash(self):
+        """
+        Preenche o hash dos registros gravados por versões anteriores (ou outros programas), que ficam sem ele.
+        Feito na migração e, depois dela, só antes das consultas que dependem do hash (pelo índice do hash).
+        """
+        pending = self._execute_query(
+            "SELECT id, numero_ticket, data, descricao, acao_realizada FROM registros WHERE hash_conteudo IS NULL",
+            fetch='all')
+        if pending:
+            self._execute_many("UPDATE registros_base SET hash_conteudo=? WHERE id=?",
+                               [(hash_conteudo(numero, data, descricao, acao), record_id)
+                                for record_id, numero, data, descricao, acao in pending])
+
+    def _create_data_version(self):
+        """
+        Cria o contador de versão dos dados, incrementado por gatilhos a cada alteração em 'registros'.
+        Vale para qualquer processo que grave no banco e permite invalidar caches sem reler os registros.
+        Cada alteração também sorteia uma marca: um banco recriado ou restaurado de um backup volta a
+        contadores já usados, mas não à mesma marca, então não herda os caches (instantâneo, imagens) de outro banco.
+        """
+        marca = "lower(hex(randomblob(8)))"
+        self._execute_query("CREATE TABLE IF NOT EXISTS versao_dados (id INTEGER PRIMARY KEY CHECK (id = 1), versao INTEGER NOT NULL, marca TEXT)")
+        columns = [row[1] for row in self._execute_query("PRAGMA table_info(versao_dados)", fetch='all') or []]
+        if 'marca' not in columns:
+            self._execute_query("ALTER TABLE versao_dados ADD COLUMN marca TEXT")
+        self._execute_query("INSERT OR IGNORE INTO versao_dados (id, versao) VALUES (1, 0)")
+        self._execute_query(f"UPDATE versao_dados SET marca = {marca} WHERE id = 1 AND marca IS NULL")
+        for event in ("INSERT", "UPDATE", "DELETE"):
+            self._execute_query(f"DROP TRIGGER IF EXISTS trg_versao_dados_{event.lower()}")
+            self._execute_query(
+                f"CREATE TRIGGER trg_versao_dados_{event.lower()} AFTER {event} ON registros_base "
+                f"BEGIN UPDATE versao_dados SET versao = versao + 1, marca = {marca} WHERE id = 1; END"
+            )
+
+    def _create_daily_summary(self):
+        """
+        Cria o resumo diário (contagem por dia × status), mantido por gatilhos a cada alteração em 'registros'.
+        Os painéis de análise leem este resumo em vez de percorrer todos os registros.
+        """
+        exists = self._execute_query("SELECT 1 FROM sqlite_master WHERE type='table' AND name='resumo_diario'", fetch='one')
+        self._execute_query(
+            "CREATE TABLE IF NOT EXISTS resumo_diario ("
+            "dia INTEGER NOT NULL, "
+            "status TEXT NOT NULL, "
+            "total INTEGER NOT NULL, "
+            "PRIMARY KEY (dia, status)) WITHOUT ROWID"
+        )
+        if not exists:
+            self._execute_query(
+                f"INSERT INTO resumo_diario (dia, status, total) "
+                f"SELECT {dia_sql()} AS dia, COALESCE(status, ''), COUNT(*) FROM registros "
+                f"WHERE dia IS NOT NULL GROUP BY 1, 2"
+            )
+
+        def increment(prefix):
+            return (f"INSERT INTO resumo_diario (dia, status, total) "
+                    f"SELECT d, s, 1 FROM (SELECT {dia_sql(prefix)} AS d, COALESCE({status_sql(prefix)}, '') AS s) WHERE d IS NOT NULL "
+                    f"ON CONFLICT (dia, status) DO UPDATE SET total = total + 1;")
+
+        def decrement(prefix):
+            status = f"COALESCE({status_sql(prefix)}, '')"
+            return (f"UPDATE resumo_diario SET total = total - 1 WHERE dia = {dia_sql(prefix)} AND status = {status}; "
+                    f"DELETE FROM resumo_diario WHERE dia = {dia_sql(prefix)} AND status = {status} AND total <= 0;")
+
+        self._execute_query(f"CREATE TRIGGER IF NOT EXISTS trg_resumo_diario_insert AFTER INSERT ON registros_base BEGIN {increment('NEW.')} END")
+        self._execute_query(f"CREATE TRIGGER IF NOT EXISTS trg_resumo_diario_delete AFTER DELETE ON registros_base BEGIN {decrement('OLD.')} END")
+        self._execute_query(
+            "CREATE TRIGGER IF NOT EXISTS trg_resumo_diario_update AFTER UPDATE OF data, status_id ON registros_base "
+            "WHEN OLD.data IS NOT NEW.data OR OLD.status_id IS NOT NEW.status_id "
+            f"BEGIN {decrement('OLD.')} {increment('NEW.')} END"
+        )
+
+    def _create_status_history(self):
+        """
+        Cria o histórico de mudanças de status (somente inclusão) e o status atual de cada registro com o
+        instante em que começou. Ambos são mantidos por gatilhos, também para gravações feitas fora do aplicativo.
+        Cada transição guarda quanto tempo o registro ficou no status anterior, para que as métricas de
+        envelhecimento leiam apenas o período consultado, sem reprocessar o histórico inteiro.
+        """
+        now = "CAST(strftime('%s', 'now') AS INTEGER)"
+        exists = self._execute_query("SELECT 1 FROM sqlite_master WHERE type='table' AND name='status_atual'", fetch='one')
+        self._execute_query(
+            "CREATE TABLE IF NOT EXISTS historico_status ("
+            "id INTEGER PRIMARY KEY AUTOINCREMENT, "
+            "registro_id INTEGER NOT NULL, "
+            "status_anterior TEXT, "
+            "status TEXT, "
+            "alterado_em INTEGER NOT NULL, "  # segundos desde 01/01/1970 (UTC)
+            "duracao INTEGER)"  # segundos no status anterior
+        )
+        self._execute_query("CREATE INDEX IF NOT EXISTS idx_historico_status_registro ON historico_status (registro_id, alterado_em)")
+        # Índice de cobertura: percentis de um período sem ler a tabela nem o histórico fora do período
+        self._execute_query(
+            "CREATE INDEX IF NOT EXISTS idx_historico_status_alterado_em "
+            "ON historico_status (alterado_em, status_anterior, duracao)"
+        )
+        self._execute_query(
+            "CREATE TABLE IF NOT EXISTS status_atual ("
+            "registro_id INTEGER PRIMARY KEY, "
+            "status TEXT, "
+            "desde INTEGER NOT NULL)"
+        )
+        self._execute_query("CREATE INDEX IF NOT EXISTS idx_status_atual_status ON status_atual (status, desde)")
+        if not exists:
+            # Registros anteriores ao histórico: considera que estão no status atual desde a data do registro
+            self._execute_query(
+                f"INSERT OR IGNORE INTO status_atual (registro_id, status, desde) "
+                f"SELECT id, status, COALESCE({dia_sql()} * 86400, {now}) FROM registros"
+            )
+            self._execute_query(
+                "INSERT INTO historico_status (registro_id, status_anterior, status, alterado_em) "
+                "SELECT registro_id, NULL, status, desde FROM status_atual"
+            )
+
+        old_status, new_status = status_sql('OLD.'), status_sql('NEW.')
+        self._execute_query(
+            "CREATE TRIGGER IF NOT EXISTS trg_historico_status_insert AFTER INSERT ON registros_base BEGIN "
+            f"INSERT INTO historico_status (registro_id, status_anterior, status, alterado_em) VALUES (NEW.id, NULL, {new_status}, {now}); "
+            f"INSERT OR REPLACE INTO status_atual (registro_id, status, desde) VALUES (NEW.id, {new_status}, {now}); "
+            "END"
+        )
+        self._execute_query(
+            "CREATE TRIGGER IF NOT EXISTS trg_historico_status_update AFTER UPDATE OF status_id ON registros_base "
+            "WHEN OLD.status_id IS NOT NEW.status_id BEGIN "
+            "INSERT INTO historico_status (registro_id, status_anterior, status, alterado_em, duracao) "
+            f"SELECT NEW.id, {old_status}, {new_status}, {now}, "
+            f"{now} - (SELECT desde FROM status_atual WHERE registro_id = NEW.id); "
+            f"INSERT OR REPLACE INTO status_atual (registro_id, status, desde) VALUES (NEW.id, {new_status}, {now}); "
+            "END"
+        )
+        # O histórico é preservado; apenas o status atual do registro excluído deixa de existir
+        self._execute_query(
+            "CREATE TRIGGER IF NOT EXISTS trg_historico_status_delete AFTER DELETE ON registros_base "
+            "BEGIN DELETE FROM status_atual WHERE registro_id = OLD.id; END"
+        )
+
+    def _create_distinct_sketches(self):
+        """
+        Cria os esboços diários de tickets distintos (HyperLogLog, ao lado do resumo diário). Gatilhos apenas marcam
+        os dias alterados como pendentes; os esboços desses dias são refeitos a partir dos registros na próxima leitura.
+        """
+        exists = self._execute_query("SELECT 1 FROM sqlite_master WHERE type='table' AND name='esboco_diario'", fetch='one')
+        self._execute_query("CREATE TABLE IF NOT EXISTS esboco_diario (dia INTEGER PRIMARY KEY, registradores BLOB NOT NULL)")
+        self._execute_query("CREATE TABLE IF NOT EXISTS esboco_pendente (dia INTEGER PRIMARY KEY)")
+        if not exists:
+            self._execute_query("INSERT OR IGNORE INTO esboco_pendente (dia) SELECT DISTINCT dia FROM resumo_diario")
+
+        def mark(prefix):
+            return (f"INSERT OR IGNORE INTO esboco_pendente (dia) "
+                    f"SELECT d FROM (SELECT {dia_sql(prefix)} AS d) WHERE d IS NOT NULL;")
+
+        self._execute_query(f"CREATE TRIGGER IF NOT EXISTS trg_esboco_insert AFTER INSERT ON registros_base BEGIN {mark('NEW.')} END")
+        self._execute_query(f"CREATE TRIGGER IF NOT EXISTS trg_esboco_delete AFTER DELETE ON registros_base BEGIN {mark('OLD.')} END")
+        self._execute_query(
+            "CREATE TRIGGER IF NOT EXISTS trg_esboco_update AFTER UPDATE OF data, numero_ticket ON registros_base "
+            "WHEN OLD.data IS NOT NEW.data OR OLD.numero_ticket IS NOT NEW.numero_ticket "
+            f"BEGIN {mark('OLD.')} {mark('NEW.')} END"
+        )
+
+    def conectar(self):
+        return sqlite3.connect(self.db_name)
+
+    def _execute_query(self, query, params=(), fetch=None):
+        monitor = self.monitor
+        try:
+            with self.conectar() as conn:
+                with closing(conn.cursor()) as cursor:
+                    start = time.perf_counter()
+                    cursor.execute(query, params)
+                    conn.commit()
+                    result = None
+                    if fetch == 'one':
+                        result = cursor.fetchone()
+                    elif fetch == 'all':
+                        result = cursor.fetchall()
+                    if monitor is not None:
+                        rows = len(result) if fetch == 'all' else int(result is not None) if fetch == 'one' else max(cursor.rowcount, 0)
+                        monitor.registrar(self.db_name, query, params, time.perf_counter() - start, rows, conn)
+                    return result
+        except sqlite3.Error as e:
+            self.on_error(e)
+            return None
+
+    def _execute_many(self, query, seq_params):
+        """Executa o mesmo comando para vários parâmetros em uma única transação."""
+        monitor = self.monitor
+        try:
+            with self.conectar() as conn:
+                start = time.perf_counter()
+                cursor = conn.executemany(query, seq_params)
+                conn.commit()
+                if monitor is not None:
+                    # O plano (só para as lentas) usa os parâmetros do primeiro item, quando é uma lista
+                    first = seq_params[0] if isinstance(seq_params, (list, tuple)) and seq_params else None
+                    monitor.registrar(self.db_name, query, first, time.perf_counter() - start, max(cursor.rowcount, 0), conn)
+                return True
+        except sqlite3.Error as e:
+            self.on_error(e)
+            return False
+
+    def add_record(self, data, numero, descricao, acao, status):
+        query = "INSERT INTO registros (data, numero_ticket, descricao, acao_realizada, status, hash_conteudo) VALUES (?, ?, ?, ?, ?, ?)"
+        self._execute_query(query, (data, numero, descricao, acao, status, hash_conteudo(numero, data, descricao, acao)))
+        self.record_cache.remover((), {numero})
+
+    def add_records(self, registros, hashes=None):
+        """
+        Insere vários registros (data, numero, descricao, acao, status) em uma única transação.
+        'hashes' permite reaproveitar os hashes de conteúdo já calculados (ex.: na importação).
+        """
+        if hashes is None:
+            hashes = [hash_conteudo(numero, data, descricao, acao) for data, numero, descricao, acao, _ in registros]
+        query = "INSERT INTO registros (data, numero_ticket, descricao, acao_realizada, status, hash_conteudo) VALUES (?, ?, ?, ?, ?, ?)"
+        done = self._execute_many(query, [(*registro, h) for registro, h in zip(registros, hashes)])
+        self.record_cache.remover((), {registro[1] for registro in registros})
+        return done
+
+    def update_record(self, record_id, data, numero, descricao, acao, status):
+        query = "UPDATE registros SET data=?, numero_ticket=?, descricao=?, acao_realizada=?, status=?, hash_conteudo=? WHERE id=?"
+        self._execute_query(query, (data, numero, descricao, acao, status, hash_conteudo(numero, data, descricao, acao), record_id))
+        self._forget_records([record_id], {numero})
+
+    def delete_record(self, record_id):
+        query = "DELETE FROM registros WHERE id=?"
+        self._execute_query(query, (record_id,))
+        self._forget_records([record_id])
+
+    def delete_records(self, record_ids):
+        """Remove vários registros em uma única transação."""
+        record_ids = list(record_ids)
+        done = self._execute_many("DELETE FROM registros WHERE id=?", [(record_id,) for record_id in record_ids])
+        self._forget_records(record_ids)
+        return done
+
+    def sync_record_cache(self, version=None):
+        """
+        Confere a versão dos dados (gravações de outros processos) e descarta o cache se ela mudou. Feito uma vez
+        a cada listagem, isto é, a cada recarga da tabela; entre as recargas, as buscas por id e por número
+        respondem direto do cache. 'version' dispensa a consulta quando a versão já foi lida junto com os registros.
+        """
+        if self.record_cache.limite:
+            self.record_cache.validar(self.get_data_version() if version is None else version)
+
+    def cache_records(self, records, summary=False):
+        """
+        Guarda no cache as linhas exibidas na tabela. No resumo, só as que vieram com a descrição e a ação inteiras;
+        as cortadas são lidas pelo id quando a linha é selecionada e ficam no cache a partir daí.
+        """
+        if summary and records:
+            records = list(islice((record for record in records
+                                   if not _summary_cut(record[3]) and not _summary_cut(record[4])),
+                                  self.record_cache.limite))
+        self.record_cache.guardar(records)
+
+    def _forget_records(self, record_ids, numeros=()):
+        """Invalida no cache os registros alterados ou excluídos (e as buscas pelos números informados)."""
+        keys = [_record_key(record_id) for record_id in record_ids]
+        if None in keys:
+            self.record_cache.limpar()
+        else:
+            self.record_cache.remover(keys, numeros)
+
+    @staticmethod
+    def _record_columns(summary):
+        """Colunas das listagens; no resumo, a descrição e a ação vêm só com o início do texto."""
+        if summary:
+            return f"id, data, numero_ticket, {inicio_texto_sql('descricao')}, {inicio_texto_sql('acao_realizada')}, status"
+        return "id, data, numero_ticket, descricao, acao_realizada, status"
+
+    def fetch_all_records(self, summary=False):
+        """
+        Todos os registros, da data mais recente para a mais antiga, na ordem do índice do dia (sem ordenar
+        a tabela em memória); registros com data inválida ficam no fim. 'summary' corta a descrição e a ação
+        (listagens da interface); a exportação usa o texto completo.
+        """
+        query = f"SELECT {self._record_columns(summary)} FROM registros ORDER BY {dia_sql()} DESC, id DESC"
+        self.sync_record_cache()
+        records = self._execute_query(query, fetch='all')
+        self.cache_records(records, summary)
+        return records
+
+    def search_by_number(self, numero, summary=False):
+        # A busca por parte do número ('%...%') percorre a tabela, mas já na ordem do índice do dia
+        query = (f"SELECT {self._record_columns(summary)} FROM registros "
+                 f"WHERE numero_ticket LIKE ? ORDER BY {dia_sql()} DESC, id DESC")
+        self.sync_record_cache()
+        records = self._execute_query(query, (f'%{numero}%',), fetch='all')
+        self.cache_records(records, summary)
+        return records
+
+    def fetch_record_by_ticket_number(self, numero_ticket):
+        """Busca um registro pelo número do ticket exato (primeiro pelo cache)."""
+        record = self.record_cache.obter_por_numero(numero_ticket)
+        if record is not None:
+            return record
+        query = "SELECT id, data, numero_ticket, descricao, acao_realizada, status FROM registros WHERE numero_ticket = ?"
+        record = self._execute_query(query, (numero_ticket,), fetch='one')
+        if record:
+            self.record_cache.guardar([record], numero_ticket)
+        return record
+
+    def fetch_record_by_id(self, record_id):
+        """Busca um registro pelo ID (primeiro pelo cache)."""
+        key = _record_key(record_id)
+        record = self.record_cache.obter(key) if key is not None else None
+        if record is not None:
+            return record
+        query = "SELECT id, data, numero_ticket, descricao, acao_realizada, status FROM registros WHERE id = ?"
+        record = self._execute_query(query, (record_id,), fetch='one')
+        if record:
+            self.record_cache.guardar([record])
+        return record
+
+    @staticmethod
+    def _page_conditions(status, first_day, last_day, status_condition="status = ?"):
+        """
+        Filtro das páginas por status e/ou intervalo de dias (só registros com data válida): (condições, parâmetros).
+        'status_condition' permite aplicar o mesmo filtro direto em registros_base (pelo status_id).
+        """
+        dia = dia_sql()
+        conditions, params = [], []
+        if status is not None:
+            conditions.append(status_condition)
+            params.append(status)
+        # Sem data inicial, o limite mínimo exclui as datas inválidas (NULL) pelo índice, como um IS NOT NULL
+        conditions.append(f"{dia} >= ?")
+        params.append(_MIN_DAY if first_day is None else first_day)
+        if last_day is not None:
+            conditions.append(f"{dia} <= ?")
+            params.append(last_day)
+        return conditions, params
+
+    def count_records_page(self, status=None, first_day=None, last_day=None):
+        """
+        Quantidade de registros das páginas de fetch_records_page com o mesmo filtro. Conta em registros_base,
+        só pelos índices (sem as junções da visão com os dicionários).
+        """
+        status_condition = "status_id = (SELECT id FROM dicionario_status WHERE valor = ?)"
+        conditions, params = self._page_conditions(status, first_day, last_day, status_condition)
+        row = self._execute_query(f"SELECT COUNT(*) FROM registros_base WHERE {' AND '.join(conditions)}", params, fetch='one')
+        return row[0] if row else 0
+
+    def fetch_records_page(self, status=None, first_day=None, last_day=None, after=None, limit=200, summary=False):
+        """
+        Uma página de registros com data válida, filtrada por status e/ou intervalo de dias (dias desde 1970),
+        da data mais recente para a mais antiga. A paginação é por chave: 'after' é o (dia, id) do último
+        registro da página anterior, então cada página é uma leitura direta nos índices, sem OFFSET.
+        Retorna (id, data, numero_ticket, descricao, acao_realizada, status, dia); 'summary' corta a descrição e a ação.
+        """
+        dia = dia_sql()
+        conditions, params = self._page_conditions(status, first_day, last_day)
+        if after is not None:
+            conditions.append(f"({dia}, id) < (?, ?)")
+            params.extend(after)
+        query = (
+            f"SELECT {self._record_columns(summary)}, {dia} FROM registros "
+            f"WHERE {' AND '.join(conditions)} ORDER BY {dia} DESC, id DESC LIMIT ?"
+        )
+        self.sync_record_cache()
+        records = self._execute_query(query, (*params, limit), fetch='all')
+        self.cache_records(records, summary)
+        return records
+
+    def fetch_records_by_status(self, status, summary=False):
+        """
+        Registros de um status, da data mais recente para a mais antiga (data inválida no fim), lidos pelo
+        índice (status, dia) em vez de carregar a tabela inteira e filtrar em memória.
+        """
+        query = (f"SELECT {self._record_columns(summary)} FROM registros "
+                 f"WHERE status = ? ORDER BY {dia_sql()} DESC, id DESC")
+        self.sync_record_cache()
+        records = self._execute_query(query, (status,), fetch='all')
+        self.cache_records(records, summary)
+        return records
+
+    def fetch_records_before(self, before=None, limit=200, summary=False):
+        """
+        Uma página de todos os registros (inclusive os de data inválida), do mais recente para o mais antigo
+        pelo id. A paginação é por chave: 'before' é o id do último registro da página anterior.
+        """
+        where = "" if before is None else " WHERE id < ?"
+        params = () if before is None else (before,)
+        query = f"SELECT {self._record_columns(summary)} FROM registros{where} ORDER BY id DESC LIMIT ?"
+        self.sync_record_cache()
+        records = self._execute_query(query, (*params, limit), fetch='all')
+        self.cache_records(records, summary)
+        return records
+
+    def get_data_version(self):
+        """
+        Retorna a versão atual dos dados, 'contador-marca' (muda a cada inclusão, alteração ou exclusão
+        e nunca se repete entre bancos diferentes ou entre um banco e o seu backup restaurado).
+        """
+        row = self._execute_query("SELECT versao, marca FROM versao_dados WHERE id = 1", fetch='one')
+        return f"{row[0]}-{row[1]}" if row else None
+
+    def fetch_daily_status_counts(self):
+        """Resumo diário pré-calculado: (dia desde 01/01/1970, status, total), ordenado por dia."""
+        return self._execute_query("SELECT dia, status, total FROM resumo_diario ORDER BY dia", fetch='all')
+
+    def fetch_status_durations(self, since):
+        """Transições desde o instante 'since' (segundos desde 1970): (status anterior, segundos nele)."""
+        query = (
+            "SELECT status_anterior, duracao FROM historico_status "
+            "WHERE alterado_em >= ? AND duracao IS NOT NULL"
+        )
+        return self._execute_query(query, (since,), fetch='all')
+
+    def fetch_current_status_since(self, statuses):
+        """Registros atualmente nos status informados: (status, instante em que entraram nele)."""
+        query = f"SELECT status, desde FROM status_atual WHERE status IN ({', '.join('?' * len(statuses))})"
+        return self._execute_query(query, list(statuses), fetch='all')
+
+    def fetch_stale_tickets(self, statuses, before, limit=500):
+        """
+        Registros parados: estão em um dos status informados desde antes de 'before' (segundos desde 1970).
+        Retorna (id, data, numero_ticket, status, desde), dos mais antigos para os mais recentes.
+        """
+        if not statuses:
+            return []
+        # Uma consulta por status, já ordenada pelo índice (status, desde), intercaladas por MERGE: com IN (...)
+        # o SQLite juntaria todos os registros parados em uma ordenação temporária antes do LIMIT
+        select = (
+            "SELECT r.id, r.data, r.numero_ticket, s.status, s.desde "
+            "FROM status_atual AS s JOIN registros AS r ON r.id = s.registro_id "
+            "WHERE s.status = ? AND s.desde < ?"
+        )
+        query = f"{' UNION ALL '.join([select] * len(statuses))} ORDER BY 5 LIMIT ?"
+        params = [value for status in statuses for value in (status, before)]
+        return self._execute_query(query, (*params, limit), fetch='all')
+
+    def fetch_status_history(self, record_id):
+        """Histórico de status de um registro: (status anterior, status, alterado_em, duracao)."""
+        query = (
+            "SELECT status_anterior, status, alterado_em, duracao FROM historico_status "
+            "WHERE registro_id = ? ORDER BY alterado_em, id"
+        )
+        return self._execute_query(query, (record_id,), fetch='all')
+
+    def refresh_distinct_sketches(self):
+        """
+        Refaz os esboços dos dias pendentes a partir dos registros (pelo índice do dia), em uma transação:
+        alterações feitas enquanto isso continuam marcadas como pendentes para a próxima leitura.
+        """
+        dia = dia_sql()
+        try:
+            with self.conectar() as conn:
+                conn.execute("BEGIN IMMEDIATE")
+                pending = [row[0] for row in conn.execute("SELECT dia FROM esboco_pendente")]
+                for start in range(0, len(pending), 500):
+                    chunk = pending[start:start + 500]
+                    marks = ', '.join('?' * len(chunk))
+                    rows = conn.execute(f"SELECT {dia}, numero_ticket FROM registros_base WHERE {dia} IN ({marks})", chunk).fetchall()
+                    days, sketches = esbocos_por_dia([row[0] for row in rows], [row[1] for row in rows])
+                    conn.execute(f"DELETE FROM esboco_diario WHERE dia IN ({marks})", chunk)
+                    conn.executemany("INSERT INTO esboco_diario (dia, registradores) VALUES (?, ?)",
+                                     [(int(d), serializar(sketch)) for d, sketch in zip(days, sketches)])
+                    conn.execute(f"DELETE FROM esboco_pendente WHERE dia IN ({marks})", chunk)
+                conn.commit()
+            return True
+        except sqlite3.Error as e:
+            self.on_error(e)
+            return False
+
+    def fetch_day_sketches(self, first_day=None, last_day=None):
+        """Esboços diários do intervalo (dias desde 1970, inclusive). Retorna (dias, matriz [dia, registrador])."""
+        self.refresh_distinct_sketches()
+        query = "SELECT dia, registradores FROM esboco_diario WHERE dia BETWEEN ? AND ? ORDER BY dia"
+        rows = self._execute_query(query, (_MIN_DAY if first_day is None else first_day,
+                                           _MAX_DAY if last_day is None else last_day), fetch='all') or []
+        if not rows:
+            return esbocos_por_dia([], [])
+        return np.array([row[0] for row in rows]), np.vstack([desserializar(row[1]) for row in rows])
+
+    def count_distinct_tickets(self, first_day=None, last_day=None, exact_limit=EXACT_DISTINCT_LIMIT):
+        """
+        Quantidade de números de ticket distintos no intervalo de dias (inclusive; None = sem limite).
+        Até 'exact_limit' registros no intervalo a contagem é exata; acima disso, é a união dos esboços diários.
+        Retorna (quantidade, exata).
+        """
+        first_day = _MIN_DAY if first_day is None else first_day
+        last_day = _MAX_DAY if last_day is None else last_day
+        row = self._execute_query("SELECT COALESCE(SUM(total), 0) FROM resumo_diario WHERE dia BETWEEN ? AND ?",
+                                  (first_day, last_day), fetch='one')
+        if row and row[0] <= exact_limit:
+            dia = dia_sql()
+            row = self._execute_query(f"SELECT COUNT(DISTINCT TRIM(numero_ticket)) FROM registros_base WHERE {dia} BETWEEN ? AND ?",
+                                      (first_day, last_day), fetch='one')
+            return (row[0] if row else 0), True
+        _, sketches = self.fetch_day_sketches(first_day, last_day)
+        return int(round(float(estimar(unir(sketches))))), False
+
+    def fetch_text_usage(self, column):
+        """
+        Textos distintos de 'descricao' ou 'acao_realizada' com o uso de cada um (base das sugestões):
+        (texto, quantidade de registros, id do registro mais recente que o usa).
+        """
+        text_id = {'descricao': 'descricao_id', 'acao_realizada': 'acao_id'}[column]
+        query = (
+            f"SELECT t.valor, u.quantidade, u.ultimo "
+            f"FROM (SELECT {text_id} AS texto_id, COUNT(*) AS quantidade, MAX(id) AS ultimo "
+            f"      FROM registros_base WHERE {text_id} IS NOT NULL GROUP BY {text_id}) AS u "
+            f"JOIN dicionario_textos AS t ON t.id = u.texto_id"
+        )
+        return self._execute_query(query, fetch='all')
+
+    def _fetch_existing(self, table, column, values):
+        """Consulta em lote (pelo índice) quais valores de 'column' já existem em 'table'."""
+        values = list(values)
+        found = set()
+        for start in range(0, len(values), 500):
+            chunk = values[start:start + 500]
+            query = f"SELECT DISTINCT {column} FROM {table} WHERE {column} IN ({', '.join('?' * len(chunk))})"
+            rows = self._execute_query(query, chunk, fetch='all') or []
+            found.update(row[0] for row in rows)
+        return found
+
+    def fetch_existing_hashes(self, hashes):
+        """Retorna o subconjunto dos hashes de conteúdo que já existem na tabela de registros."""
+        self._backfill_content_hash()
+        return self._fetch_existing('registros_base', 'hash_conteudo', hashes)
+
+    def fetch_duplicate_groups(self):
+        """
+        Agrupa os registros com o mesmo conteúdo normalizado.
+        Retorna (hash, quantidade, ids separados por vírgula, numero_ticket, data, descricao, acao_realizada)
+        do primeiro registro de cada grupo, dos grupos maiores para os menores.
+        """
+        self._backfill_content_hash()
+        query = (
+            "SELECT g.hash_conteudo, g.quantidade, g.ids, r.numero_ticket, r.data, r.descricao, r.acao_realizada "
+            "FROM (SELECT hash_conteudo, COUNT(*) AS quantidade, MIN(id) AS primeiro, GROUP_CONCAT(id) AS ids "
+            "      FROM registros_base WHERE hash_conteudo IS NOT NULL "
+            "      GROUP BY hash_conteudo HAVING COUNT(*) > 1) AS g "
+            "JOIN registros AS r ON r.id = g.primeiro "
+            "ORDER BY g.quantidade DESC, r.numero_ticket"
+        )
+        return self._execute_query(query, fetch='all')
+
+    def fetch_imported_hashes(self, hashes):
+        """Retorna o subconjunto dos hashes de conteúdo que já constam no histórico de importações."""
+        return self._fetch_existing('arquivos_importados', 'hash_conteudo', hashes)
+
+    def register_imported_file(self, hash_conteudo, nome, tamanho, modificado_em, registros, rejeitados):
+        """Registra um arquivo importado para que o mesmo conteúdo não seja importado novamente."""
+        query = (
+            "INSERT OR REPLACE INTO arquivos_importados "
+            "(hash_conteudo, nome, tamanho, modificado_em, registros, rejeitados, importado_em) "
+            "VALUES (?, ?, ?, ?, ?, ?, datetime('now', 'localtime'))"
+        )
+        self._execute_query(query, (hash_conteudo, nome, tamanho, modificado_em, registros, rejeitados))
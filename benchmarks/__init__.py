@@ -0,0 +1,6 @@
+# Benchmarks do DatabaseManager e das operações do aplicativo (V1, V2, V3 e a versão atual) sobre
+# bancos sintéticos. Uso:
+#   python -m benchmarks.gerador --linhas 100000 -o bench.db
+#   python -m benchmarks.executar --linhas 1000 --linhas 100000 -o resultados.json
+#   python -m benchmarks.comparar base.json resultados.json
+#   python -m benchmarks.planos   (também executado pelo teste tests/test_planos.py)
@@ -0,0 +1,65 @@
+import argparse
+import json
+import sys
+
+# Compara dois arquivos de resultados (benchmarks.executar) pela mediana de cada (versão, linhas, operação).
+# Uma operação regrediu quando a mediana aumentou mais que o limite relativo e mais que o mínimo absoluto
+# (para não acusar ruído em operações de poucos milissegundos).
+#
+# Exemplo:
+#   python -m benchmarks.comparar base.json resultados.json --limite 0.15
+
+MINIMO_MS = 1.0
+
+
+def _indexar(resultados):
+    return {(r["versao"], r["linhas"], r["operacao"]): r for r in resultados["resultados"]}
+
+
+def comparar(base, atual, limite=0.10, minimo_ms=MINIMO_MS):
+    """Linhas de comparação das medições presentes nos dois arquivos, na ordem dos resultados atuais."""
+    anteriores = _indexar(base)
+    linhas = []
+    for chave, medicao in _indexar(atual).items():
+        anterior = anteriores.get(chave)
+        if anterior is None:
+            continue
+        antes, depois = anterior["mediana_ms"], medicao["mediana_ms"]
+        razao = depois / antes if antes else float("inf") if depois else 1.0
+        linhas.append({
+            "versao": chave[0], "linhas": chave[1], "operacao": chave[2],
+            "base_ms": antes, "atual_ms": depois, "razao": round(razao, 3),
+            "regressao": razao > 1 + limite and depois - antes > minimo_ms,
+        })
+    return linhas
+
+
+def imprimir_comparacao(linhas, arquivo=sys.stdout):
+    print(f"{'versão':<7} {'linhas':>9} {'operação':<14} {'base (ms)':>11} {'atual (ms)':>11} {'razão':>7}", file=arquivo)
+    for linha in linhas:
+        marca = "  REGRESSÃO" if linha["regressao"] else ""
+        print(f"{linha['versao']:<7} {linha['linhas']:>9} {linha['operacao']:<14} {linha['base_ms']:>11.3f} "
+              f"{linha['atual_ms']:>11.3f} {linha['razao']:>7.2f}{marca}", file=arquivo)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compara resultados de benchmark com uma base.")
+    parser.add_argument("base", help="Resultados de referência (JSON).")
+    parser.add_argument("atual", help="Resultados a comparar (JSON).")
+    parser.add_argument("--limite", type=float, default=0.10,
+                        help="Aumento relativo da mediana considerado regressão (padrão: 0.10).")
+    parser.add_argument("--minimo-ms", type=float, default=MINIMO_MS,
+                        help=f"Aumento absoluto mínimo para acusar regressão, em ms (padrão: {MINIMO_MS}).")
+    args = parser.parse_args(argv)
+
+    with open(args.base, encoding="utf-8") as arquivo:
+        base = json.load(arquivo)
+    with open(args.atual, encoding="utf-8") as arquivo:
+        atual = json.load(arquivo)
+    linhas = comparar(base, atual, args.limite, args.minimo_ms)
+    imprimir_comparacao(linhas)
+    return 1 if any(linha["regressao"] for linha in linhas) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
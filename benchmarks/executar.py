@@ -0,0 +1,191 @@
+import argparse
+import json
+import os
+import platform
+import shutil
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+import numpy as np
+
+from benchmarks.comparar import comparar, imprimir_comparacao
+from benchmarks.gerador import gerar_banco, gerar_csv
+from benchmarks.versoes import ARQUIVOS_VERSOES, Versao
+
+# Mede as operações de cada versão sobre cópias do mesmo banco sintético e grava os tempos em JSON.
+# Cada versão recebe uma cópia nova do banco (a versão atual migra o esquema na primeira abertura).
+# As leituras vêm antes das gravações; a importação é a última operação.
+#
+# Exemplos:
+#   python -m benchmarks.executar --linhas 1000 --linhas 100000 -o resultados.json
+#   python -m benchmarks.executar --versao atual --linhas 1000000 --base base.json
+
+FORMATO_RESULTADOS = 1
+OPERACOES = ("abrir", "reabrir", "listar", "buscar_numero", "buscar_ticket", "estatisticas", "exportar",
+             "inserir", "atualizar", "excluir", "importar")
+
+
+def resumir(tempos):
+    """Tempos em segundos → estatísticas em milissegundos."""
+    ms = np.asarray(tempos, dtype=np.float64) * 1000
+    return {
+        "chamadas": len(ms),
+        "mediana_ms": round(float(np.median(ms)), 3),
+        "p95_ms": round(float(np.percentile(ms, 95)), 3),
+        "min_ms": round(float(ms.min()), 3),
+        "media_ms": round(float(ms.mean()), 3),
+    }
+
+
+def cronometrar(funcao, argumentos):
+    """Executa 'funcao' uma vez para cada item de 'argumentos' e devolve o tempo de cada chamada."""
+    tempos = []
+    for argumento in argumentos:
+        inicio = time.perf_counter()
+        funcao(*argumento)
+        tempos.append(time.perf_counter() - inicio)
+    return tempos
+
+
+def _amostras(banco, quantidade, rng):
+    """Ids e números de ticket existentes, sorteados sem percorrer a tabela."""
+    conn = sqlite3.connect(banco)
+    try:
+        maximo = conn.execute("SELECT MAX(id) FROM registros").fetchone()[0] or 0
+        ids = [int(i) for i in rng.choice(np.arange(1, maximo + 1), size=min(quantidade, maximo), replace=False)]
+        numeros = [linha[0] for linha in conn.execute(
+            f"SELECT numero_ticket FROM registros WHERE id IN ({', '.join('?' * len(ids))})", ids)]
+    finally:
+        conn.close()
+    return ids, numeros
+
+
+def medir_versao(versao, banco_base, arquivo_importacao, pasta, linhas, repeticoes, amostras, semente, avisar):
+    """Mede todas as operações suportadas pela versão. Retorna (resultados, ignorados)."""
+    rng = np.random.default_rng(semente)
+    banco = os.path.join(pasta, f"{versao.nome}_{linhas}.db")
+    shutil.copyfile(banco_base, banco)
+    ids, numeros = _amostras(banco, amostras * 2, rng)
+    alterados, excluidos = ids[:amostras], ids[amostras:]
+
+    inicio = time.perf_counter()
+    db = versao.abrir(banco)
+    tempos = {"abrir": [time.perf_counter() - inicio]}
+    etapas = [
+        ("reabrir", lambda: cronometrar(versao.abrir, [(banco,)] * repeticoes)),
+        ("listar", lambda: cronometrar(db.fetch_all_records, [()] * repeticoes)),
+        # Parte do número, como a busca do aplicativo (LIKE '%...%')
+        ("buscar_numero", lambda: cronometrar(db.search_by_number, [(numero[1:-1],) for numero in numeros[:amostras]])),
+        ("buscar_ticket", lambda: cronometrar(db.fetch_record_by_ticket_number, [(numero,) for numero in numeros[:amostras]])),
+        ("estatisticas", lambda: cronometrar(versao.estatisticas, [(db,)] * repeticoes)),
+        ("exportar", lambda: cronometrar(versao.exportar, [(db, os.path.join(pasta, f"exportado_{versao.nome}.csv"))] * repeticoes)),
+        ("inserir", lambda: cronometrar(db.add_record, [(datetime.now().strftime("%d/%m/%Y"), str(90_000_000 + i),
+                                                          "Ligação não registrada", "", "Em Andamento") for i in range(amostras)])),
+        ("atualizar", lambda: cronometrar(db.update_record, [(i, datetime.now().strftime("%d/%m/%Y"), str(91_000_000 + i),
+                                                              "Ligação não registrada", "Validado", "Resolvido") for i in alterados])),
+        ("excluir", lambda: cronometrar(db.delete_record, [(i,) for i in excluidos])),
+        ("importar", lambda: cronometrar(versao.importar, [(db, arquivo_importacao)])),
+    ]
+
+    ignorados = []
+    for operacao, medir in etapas:
+        if not versao.suporta(operacao):
+            ignorados.append({"versao": versao.nome, "linhas": linhas, "operacao": operacao, "motivo": "não existe nesta versão"})
+            continue
+        avisar(f"{versao.nome} / {linhas} linhas / {operacao}")
+        tempos[operacao] = medir()
+
+    resultados = [{"versao": versao.nome, "linhas": linhas, "operacao": operacao, **resumir(tempos[operacao])}
+                  for operacao in OPERACOES if operacao in tempos]
+    os.remove(banco)
+    return resultados, ignorados
+
+
+def executar(versoes, tamanhos, pasta, repeticoes=3, amostras=20, linhas_importacao=1000, semente=0, avisar=print):
+    """Gera os bancos de cada tamanho e mede cada versão. Retorna o dicionário gravado em JSON."""
+    carregadas = [Versao(nome) for nome in versoes]
+    arquivo_importacao = gerar_csv(os.path.join(pasta, "importacao.csv"), linhas_importacao, semente + 1)
+    resultados, ignorados = [], []
+    for linhas in tamanhos:
+        avisar(f"Gerando banco com {linhas} linhas...")
+        banco_base = gerar_banco(os.path.join(pasta, f"base_{linhas}.db"), linhas, semente)
+        for versao in carregadas:
+            medidos, pulados = medir_versao(versao, banco_base, arquivo_importacao, pasta, linhas,
+                                            repeticoes, amostras, semente, avisar)
+            resultados.extend(medidos)
+            ignorados.extend(pulados)
+        os.remove(banco_base)
+    return {
+        "formato": FORMATO_RESULTADOS,
+        "gerado_em": datetime.now().isoformat(timespec="seconds"),
+        "ambiente": {
+            "python": platform.python_version(),
+            "sqlite": sqlite3.sqlite_version,
+            "plataforma": platform.platform(),
+            "processador": platform.processor() or platform.machine(),
+            "cpus": os.cpu_count(),
+        },
+        "parametros": {"versoes": list(versoes), "linhas": list(tamanhos), "repeticoes": repeticoes,
+                       "amostras": amostras, "linhas_importacao": linhas_importacao, "semente": semente},
+        "resultados": resultados,
+        "ignorados": ignorados,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Mede as operações do DatabaseManager e do aplicativo em cada versão.")
+    parser.add_argument("--linhas", type=int, action="append",
+                        help="Tamanho do banco sintético (pode ser repetido; padrão: 1000 e 100000).")
+    parser.add_argument("--versao", action="append", choices=tuple(ARQUIVOS_VERSOES),
+                        help="Versão a medir (pode ser repetido; padrão: todas).")
+    parser.add_argument("--repeticoes", type=int, default=3,
+                        help="Repetições das operações sobre a tabela inteira (padrão: 3).")
+    parser.add_argument("--amostras", type=int, default=20,
+                        help="Chamadas das operações por registro: busca, inclusão, alteração, exclusão (padrão: 20).")
+    parser.add_argument("--linhas-importacao", type=int, default=1000,
+                        help="Linhas do arquivo importado (padrão: 1000).")
+    parser.add_argument("--semente", type=int, default=0, help="Semente dos dados e das amostras (padrão: 0).")
+    parser.add_argument("--pasta", help="Pasta de trabalho para os bancos (padrão: temporária).")
+    parser.add_argument("-o", "--saida", default="-", help="Arquivo JSON de saída ou '-' para a saída padrão (padrão: -).")
+    parser.add_argument("--base", help="Resultados anteriores (JSON) para comparar; sai com código 1 se houver regressão.")
+    parser.add_argument("--limite", type=float, default=0.10,
+                        help="Aumento relativo da mediana considerado regressão na comparação (padrão: 0.10).")
+    args = parser.parse_args(argv)
+
+    tamanhos = args.linhas or [1000, 100000]
+    if min(tamanhos) < 1 or args.repeticoes < 1 or args.amostras < 1 or args.linhas_importacao < 1:
+        parser.error("As quantidades devem ser maiores que zero.")
+
+    def avisar(mensagem):
+        print(mensagem, file=sys.stderr)
+
+    if args.pasta:
+        os.makedirs(args.pasta, exist_ok=True)
+        resultado = executar(args.versao or list(ARQUIVOS_VERSOES), tamanhos, args.pasta, args.repeticoes,
+                             args.amostras, args.linhas_importacao, args.semente, avisar)
+    else:
+        with tempfile.TemporaryDirectory(prefix="benchmark_tickets_") as pasta:
+            resultado = executar(args.versao or list(ARQUIVOS_VERSOES), tamanhos, pasta, args.repeticoes,
+                                 args.amostras, args.linhas_importacao, args.semente, avisar)
+
+    texto = json.dumps(resultado, ensure_ascii=False, indent=2)
+    if args.saida == "-":
+        print(texto)
+    else:
+        with open(args.saida, "w", encoding="utf-8") as arquivo:
+            arquivo.write(texto + "\n")
+
+    if args.base:
+        with open(args.base, encoding="utf-8") as arquivo:
+            base = json.load(arquivo)
+        linhas_comparacao = comparar(base, resultado, args.limite)
+        imprimir_comparacao(linhas_comparacao, sys.stderr)
+        return 1 if any(linha["regressao"] for linha in linhas_comparacao) else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
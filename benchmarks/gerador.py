@@ -0,0 +1,161 @@
+import argparse
+import csv
+import os
+import sqlite3
+import sys
+from datetime import date, timedelta
+from pathlib import Path
+
+import numpy as np
+
+from compressao import abrir_arquivo
+
+# Gerador de bancos sintéticos com a tabela 'registros' no esquema original (o mesmo da V1), para que
+# todas as versões abram o mesmo arquivo. As descrições e ações partem da amostra V1/dados_extraidos.csv
+# e se repetem com frequência decrescente (poucas muito comuns, muitas raras); cada ticket tem um ou mais
+# registros em dias próximos; as datas ficam em DD/MM/AAAA, em ordem cronológica pelo id.
+
+AMOSTRA = Path(__file__).resolve().parent.parent / "V1" / "dados_extraidos.csv"
+TAMANHO_LOTE = 50000
+PRIMEIRO_TICKET = 400000
+
+# Proporção de cada status nos registros antigos e nos das últimas duas semanas (ainda em aberto)
+STATUS = ("Resolvido", "Fechado", "Em Andamento", "Aguardando Parceiro", "Pendente de Resposta", "Cancelado", "Concluído")
+PESOS_ANTIGOS = (0.40, 0.25, 0.04, 0.06, 0.05, 0.06, 0.14)
+PESOS_RECENTES = (0.15, 0.08, 0.30, 0.22, 0.18, 0.04, 0.03)
+DIAS_RECENTES = 14
+
+DESCRICOES_PADRAO = ("Ligação não registrada", "Ligação com tempo incorreto", "Zeragem de ligação")
+ACOES_PADRAO = ("Validado e registrado na timeline", "Enviado ticket parceiro", "Feito ajuste via runbook")
+COMPLEMENTOS = ("cliente", "parceiro", "URA", "fila de atendimento", "timeline", "gravação", "relatório", "operador")
+
+ESQUEMA = (
+    "CREATE TABLE IF NOT EXISTS registros ("
+    "id INTEGER PRIMARY KEY AUTOINCREMENT, "
+    "data TEXT NOT NULL, "
+    "numero_ticket TEXT NOT NULL, "
+    "descricao TEXT NOT NULL, "
+    "acao_realizada TEXT, "
+    "status TEXT)"
+)
+
+
+def carregar_amostra(caminho=AMOSTRA):
+    """Descrições e ações distintas da amostra; usa uma lista fixa se o arquivo não existir."""
+    try:
+        with open(caminho, newline="", encoding="utf-8-sig") as arquivo:
+            linhas = list(csv.DictReader(arquivo))
+    except OSError:
+        return list(DESCRICOES_PADRAO), list(ACOES_PADRAO)
+    descricoes = sorted({linha["descricao"].strip() for linha in linhas if linha.get("descricao", "").strip()})
+    acoes = sorted({linha["acao_realizada"].strip() for linha in linhas if linha.get("acao_realizada", "").strip()})
+    return descricoes or list(DESCRICOES_PADRAO), acoes or list(ACOES_PADRAO)
+
+
+def vocabulario(base, quantidade):
+    """
+    Amplia os textos da amostra para 'quantidade' textos distintos e devolve (textos, probabilidades)
+    com distribuição de Zipf: o primeiro texto é o mais frequente.
+    """
+    textos = list(base)
+    n = 0
+    while len(textos) < quantidade:
+        texto = base[n % len(base)]
+        complemento = COMPLEMENTOS[(n // len(base)) % len(COMPLEMENTOS)]
+        textos.append(f"{texto} - {complemento} {n // (len(base) * len(COMPLEMENTOS)) + 1}")
+        n += 1
+    textos = np.array(textos[:quantidade], dtype=object)
+    pesos = 1.0 / np.arange(1, quantidade + 1) ** 1.1
+    return textos, pesos / pesos.sum()
+
+
+def dias_padrao(linhas):
+    """Período coberto pelos dados: cerca de 100 registros por dia, entre 30 dias e 10 anos."""
+    return int(min(max(linhas // 100, 30), 10 * 365))
+
+
+def gerar_registros(linhas, semente=0, dias=None, fim=None, primeiro_ticket=PRIMEIRO_TICKET):
+    """
+    Gera os registros (data, numero_ticket, descricao, acao_realizada, status) em lotes de TAMANHO_LOTE,
+    terminando na data 'fim' (padrão: hoje).
+    """
+    rng = np.random.default_rng(semente)
+    dias = dias or dias_padrao(linhas)
+    fim = fim or date.today()
+    inicio = fim - timedelta(days=dias - 1)
+    rotulos_datas = np.array([(inicio + timedelta(days=d)).strftime("%d/%m/%Y") for d in range(dias)], dtype=object)
+    base_descricoes, base_acoes = carregar_amostra()
+    descricoes, pesos_descricoes = vocabulario(base_descricoes, 300)
+    acoes, pesos_acoes = vocabulario(base_acoes, 120)
+    status = np.array(STATUS, dtype=object)
+
+    proximo_ticket = primeiro_ticket
+    for comeco in range(0, linhas, TAMANHO_LOTE):
+        tamanho = min(TAMANHO_LOTE, linhas - comeco)
+        # Tickets com um ou mais registros (geométrica: a maioria tem só um)
+        repeticoes = rng.geometric(0.75, size=tamanho)
+        tickets = np.repeat(np.arange(tamanho), repeticoes)[:tamanho]
+        numeros = (proximo_ticket + tickets).astype(str).astype(object)
+        proximo_ticket += int(tickets[-1]) + 1
+
+        # Dia cresce com o id; registros seguintes do mesmo ticket ficam alguns dias depois do primeiro
+        posicoes = (comeco + np.arange(tamanho)) * dias // linhas
+        primeiro_do_ticket = np.r_[True, tickets[1:] != tickets[:-1]]
+        atraso = np.where(primeiro_do_ticket, 0, rng.integers(0, 5, size=tamanho))
+        dia = np.minimum(posicoes + atraso, dias - 1)
+
+        recentes = dia >= dias - DIAS_RECENTES
+        escolha_status = np.where(recentes, rng.choice(len(STATUS), size=tamanho, p=PESOS_RECENTES),
+                                  rng.choice(len(STATUS), size=tamanho, p=PESOS_ANTIGOS))
+        acao = acoes[rng.choice(len(acoes), size=tamanho, p=pesos_acoes)]
+        acao[rng.random(tamanho) < 0.2] = ""
+
+        yield list(zip(rotulos_datas[dia], numeros, descricoes[rng.choice(len(descricoes), size=tamanho, p=pesos_descricoes)],
+                       acao, status[escolha_status]))
+
+
+def gerar_banco(caminho, linhas, semente=0, dias=None, fim=None):
+    """Cria (ou substitui) o banco em 'caminho' com 'linhas' registros sintéticos."""
+    if os.path.exists(caminho):
+        os.remove(caminho)
+    conn = sqlite3.connect(caminho)
+    try:
+        # Somente para a geração: o arquivo é descartável até terminar
+        conn.execute("PRAGMA journal_mode = OFF")
+        conn.execute("PRAGMA synchronous = OFF")
+        conn.execute(ESQUEMA)
+        for lote in gerar_registros(linhas, semente, dias, fim):
+            conn.executemany("INSERT INTO registros (data, numero_ticket, descricao, acao_realizada, status) "
+                             "VALUES (?, ?, ?, ?, ?)", lote)
+        conn.commit()
+    finally:
+        conn.close()
+    return caminho
+
+
+def gerar_csv(caminho, linhas, semente=1, primeiro_ticket=PRIMEIRO_TICKET + 10_000_000):
+    """Arquivo de importação (colunas do modelo de importação) com tickets que não existem no banco gerado."""
+    with abrir_arquivo(caminho, "wt", encoding="utf-8") as arquivo:
+        writer = csv.writer(arquivo)
+        writer.writerow(["data", "numero_ticket", "descricao", "acao_realizada", "status"])
+        for lote in gerar_registros(linhas, semente, primeiro_ticket=primeiro_ticket):
+            writer.writerows(lote)
+    return caminho
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Gera um banco tickets.db sintético para benchmarks.")
+    parser.add_argument("-o", "--saida", default="bench.db", help="Banco a gerar (padrão: bench.db).")
+    parser.add_argument("--linhas", type=int, default=100000, help="Quantidade de registros (padrão: 100000).")
+    parser.add_argument("--dias", type=int, help="Dias cobertos pelos dados (padrão: cerca de 100 registros por dia).")
+    parser.add_argument("--semente", type=int, default=0, help="Semente do gerador (padrão: 0).")
+    args = parser.parse_args(argv)
+    if args.linhas < 1:
+        parser.error("--linhas deve ser maior que zero.")
+    gerar_banco(args.saida, args.linhas, args.semente, args.dias)
+    print(args.saida)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
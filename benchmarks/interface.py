@@ -0,0 +1,333 @@
+import argparse
+import contextlib
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+from benchmarks.comparar import comparar, imprimir_comparacao
+from benchmarks.executar import FORMATO_RESULTADOS, resumir
+from benchmarks.gerador import gerar_banco
+from benchmarks.versoes import RAIZ, Versao
+
+# Benchmarks da interface: abre o TicketApp de cada versão sobre um banco gerado, em um display X virtual
+# (Xvfb), e executa os fluxos mais comuns, medindo o tempo de parede até a tela ficar pronta e o pico de
+# memória (RSS). Cada fluxo roda em um processo novo, com uma cópia nova do banco, para que um não
+# influencie o outro. A V1 não entra: a interface dela não compila.
+#
+# Exemplos:
+#   python -m benchmarks.interface --linhas 10000 -o interface.json
+#   python -m benchmarks.interface --versao atual --linhas 100000 --base interface_base.json
+
+VERSOES_INTERFACE = ("V2", "V3", "atual")
+FLUXOS = ("inicializacao", "inicializacao_instantaneo", "adicionar", "filtrar", "buscar", "editar", "excluir", "grafico")
+TEMPO_LIMITE = 600  # segundos por fluxo
+TELA_VIRTUAL = "1920x1080x24"
+
+
+# --- Processo filho: executa um fluxo e imprime a medição em JSON ---
+
+def _memoria():
+    """RSS atual e pico (VmRSS e VmHWM, em KB) do próprio processo."""
+    valores = {}
+    with open("/proc/self/status", encoding="ascii") as arquivo:
+        for linha in arquivo:
+            if linha.startswith(("VmRSS:", "VmHWM:")):
+                nome, valor = linha.split(":", 1)
+                valores[nome] = int(valor.split()[0])
+    return valores.get("VmRSS", 0), valores.get("VmHWM", 0)
+
+
+def _zerar_pico_memoria():
+    """Reinicia o VmHWM (Linux ≥ 4.0), para que o pico medido seja o do fluxo e não o da inicialização."""
+    try:
+        with open("/proc/self/clear_refs", "w", encoding="ascii") as arquivo:
+            arquivo.write("5")
+    except OSError:
+        pass
+
+
+def _preparar_tk():
+    """
+    Ajustes para rodar os fluxos sem intervenção: as caixas de diálogo respondem na hora (seriam modais e
+    travariam o roteiro) e o estado 'zoomed', inexistente no X11, vira o atributo equivalente
+    (as versões antigas chamam root.state("zoomed") diretamente).
+    """
+    import tkinter as tk
+    from tkinter import messagebox
+
+    for nome in ("showinfo", "showwarning", "showerror"):
+        setattr(messagebox, nome, lambda *args, **kwargs: "ok")
+    for nome in ("askyesno", "askokcancel"):
+        setattr(messagebox, nome, lambda *args, **kwargs: True)
+
+    estado_original = tk.Wm.wm_state
+
+    def wm_state(self, newstate=None):
+        if newstate == "zoomed":
+            try:
+                return estado_original(self, newstate)
+            except tk.TclError:
+                return self.wm_attributes("-zoomed", True)
+        return estado_original(self, newstate)
+
+    tk.Wm.wm_state = tk.Wm.state = wm_state
+    return tk
+
+
+def _aguardar(root, condicao):
+    """Processa os eventos da interface até a condição ser satisfeita."""
+    limite = time.perf_counter() + TEMPO_LIMITE
+    root.update()
+    while not condicao():
+        if time.perf_counter() > limite:
+            raise TimeoutError("Tempo limite excedido aguardando a interface.")
+        time.sleep(0.005)
+        root.update()
+
+
+def _total_registros(app):
+    conn = app.db.conectar()
+    try:
+        return conn.execute("SELECT COUNT(*) FROM registros").fetchone()[0]
+    finally:
+        conn.close()
+
+
+def _tabela_completa(app, total):
+    """Tabela principal com todas as linhas (na versão atual, também sem preenchimento em partes pendente)."""
+    return len(app.tree.get_children()) == total and getattr(app, "_table_fill_job", None) is None
+
+
+def _janelas(root):
+    return [janela for janela in root.winfo_children() if janela.winfo_class() == "Toplevel"]
+
+
+def _iniciar(tk, classe_app):
+    """Cria a janela e o aplicativo; retorna (root, app, segundos até a primeira pintura)."""
+    inicio = time.perf_counter()
+    root = tk.Tk()
+    app = classe_app(root)
+    root.update()
+    return root, app, time.perf_counter() - inicio
+
+
+def executar_fluxo(nome_versao, fluxo):
+    """Executa um fluxo no diretório atual (que contém o tickets.db) e devolve a medição."""
+    tk = _preparar_tk()
+    versao = Versao(nome_versao)
+    medicao = {"versao": nome_versao, "fluxo": fluxo}
+
+    if fluxo == "inicializacao_instantaneo":
+        # Primeira abertura grava o instantâneo do painel; a medida é a segunda
+        root, app, _ = _iniciar(tk, versao.app)
+        total = _total_registros(app)
+        _aguardar(root, lambda: _tabela_completa(app, total))
+        root.destroy()
+
+    inicio = time.perf_counter()
+    root, app, primeira_pintura = _iniciar(tk, versao.app)
+    total = _total_registros(app)
+    _aguardar(root, lambda: _tabela_completa(app, total))
+    if fluxo.startswith("inicializacao"):
+        medicao["tempo_ms"] = (time.perf_counter() - inicio) * 1000
+        medicao["primeira_pintura_ms"] = primeira_pintura * 1000
+        medicao["rss_kb"], medicao["rss_pico_kb"] = _memoria()
+        return medicao
+
+    roteiro = _preparar_fluxo(app, fluxo)
+    if roteiro is None:
+        medicao["ignorado"] = "não existe nesta versão"
+        return medicao
+
+    _zerar_pico_memoria()
+    abertas = set(str(janela) for janela in _janelas(root))
+    acao, pronto = roteiro(total, abertas)
+    inicio = time.perf_counter()
+    acao()
+    _aguardar(root, pronto)
+    medicao["tempo_ms"] = (time.perf_counter() - inicio) * 1000
+    medicao["rss_kb"], medicao["rss_pico_kb"] = _memoria()
+    return medicao
+
+
+def _preparar_fluxo(app, fluxo):
+    """
+    Deixa a tela no estado de partida do fluxo e devolve uma função (total, janelas abertas) → (ação, pronto),
+    ou None se a versão não tiver o fluxo.
+    """
+    root = app.root
+
+    def nova_janela(abertas):
+        return lambda: any(str(janela) not in abertas for janela in _janelas(root))
+
+    if fluxo == "adicionar":
+        def adicionar(total, abertas):
+            for campo, valor in ((app.data_entry, datetime.now().strftime("%d/%m/%Y")), (app.numero_entry, "99999999"),
+                                 (app.descricao_entry, "Ligação não registrada"), (app.acao_entry, "Validado")):
+                campo.delete(0, "end")
+                campo.insert(0, valor)
+            return app._add_record, lambda: _tabela_completa(app, total + 1)
+        return adicionar
+
+    if fluxo == "filtrar":
+        if not hasattr(app, "_apply_status_filter"):
+            return None
+        app.filter_status_combobox.set("Resolvido")
+        return lambda total, abertas: (app._apply_status_filter, lambda: True)
+
+    if fluxo == "buscar":
+        primeira = app.tree.get_children()[0]
+        app.numero_entry.delete(0, "end")
+        app.numero_entry.insert(0, app.tree.item(primeira, "values")[2])
+        return lambda total, abertas: (app._search_record, lambda: True)
+
+    if fluxo == "editar":
+        # V3 e atual editam o registro selecionado na tabela; a V2 abre a lista completa para escolher
+        primeira = app.tree.get_children()[0]
+        app.tree.selection_set(primeira)
+        app.tree.focus(primeira)
+        return lambda total, abertas: (app._open_edit_window, nova_janela(abertas))
+
+    if fluxo == "excluir":
+        return lambda total, abertas: (app._open_delete_window, nova_janela(abertas))
+
+    if fluxo == "grafico":
+        if hasattr(app, "_chart_image"):
+            # Versão atual: o gráfico é renderizado em outro processo e chega como imagem
+            return lambda total, abertas: (app._show_chart_popup, lambda: app._chart_image is not None)
+        return lambda total, abertas: (app._show_chart_popup, nova_janela(abertas))
+
+    raise ValueError(f"Fluxo desconhecido: {fluxo}")
+
+
+# --- Processo principal: gera o banco, inicia o Xvfb e coleta as medições ---
+
+@contextlib.contextmanager
+def display_virtual(display=None):
+    """
+    Usa o display informado (ou o DISPLAY do ambiente); sem nenhum, inicia um Xvfb em um número livre
+    e o encerra ao final.
+    """
+    display = display or os.environ.get("DISPLAY")
+    if display:
+        yield display
+        return
+    if shutil.which("Xvfb") is None:
+        raise RuntimeError("Nenhum display disponível e o Xvfb não está instalado (ex.: apt install xvfb).")
+    numero = next(n for n in range(99, 200) if not os.path.exists(f"/tmp/.X11-unix/X{n}"))
+    processo = subprocess.Popen(["Xvfb", f":{numero}", "-screen", "0", TELA_VIRTUAL, "-nolisten", "tcp"],
+                                stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        limite = time.perf_counter() + 10
+        while not os.path.exists(f"/tmp/.X11-unix/X{numero}"):
+            if processo.poll() is not None or time.perf_counter() > limite:
+                raise RuntimeError("Não foi possível iniciar o Xvfb.")
+            time.sleep(0.05)
+        yield f":{numero}"
+    finally:
+        processo.terminate()
+        processo.wait()
+
+
+def medir_fluxo(versao, fluxo, banco, display):
+    """Roda o fluxo em um processo novo, em uma pasta com uma cópia do banco como tickets.db."""
+    with tempfile.TemporaryDirectory(prefix="benchmark_interface_") as pasta:
+        shutil.copyfile(banco, os.path.join(pasta, "tickets.db"))
+        ambiente = {**os.environ, "DISPLAY": display,
+                    "PYTHONPATH": os.pathsep.join(filter(None, [str(RAIZ), os.environ.get("PYTHONPATH")]))}
+        processo = subprocess.run([sys.executable, "-m", "benchmarks.interface", "--filho", versao, fluxo],
+                                  cwd=pasta, env=ambiente, capture_output=True, text=True, timeout=TEMPO_LIMITE * 2)
+    if processo.returncode != 0:
+        raise RuntimeError(f"{versao} / {fluxo} falhou:\n{processo.stderr.strip()}")
+    return json.loads(processo.stdout.strip().splitlines()[-1])
+
+
+def executar(versoes, tamanhos, fluxos, repeticoes, display, pasta, semente=0, avisar=print):
+    resultados, ignorados = [], []
+    for linhas in tamanhos:
+        avisar(f"Gerando banco com {linhas} linhas...")
+        banco = gerar_banco(os.path.join(pasta, f"base_{linhas}.db"), linhas, semente)
+        for versao in versoes:
+            for fluxo in fluxos:
+                avisar(f"{versao} / {linhas} linhas / {fluxo}")
+                medicoes = [medir_fluxo(versao, fluxo, banco, display) for _ in range(repeticoes)]
+                if "ignorado" in medicoes[0]:
+                    ignorados.append({"versao": versao, "linhas": linhas, "operacao": fluxo, "motivo": medicoes[0]["ignorado"]})
+                    continue
+                resultado = {"versao": versao, "linhas": linhas, "operacao": fluxo,
+                             **resumir([m["tempo_ms"] / 1000 for m in medicoes]),
+                             "rss_pico_kb": max(m["rss_pico_kb"] for m in medicoes)}
+                if "primeira_pintura_ms" in medicoes[0]:
+                    resultado["primeira_pintura_ms"] = round(min(m["primeira_pintura_ms"] for m in medicoes), 3)
+                resultados.append(resultado)
+        os.remove(banco)
+    return resultados, ignorados
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Mede os fluxos da interface de cada versão em um display virtual.")
+    parser.add_argument("--linhas", type=int, action="append",
+                        help="Tamanho do banco sintético (pode ser repetido; padrão: 10000).")
+    parser.add_argument("--versao", action="append", choices=VERSOES_INTERFACE,
+                        help="Versão a medir (pode ser repetido; padrão: todas).")
+    parser.add_argument("--fluxo", action="append", choices=FLUXOS, help="Fluxo a medir (pode ser repetido; padrão: todos).")
+    parser.add_argument("--repeticoes", type=int, default=3, help="Execuções de cada fluxo (padrão: 3).")
+    parser.add_argument("--semente", type=int, default=0, help="Semente dos dados (padrão: 0).")
+    parser.add_argument("--display", help="Display X a usar (padrão: $DISPLAY ou um Xvfb iniciado na hora).")
+    parser.add_argument("-o", "--saida", default="-", help="Arquivo JSON de saída ou '-' para a saída padrão (padrão: -).")
+    parser.add_argument("--base", help="Resultados anteriores (JSON) para comparar; sai com código 1 se houver regressão.")
+    parser.add_argument("--limite", type=float, default=0.10,
+                        help="Aumento relativo da mediana considerado regressão na comparação (padrão: 0.10).")
+    parser.add_argument("--filho", nargs=2, metavar=("VERSAO", "FLUXO"), help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.filho:
+        print(json.dumps(executar_fluxo(*args.filho)), flush=True)
+        os._exit(0)  # Encerra sem esperar o fechamento da interface e dos processos de renderização
+
+    tamanhos = args.linhas or [10000]
+    if min(tamanhos) < 1 or args.repeticoes < 1:
+        parser.error("As quantidades devem ser maiores que zero.")
+
+    def avisar(mensagem):
+        print(mensagem, file=sys.stderr)
+
+    versoes = args.versao or list(VERSOES_INTERFACE)
+    try:
+        with display_virtual(args.display) as display, tempfile.TemporaryDirectory(prefix="benchmark_tickets_") as pasta:
+            resultados, ignorados = executar(versoes, tamanhos, args.fluxo or list(FLUXOS), args.repeticoes,
+                                             display, pasta, args.semente, avisar)
+    except RuntimeError as e:
+        print(e, file=sys.stderr)
+        return 2
+
+    resultado = {
+        "formato": FORMATO_RESULTADOS,
+        "gerado_em": datetime.now().isoformat(timespec="seconds"),
+        "parametros": {"versoes": versoes, "linhas": tamanhos, "repeticoes": args.repeticoes, "semente": args.semente},
+        "resultados": resultados,
+        "ignorados": ignorados,
+    }
+    texto = json.dumps(resultado, ensure_ascii=False, indent=2)
+    if args.saida == "-":
+        print(texto)
+    else:
+        with open(args.saida, "w", encoding="utf-8") as arquivo:
+            arquivo.write(texto + "\n")
+
+    if args.base:
+        with open(args.base, encoding="utf-8") as arquivo:
+            base = json.load(arquivo)
+        linhas_comparacao = comparar(base, resultado, args.limite)
+        imprimir_comparacao(linhas_comparacao, sys.stderr)
+        return 1 if any(linha["regressao"] for linha in linhas_comparacao) else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,260 @@
+import argparse
+import os
+import shutil
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+from banco_dados import DatabaseManager
+from benchmarks.gerador import gerar_banco
+from monitoramento import impressao_digital
+
+# Verifica o plano (EXPLAIN QUERY PLAN) de cada comando que o DatabaseManager executa, sobre um banco sintético.
+# Cada método público roda com argumentos representativos; os comandos são capturados pela conexão
+# (set_trace_callback, inclusive os executados direto na conexão, fora de _execute_query) e agrupados pela
+# impressão digital. A regra de cada método diz o que o plano não pode ter:
+#   INDICE         caminhos quentes: nenhuma varredura das tabelas grandes sem índice e nenhuma ordenação temporária
+#   SEM_ORDENACAO  a varredura é inevitável (listagem completa, LIKE '%...%'), mas a ordem vem do índice
+#   LIVRE          migração e agregações da tabela inteira (só aparecem com --verbose)
+# Termina com código 1 se algum plano violar a regra ou se algum método público não tiver cenário.
+#
+# Exemplos:
+#   python -m benchmarks.planos
+#   python -m benchmarks.planos --linhas 50000 --verbose
+
+INDICE, SEM_ORDENACAO, LIVRE = "indice", "sem_ordenacao", "livre"
+
+# Tabelas de resumo, pequenas por construção: podem ser lidas por inteiro
+TABELAS_PEQUENAS = {"resumo_diario", "esboco_diario", "esboco_pendente", "versao_dados", "CONSTANT ROW"}
+
+_COMANDOS_COM_PLANO = ("SELECT", "WITH", "INSERT", "UPDATE", "DELETE", "REPLACE")
+
+REGRAS = {
+    # Abertura de um banco novo ou de versão anterior do esquema (cria tabelas, resumos e índices)
+    "migracao": LIVRE,
+    # Abertura de um banco já na versão atual: acontece a cada início do aplicativo
+    "abertura": INDICE,
+    "add_record": INDICE,
+    "add_records": INDICE,
+    "update_record": INDICE,
+    "delete_record": INDICE,
+    "delete_records": INDICE,
+    "fetch_all_records": SEM_ORDENACAO,
+    "search_by_number": SEM_ORDENACAO,
+    "fetch_record_by_ticket_number": INDICE,
+    "fetch_record_by_id": INDICE,
+    "fetch_records_page": INDICE,
+    "count_records_page": INDICE,
+    "fetch_records_by_status": INDICE,
+    "fetch_records_before": SEM_ORDENACAO,
+    "get_data_version": INDICE,
+    "sync_record_cache": INDICE,
+    "cache_records": INDICE,
+    "fetch_daily_status_counts": INDICE,
+    "fetch_status_durations": INDICE,
+    "fetch_current_status_since": INDICE,
+    "fetch_stale_tickets": INDICE,
+    "fetch_status_history": INDICE,
+    "refresh_distinct_sketches": INDICE,
+    "fetch_day_sketches": INDICE,
+    "count_distinct_tickets": INDICE,
+    "fetch_existing_hashes": INDICE,
+    "fetch_duplicate_groups": LIVRE,
+    "fetch_text_usage": LIVRE,
+    "fetch_imported_hashes": INDICE,
+    "register_imported_file": INDICE,
+}
+
+
+def metodos_publicos():
+    """Métodos públicos do DatabaseManager que executam comandos (todos, exceto a abertura da conexão)."""
+    return sorted(nome for nome, valor in vars(DatabaseManager).items()
+                  if callable(valor) and not nome.startswith("_") and nome != "conectar")
+
+
+def _amostras(banco):
+    conn = sqlite3.connect(banco)
+    try:
+        ids = [linha[0] for linha in conn.execute("SELECT id FROM registros ORDER BY id LIMIT 4")]
+        numero, hash_existente = conn.execute(
+            "SELECT numero_ticket, hash_conteudo FROM registros WHERE id = ?", (ids[0],)).fetchone()
+    finally:
+        conn.close()
+    return ids, numero, hash_existente
+
+
+def cenarios(banco):
+    """(método, chamada) de cada cenário, na ordem de execução; as leituras vêm antes das exclusões."""
+    ids, numero, hash_existente = _amostras(banco)
+    hoje = datetime.now().strftime("%d/%m/%Y")
+    dia = int(time.time() // 86400)
+    agora = int(time.time())
+    espera = ("Aguardando Parceiro", "Pendente de Resposta")
+    return [
+        ("add_record", lambda db: db.add_record(hoje, "90000001", "Ligação não registrada", "", "Em Andamento")),
+        ("add_records", lambda db: db.add_records([(hoje, "90000002", "Ligação não registrada", "", "Em Andamento"),
+                                                   (hoje, "90000003", "Validado", "Concluído", "Resolvido")])),
+        ("update_record", lambda db: db.update_record(ids[0], hoje, numero, "Validado", "Concluído", "Resolvido")),
+        ("fetch_all_records", lambda db: db.fetch_all_records()),
+        ("fetch_all_records", lambda db: db.fetch_all_records(summary=True)),
+        ("search_by_number", lambda db: db.search_by_number(numero[1:-1])),
+        ("search_by_number", lambda db: db.search_by_number(numero[1:-1], summary=True)),
+        ("fetch_record_by_ticket_number", lambda db: db.fetch_record_by_ticket_number(numero)),
+        ("fetch_record_by_id", lambda db: db.fetch_record_by_id(ids[0])),
+        # Navegação dos gráficos: sem filtro, por status, por intervalo de dias, ambos e a página seguinte
+        ("fetch_records_page", lambda db: db.fetch_records_page()),
+        ("fetch_records_page", lambda db: db.fetch_records_page(status="Resolvido")),
+        ("fetch_records_page", lambda db: db.fetch_records_page(first_day=dia - 30, last_day=dia)),
+        ("fetch_records_page", lambda db: db.fetch_records_page("Resolvido", dia - 30, dia, after=(dia, ids[-1]),
+                                                                summary=True)),
+        ("count_records_page", lambda db: db.count_records_page()),
+        ("count_records_page", lambda db: db.count_records_page("Resolvido", dia - 30, dia)),
+        ("fetch_records_by_status", lambda db: db.fetch_records_by_status("Resolvido", summary=True)),
+        # Seleção da exclusão: primeira página (percorre pela chave primária) e as seguintes
+        ("fetch_records_before", lambda db: db.fetch_records_before(summary=True)),
+        ("fetch_records_before", lambda db: db.fetch_records_before(ids[-1])),
+        ("get_data_version", lambda db: db.get_data_version()),
+        # Recarga da tabela: confere a versão dos dados e guarda as linhas exibidas no cache de registros
+        ("sync_record_cache", lambda db: db.sync_record_cache()),
+        ("cache_records", lambda db: db.cache_records([(ids[0], hoje, numero, "Validado", "Concluído", "Resolvido")],
+                                                      summary=True)),
+        ("fetch_daily_status_counts", lambda db: db.fetch_daily_status_counts()),
+        ("fetch_status_durations", lambda db: db.fetch_status_durations(agora - 30 * 86400)),
+        ("fetch_current_status_since", lambda db: db.fetch_current_status_since(espera)),
+        ("fetch_stale_tickets", lambda db: db.fetch_stale_tickets(espera, agora - 7 * 86400)),
+        ("fetch_status_history", lambda db: db.fetch_status_history(ids[0])),
+        ("refresh_distinct_sketches", lambda db: db.refresh_distinct_sketches()),
+        ("fetch_day_sketches", lambda db: db.fetch_day_sketches(dia - 30, dia)),
+        # Intervalo pequeno (contagem exata) e intervalo com todos os registros (união dos esboços)
+        ("count_distinct_tickets", lambda db: db.count_distinct_tickets(dia - 30, dia)),
+        ("count_distinct_tickets", lambda db: db.count_distinct_tickets(exact_limit=0)),
+        ("fetch_existing_hashes", lambda db: db.fetch_existing_hashes({hash_existente, 1, 2})),
+        ("fetch_duplicate_groups", lambda db: db.fetch_duplicate_groups()),
+        ("fetch_text_usage", lambda db: db.fetch_text_usage("descricao")),
+        ("fetch_text_usage", lambda db: db.fetch_text_usage("acao_realizada")),
+        ("fetch_imported_hashes", lambda db: db.fetch_imported_hashes({"a" * 64})),
+        ("register_imported_file", lambda db: db.register_imported_file("a" * 64, "importacao.csv", 10, agora, 1, 0)),
+        ("delete_record", lambda db: db.delete_record(ids[1])),
+        ("delete_records", lambda db: db.delete_records(ids[2:])),
+    ]
+
+
+def _falhar(erro):
+    raise erro
+
+
+class _Captura:
+    """Guarda o primeiro comando de cada impressão digital executado em cada método."""
+
+    def __init__(self):
+        self.metodo = None
+        self.comandos = {}
+
+    def __call__(self, sql):
+        if sql and sql.lstrip().upper().startswith(_COMANDOS_COM_PLANO):
+            self.comandos.setdefault((self.metodo, impressao_digital(sql)), sql)
+
+
+def capturar(banco):
+    """Executa todos os cenários sobre o banco e retorna ({(método, impressão): comando}, métodos sem cenário)."""
+    captura = _Captura()
+    conectar = DatabaseManager.conectar
+
+    def conectar_rastreado(self):
+        conn = conectar(self)
+        # Os valores aparecem no texto do comando, então o plano pode ser pedido depois, sem os parâmetros
+        conn.set_trace_callback(captura)
+        return conn
+
+    DatabaseManager.conectar = conectar_rastreado
+    try:
+        captura.metodo = "migracao"
+        DatabaseManager(banco, on_error=_falhar)
+        captura.metodo = "abertura"
+        # Sem o cache de registros: as buscas por id e por número precisam chegar ao banco
+        db = DatabaseManager(banco, on_error=_falhar, cache_size=0)
+        executados = set()
+        for metodo, chamada in cenarios(banco):
+            captura.metodo = metodo
+            chamada(db)
+            executados.add(metodo)
+    finally:
+        DatabaseManager.conectar = conectar
+    return captura.comandos, sorted(set(metodos_publicos()) - executados)
+
+
+def violacoes(regra, plano, visoes=()):
+    """
+    Linhas do plano que a regra não permite. Em UPDATE/DELETE numa visão, "SCAN <visão>" percorre só as linhas
+    da visão já selecionadas pelo WHERE (as linhas anteriores do plano), não uma tabela.
+    """
+    encontradas = []
+    for linha in plano:
+        ordenacao = linha.startswith("USE TEMP B-TREE FOR") and ("ORDER BY" in linha or "GROUP BY" in linha
+                                                                 or linha.endswith("FOR DISTINCT"))
+        varredura = (linha.startswith("SCAN ") and " USING " not in linha
+                     and linha.split(" ", 1)[1] not in TABELAS_PEQUENAS | set(visoes))
+        if (regra in (INDICE, SEM_ORDENACAO) and ordenacao) or (regra == INDICE and varredura):
+            encontradas.append(linha)
+    return encontradas
+
+
+def verificar(banco):
+    """Plano e violações de cada comando capturado. Retorna (verificações, métodos sem cenário, métodos sem regra)."""
+    comandos, sem_cenario = capturar(banco)
+    conn = sqlite3.connect(banco)
+    verificacoes = []
+    try:
+        visoes = {linha[0] for linha in conn.execute("SELECT name FROM sqlite_master WHERE type = 'view'")}
+        for (metodo, impressao), sql in comandos.items():
+            regra = REGRAS.get(metodo)
+            plano = [linha[3] for linha in conn.execute(f"EXPLAIN QUERY PLAN {sql}")]
+            verificacoes.append({"metodo": metodo, "regra": regra, "impressao": impressao, "plano": plano,
+                                 "violacoes": violacoes(regra, plano, visoes) if regra else []})
+    finally:
+        conn.close()
+    sem_regra = sorted(set(metodos_publicos()) - set(REGRAS))
+    return verificacoes, sem_cenario, sem_regra
+
+
+def imprimir(verificacoes, sem_cenario, sem_regra, detalhado=False, arquivo=sys.stdout):
+    for item in verificacoes:
+        if not item["violacoes"] and not detalhado:
+            continue
+        marca = "VIOLAÇÃO" if item["violacoes"] else "ok"
+        print(f"[{marca}] {item['metodo']} ({item['regra']}): {item['impressao'][:160]}", file=arquivo)
+        for linha in item["plano"]:
+            destaque = "  <--" if linha in item["violacoes"] else ""
+            print(f"    {linha}{destaque}", file=arquivo)
+    for metodo in sem_cenario:
+        print(f"[SEM CENÁRIO] {metodo}: acrescente uma chamada em benchmarks/planos.py (cenarios)", file=arquivo)
+    for metodo in sem_regra:
+        print(f"[SEM REGRA] {metodo}: acrescente a regra do método em benchmarks/planos.py (REGRAS)", file=arquivo)
+    falhas = sum(1 for item in verificacoes if item["violacoes"])
+    print(f"{len(verificacoes)} comandos verificados, {falhas} com violação.", file=arquivo)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Verifica os planos das consultas do DatabaseManager.")
+    parser.add_argument("--linhas", type=int, default=20000, help="Tamanho do banco sintético (padrão: 20000).")
+    parser.add_argument("--banco", help="Verifica uma cópia deste banco em vez de um sintético (o original não é alterado).")
+    parser.add_argument("--verbose", action="store_true", help="Mostra o plano de todos os comandos, não só das violações.")
+    args = parser.parse_args(argv)
+    if args.linhas < 10:
+        parser.error("O banco precisa de ao menos 10 linhas.")
+
+    with tempfile.TemporaryDirectory(prefix="planos_tickets_") as pasta:
+        banco = os.path.join(pasta, "planos.db")
+        if args.banco:
+            shutil.copyfile(args.banco, banco)
+        else:
+            gerar_banco(banco, args.linhas, 0)
+        verificacoes, sem_cenario, sem_regra = verificar(banco)
+    imprimir(verificacoes, sem_cenario, sem_regra, args.verbose)
+    return 1 if sem_cenario or sem_regra or any(item["violacoes"] for item in verificacoes) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
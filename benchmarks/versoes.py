@@ -0,0 +1,110 @@
+import importlib.util
+import sys
+import types
+import warnings
+from collections import defaultdict
+from pathlib import Path
+from types import SimpleNamespace
+
+import pandas as pd
+
+RAIZ = Path(__file__).resolve().parent.parent
+
+# Versões comparadas e o arquivo de cada uma. A versão atual usa banco_dados.DatabaseManager e as funções
+# de importação/exportação dos módulos compartilhados; as antigas têm tudo no próprio arquivo do aplicativo.
+ARQUIVOS_VERSOES = {
+    "V1": RAIZ / "V1" / "app_corrigido.py",
+    "V2": RAIZ / "V2" / "App_Gestao_Interface_Refatorada_V2.py",
+    "V3": RAIZ / "V3" / "App_Gestão_V3_Grafico_Modernizado.py",
+    "atual": RAIZ / "App_V3_Modernizado_corrigido.py",
+}
+
+
+class _Rotulo:
+    """Recebe as atualizações dos balões de estatísticas sem desenhar nada."""
+
+    def config(self, **opcoes):
+        pass
+
+
+def _carregar_modulo(nome, caminho):
+    if str(RAIZ) not in sys.path:
+        sys.path.insert(0, str(RAIZ))
+    spec = importlib.util.spec_from_file_location(nome, caminho)
+    modulo = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(modulo)
+    return modulo
+
+
+def _carregar_classe_banco(nome, caminho):
+    """
+    Carrega só o trecho até a classe TicketApp. Os arquivos da V1 não compilam por inteiro
+    (erros de indentação na interface), mas o DatabaseManager deles é válido.
+    """
+    codigo = caminho.read_text(encoding="utf-8")
+    modulo = types.ModuleType(nome)
+    modulo.__file__ = str(caminho)
+    exec(compile(codigo[:codigo.index("class TicketApp")], str(caminho), "exec"), modulo.__dict__)
+    return modulo
+
+
+class Versao:
+    """Operações de uma versão do aplicativo, executadas sem interface sobre o banco informado."""
+
+    def __init__(self, nome):
+        self.nome = nome
+        caminho = ARQUIVOS_VERSOES[nome]
+        if nome == "V1":
+            self.modulo = _carregar_classe_banco(f"benchmark_{nome}", caminho)
+            self.app = None
+        else:
+            self.modulo = _carregar_modulo(f"benchmark_{nome}", caminho)
+            self.app = self.modulo.TicketApp
+
+    def abrir(self, caminho):
+        if self.nome == "atual":
+            return self.modulo.DatabaseManager(str(caminho), on_error=_falhar)
+        return self.modulo.DatabaseManager(str(caminho))
+
+    def suporta(self, operacao):
+        """Se a operação existe nesta versão (ex.: a V1 não tem importação nem balões)."""
+        if operacao == "buscar_ticket":
+            return hasattr(self.modulo.DatabaseManager, "fetch_record_by_ticket_number")
+        if operacao == "estatisticas":
+            return self.app is not None and hasattr(self.app, "_update_statistics_cards")
+        if operacao == "importar":
+            return self.app is not None and hasattr(self.app, "_import_data")
+        if operacao == "exportar":
+            return self.app is not None and hasattr(self.app, "_export_data")
+        return True
+
+    def estatisticas(self, db):
+        """Executa o cálculo dos balões da própria versão (TicketApp._update_statistics_cards)."""
+        self.app._update_statistics_cards(SimpleNamespace(db=db, stats_labels=defaultdict(_Rotulo)))
+
+    def importar(self, db, caminho):
+        if self.nome == "atual":
+            from importacao import importar_arquivos
+            return importar_arquivos([str(caminho)], db)
+        # Mesmo laço de _import_data da V2/V3, sem as caixas de diálogo: um add_record por linha
+        df = pd.read_csv(caminho)
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            for _, row in df.iterrows():
+                data = pd.to_datetime(row['data']).strftime("%d/%m/%Y")
+                db.add_record(data, str(row['numero_ticket']), str(row['descricao']),
+                              str(row.get('acao_realizada', '')), str(row.get('status', 'Em Andamento')))
+
+    def exportar(self, db, caminho):
+        records = db.fetch_all_records()
+        df = pd.DataFrame(records, columns=["ID", "Data", "Nº Ticket", "Descrição", "Ação Realizada", "Status"])
+        if self.nome == "atual":
+            from compressao import abrir_arquivo
+            with abrir_arquivo(str(caminho), 'wt', encoding='utf-8-sig') as arquivo:
+                df.to_csv(arquivo, index=False)
+        else:
+            df.to_csv(caminho, index=False, encoding='utf-8-sig')
+
+
+def _falhar(erro):
+    raise erro
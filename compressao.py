@@ -0,0 +1,58 @@
+import gzip
+import io
+import os
+
+# zstd: módulo nativo a partir do Python 3.14; antes disso, pacote opcional 'zstandard'.
+try:
+    from compression import zstd as _zstd
+except ImportError:
+    try:
+        import zstandard as _zstd
+    except ImportError:
+        _zstd = None
+
+# Extensões reconhecidas e o codec correspondente
+EXTENSOES_CODEC = {
+    '.gz': 'gzip',
+    '.zst': 'zstd',
+}
+
+
+def detectar_codec(caminho):
+    """Retorna o codec ('gzip' ou 'zstd') indicado pela extensão do arquivo, ou None se não for compactado."""
+    return EXTENSOES_CODEC.get(os.path.splitext(str(caminho))[1].lower())
+
+
+def eh_csv(caminho):
+    """Indica se o caminho é um CSV, compactado ou não (.csv, .csv.gz, .csv.zst)."""
+    nome = str(caminho).lower()
+    if detectar_codec(nome):
+        nome = os.path.splitext(nome)[0]
+    return nome.endswith('.csv')
+
+
+def abrir_arquivo(destino, modo='rt', codec='auto', encoding='utf-8', newline=''):
+    """
+    Abre um arquivo em modo texto, compactando ou descompactando em fluxo contínuo.
+
+    'destino' pode ser um caminho ou um objeto de arquivo binário (ex.: sys.stdout.buffer).
+    Com codec='auto' o codec é escolhido pela extensão; None grava/lê sem compactação.
+    O conteúdo descompactado nunca é gravado em disco.
+    """
+    if codec == 'auto':
+        codec = detectar_codec(destino) if isinstance(destino, (str, os.PathLike)) else None
+
+    if codec == 'gzip':
+        return gzip.open(destino, modo, encoding=encoding, newline=newline)
+
+    if codec == 'zstd':
+        if _zstd is None:
+            raise RuntimeError("O suporte a arquivos .zst requer o pacote 'zstandard' (pip install zstandard).")
+        return _zstd.open(destino, modo, encoding=encoding, newline=newline)
+
+    if codec is not None:
+        raise ValueError(f"Codec de compactação desconhecido: {codec}")
+
+    if isinstance(destino, (str, os.PathLike)):
+        return open(destino, modo, encoding=encoding, newline=newline)
+    return io.TextIOWrapper(destino, encoding=encoding, newline=newline)
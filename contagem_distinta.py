@@ -0,0 +1,97 @@
+import hashlib
+import zlib
+
+import numpy as np
+
+from analise import chaves_periodo
+
+# Contagem de tickets distintos (numero_ticket) com esboços HyperLogLog.
+# Cada dia tem um esboço de REGISTRADORES bytes; esboços de vários dias são unidos pelo máximo
+# registrador a registrador, então qualquer intervalo de datas é estimado sem reler os registros.
+# Erro padrão aproximado: 1,04 / sqrt(REGISTRADORES) (cerca de 1,6% com precisão 12).
+
+PRECISAO = 12
+REGISTRADORES = 1 << PRECISAO
+_BITS_RESTANTES = 64 - PRECISAO
+
+
+def hash_ticket(numero):
+    """Hash de 64 bits (sem sinal) do número do ticket, sem espaços nas pontas."""
+    return int.from_bytes(hashlib.blake2b(str(numero or '').strip().encode('utf-8'), digest_size=8).digest(), 'big')
+
+
+def _comprimento_bits(valores):
+    """Quantidade de bits significativos de cada valor uint64 (0 para zero), por busca binária vetorizada."""
+    valores = valores.copy()
+    comprimento = np.zeros(len(valores), dtype=np.int64)
+    for deslocamento in (32, 16, 8, 4, 2, 1):
+        altos = valores >> np.uint64(deslocamento)
+        maiores = altos > 0
+        comprimento[maiores] += deslocamento
+        valores[maiores] = altos[maiores]
+    return comprimento + (valores > 0)
+
+
+def posicoes_e_postos(hashes):
+    """Registrador (primeiros PRECISAO bits) e posto (zeros à esquerda + 1 nos bits restantes) de cada hash."""
+    hashes = np.asarray(hashes, dtype=np.uint64)
+    posicoes = (hashes >> np.uint64(_BITS_RESTANTES)).astype(np.int64)
+    restantes = hashes & np.uint64((1 << _BITS_RESTANTES) - 1)
+    postos = _BITS_RESTANTES - _comprimento_bits(restantes) + 1
+    return posicoes, postos.astype(np.uint8)
+
+
+def esbocos_por_dia(dias, numeros):
+    """
+    Monta os esboços de cada dia a partir das linhas (dia, numero_ticket).
+    Retorna (dias distintos ordenados, matriz uint8 [dia, registrador]).
+    """
+    if len(dias) == 0:
+        return np.zeros(0, dtype=np.int64), np.zeros((0, REGISTRADORES), dtype=np.uint8)
+    unicos, linhas = np.unique(np.asarray(dias, dtype=np.int64), return_inverse=True)
+    posicoes, postos = posicoes_e_postos(np.fromiter((hash_ticket(n) for n in numeros), dtype=np.uint64, count=len(dias)))
+    esbocos = np.zeros((len(unicos), REGISTRADORES), dtype=np.uint8)
+    np.maximum.at(esbocos, (linhas, posicoes), postos)
+    return unicos, esbocos
+
+
+def estimar(esbocos):
+    """Estimativa de distintos para um esboço (1D) ou para cada linha de uma matriz de esboços (2D)."""
+    esbocos = np.atleast_2d(esbocos)
+    m = REGISTRADORES
+    alfa = 0.7213 / (1 + 1.079 / m)
+    bruta = alfa * m * m / np.power(2.0, -esbocos.astype(np.float64)).sum(axis=1)
+    # Correção para poucos elementos: contagem linear pelos registradores vazios
+    vazios = (esbocos == 0).sum(axis=1)
+    lineares = m * np.log(m / np.maximum(vazios, 1))
+    estimativas = np.where((bruta <= 2.5 * m) & (vazios > 0), lineares, bruta)
+    return estimativas if len(estimativas) > 1 else estimativas[0]
+
+
+def unir(esbocos):
+    """União de vários esboços (matriz [n, registrador]) em um só."""
+    if len(esbocos) == 0:
+        return np.zeros(REGISTRADORES, dtype=np.uint8)
+    return np.maximum.reduce(esbocos, axis=0)
+
+
+def distintos_por_periodo(dias, esbocos, periodo):
+    """
+    Estimativa de tickets distintos por período ('dia', 'semana', 'mes', 'ano') a partir dos esboços diários
+    (dias em ordem crescente). Retorna (chaves dos períodos, estimativas arredondadas).
+    """
+    if len(dias) == 0:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+    chaves = chaves_periodo(dias, periodo)
+    inicios = np.flatnonzero(np.r_[True, chaves[1:] != chaves[:-1]])
+    unidos = np.maximum.reduceat(esbocos, inicios, axis=0)
+    return chaves[inicios], np.atleast_1d(np.rint(estimar(unidos))).astype(np.int64)
+
+
+def serializar(esboco):
+    """Esboço compactado para gravação no banco (dias com poucos tickets ficam com poucos bytes)."""
+    return zlib.compress(np.ascontiguousarray(esboco, dtype=np.uint8).tobytes())
+
+
+def desserializar(dados):
+    return np.frombuffer(zlib.decompress(dados), dtype=np.uint8)
@@ -0,0 +1,349 @@
+import io
+import os
+import re
+from collections import OrderedDict
+
+import matplotlib.dates as mdates
+import numpy as np
+from matplotlib import colormaps
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+from matplotlib.patches import StepPatch
+from matplotlib.ticker import MaxNLocator
+
+from analise import (DIAS_SEMANA, agrupar_meses, agrupar_semanas, dias_para_datas, matriz_calendario,
+                     matriz_dia_status, media_movel, previsao_linear, reduzir_serie, resumo_para_arrays, serie_diaria)
+
+# Renderização dos gráficos fora da thread da interface: as funções deste módulo usam apenas
+# o backend Agg (sem pyplot/Tk) e rodam no processo de renderização, devolvendo imagens PNG.
+
+# Figura e artistas reutilizados entre renderizações dentro do processo de renderização
+_figura = None
+_eixo = None
+_artistas = {}
+_figura_analise = None
+_figura_calendario = None
+
+# Margens do gráfico de barras (frações da figura); também usadas para localizar a barra clicada na imagem
+MARGENS_BARRAS = {"left": 0.07, "right": 0.98, "top": 0.92, "bottom": 0.25}
+LARGURA_BARRA = 0.8
+
+# Limite de pontos da série diária; séries mais longas são somadas em blocos de vários dias
+MAX_PONTOS_DIARIOS = 400
+
+# Tendência: janelas das médias móveis, dias usados no ajuste da previsão e dias previstos
+JANELAS_TENDENCIA = (7, 28)
+DIAS_AJUSTE_PREVISAO = 56
+DIAS_PREVISAO = 28
+
+
+def desenhar_barras(ax, artistas, periodo, rotulos, valores, titulo):
+    """
+    Desenha o gráfico de barras do período. As barras de cada período são criadas uma vez;
+    nas chamadas seguintes apenas as alturas e a visibilidade dos artistas existentes mudam.
+    """
+    atuais = artistas.get(periodo)
+    if atuais is not None and atuais["rotulos"] != rotulos:
+        # As categorias mudaram (novo mês, novo status): recria as barras deste período
+        atuais["barras"].remove()
+        for texto in atuais["textos"]:
+            texto.remove()
+        atuais = None
+
+    maximo = max(valores) if valores else 0
+    cores = colormaps["viridis"]([v / maximo for v in valores]) if maximo > 0 else ["lightgray"] * len(valores)
+
+    if atuais is None:
+        barras = ax.bar(range(len(rotulos)), valores, color=cores, width=LARGURA_BARRA)
+        # Valores acima das barras para melhor leitura
+        textos = [ax.text(i, v + 0.5, str(v), color="black", ha="center", va="bottom", fontsize=9)
+                  for i, v in enumerate(valores)]
+        artistas[periodo] = {"rotulos": list(rotulos), "barras": barras, "textos": textos}
+    else:
+        for retangulo, texto, valor, cor in zip(atuais["barras"], atuais["textos"], valores, cores):
+            retangulo.set_height(valor)
+            retangulo.set_facecolor(cor)
+            texto.set_y(valor + 0.5)
+            texto.set_text(str(valor))
+
+    # Mostra apenas os artistas do período selecionado
+    for outro_periodo, outros in artistas.items():
+        visivel = outro_periodo == periodo
+        for artista in list(outros["barras"]) + outros["textos"]:
+            artista.set_visible(visivel)
+
+    ax.set_title(titulo, fontsize=14)
+    ax.set_xlabel("Período/Status", fontsize=12)
+    ax.set_ylabel("Contagem de Tickets", fontsize=12)
+    ax.set_xticks(range(len(rotulos)))
+    ax.set_xticklabels(rotulos, rotation=45, ha="right", fontsize=10)
+    ax.set_xlim(-0.6, max(len(rotulos), 1) - 0.4)
+    ax.set_ylim(0, max(maximo, 1) * 1.1)
+    ax.grid(True, linestyle="--", alpha=0.6, axis="y")
+    ax.set_axisbelow(True)
+
+
+def renderizar_barras(periodo, rotulos, valores, titulo, largura, altura, dpi=100):
+    """Renderiza o gráfico de barras do período em PNG (bytes) com o tamanho em pixels informado."""
+    global _figura, _eixo
+    if _figura is None:
+        _figura = Figure(dpi=dpi)
+        FigureCanvasAgg(_figura)
+        _eixo = _figura.add_subplot(111)
+        _figura.subplots_adjust(**MARGENS_BARRAS)
+    _figura.set_size_inches(largura / dpi, altura / dpi)
+
+    desenhar_barras(_eixo, _artistas, periodo, rotulos, valores, titulo)
+
+    buffer = io.BytesIO()
+    _figura.savefig(buffer, format="png", dpi=dpi)
+    return buffer.getvalue()
+
+
+def indice_barra(x, y, largura, altura, quantidade):
+    """
+    Índice da barra sob o ponto (x, y), em pixels da imagem de 'largura' × 'altura' gerada por
+    renderizar_barras com 'quantidade' barras; None se o ponto não estiver sobre uma barra.
+    """
+    fx, fy = x / largura, 1 - y / altura
+    if quantidade == 0 or not (MARGENS_BARRAS["bottom"] <= fy <= MARGENS_BARRAS["top"]):
+        return None
+    fracao = (fx - MARGENS_BARRAS["left"]) / (MARGENS_BARRAS["right"] - MARGENS_BARRAS["left"])
+    # Mesmos limites do eixo X definidos em desenhar_barras
+    posicao = -0.6 + fracao * (max(quantidade, 1) - 0.4 + 0.6)
+    indice = int(round(posicao))
+    if 0 <= indice < quantidade and abs(posicao - indice) <= LARGURA_BARRA / 2:
+        return indice
+    return None
+
+
+def _degraus(ax, valores, bordas, base=None, **estilo):
+    """
+    Adiciona uma área em degraus sem recalcular os limites do eixo vértice a vértice
+    (o que add_patch/stairs fariam); os limites são definidos por quem chama.
+    """
+    artista = StepPatch(valores, bordas, baseline=0 if base is None else base, fill=True, **estilo)
+    ax.add_artist(artista)
+    return artista
+
+
+def _empilhar(ax, bordas, matriz, nomes, mapa_cores):
+    """Desenha a matriz [período, status] como áreas em degraus empilhadas (um artista por status)."""
+    base = np.zeros(len(matriz))
+    cores = colormaps[mapa_cores](np.linspace(0, 1, max(len(nomes), 1)))
+    for i, nome in enumerate(nomes):
+        topo = base + matriz[:, i]
+        _degraus(ax, topo, bordas, base, color=cores[i], label=nome or "(sem status)")
+        base = topo
+    return base
+
+
+def _preparar_eixo(ax, titulo, bordas, maximo):
+    # Posição fixa do título: sem ela, cada desenho mede as caixas dos eixos para posicionar o título
+    ax.set_title(titulo, fontsize=12, y=1.0)
+    ax.set_xlim(bordas[0], bordas[-1])
+    ax.set_ylim(0, max(maximo, 1) * 1.05)
+    ax.set_ylabel("Quantidade de Tickets")
+
+
+def _configurar_eixo_datas(ax):
+    """Configuração fixa dos eixos de datas, feita uma única vez por figura."""
+    localizador = mdates.AutoDateLocator(maxticks=12)
+    ax.xaxis.set_major_locator(localizador)
+    ax.xaxis.set_major_formatter(mdates.ConciseDateFormatter(localizador))
+    # Os eixos de datas não têm rótulo: posição fixa evita medir os rótulos das datas a cada desenho
+    ax.xaxis.set_label_coords(0.5, 0)
+    # Poucos rótulos no eixo Y: o desenho do texto é a parte mais cara da renderização
+    ax.yaxis.set_major_locator(MaxNLocator(nbins=4, integer=True))
+    ax.grid(True, linestyle="--", alpha=0.6, axis="y")
+    ax.set_axisbelow(True)
+
+
+def renderizar_analise(linhas, largura, altura, dpi=100):
+    """
+    Renderiza os painéis diário, semanal por status e mensal por status em PNG (bytes),
+    a partir das linhas do resumo diário (dia, status, total).
+    """
+    global _figura_analise
+    if _figura_analise is None:
+        _figura_analise = Figure(dpi=dpi)
+        FigureCanvasAgg(_figura_analise)
+        # Eixo X compartilhado: só o painel de baixo desenha o eixo de datas. Nos outros o eixo fica oculto
+        # (e não apenas os rótulos), senão cada painel recalcula e formata as mesmas datas a cada renderização
+        eixos = _figura_analise.subplots(3, 1, sharex=True)
+        for ax in eixos:
+            _configurar_eixo_datas(ax)
+        for ax in eixos[:-1]:
+            ax.xaxis.set_visible(False)
+        _figura_analise.subplots_adjust(left=0.06, right=0.85, top=0.9, bottom=0.05, hspace=0.3)
+        _figura_analise.suptitle("Análise de Tickets", fontsize=16)
+    figura = _figura_analise
+    figura.set_size_inches(largura / dpi, altura / dpi)
+    eixo_dia, eixo_semana, eixo_mes = figura.axes
+
+    # Os eixos são reaproveitados: remove apenas os artistas da renderização anterior
+    for ax in figura.axes:
+        for artista in ax.patches + ax.texts:
+            artista.remove()
+    for legenda in figura.legends:
+        legenda.remove()
+
+    dias, status, totais, nomes = resumo_para_arrays(linhas)
+    inicio, matriz = matriz_dia_status(dias, status, totais, len(nomes))
+    if len(matriz) == 0:
+        eixo_dia.text(0.5, 0.5, "Não há dados para a análise.", transform=eixo_dia.transAxes, ha="center", va="center")
+    else:
+        # Painel 1: total por dia (somado em blocos de vários dias quando a série é longa)
+        passo, diarios = reduzir_serie(matriz.sum(axis=1), MAX_PONTOS_DIARIOS)
+        bordas = mdates.date2num(dias_para_datas(inicio + np.arange(len(diarios) + 1) * passo))
+        _degraus(eixo_dia, diarios, bordas, color="cornflowerblue")
+        _preparar_eixo(eixo_dia, "Total de Tickets Tratados por Dia" if passo == 1
+                       else f"Total de Tickets Tratados (blocos de {passo} dias)", bordas, diarios.max())
+
+        # Painel 2: volume semanal por status (semanas iniciando na segunda-feira)
+        semanas, semanal = agrupar_semanas(inicio, matriz)
+        bordas = mdates.date2num(dias_para_datas(np.r_[semanas, semanas[-1] + 7]))
+        topo = _empilhar(eixo_semana, bordas, semanal, nomes, "viridis")
+        _preparar_eixo(eixo_semana, "Volume Semanal por Status", bordas, topo.max())
+
+        # Painel 3: volume mensal por status
+        meses, mensal = agrupar_meses(inicio, matriz)
+        bordas = mdates.date2num(np.r_[meses, meses[-1] + 1].astype("datetime64[D]"))
+        topo = _empilhar(eixo_mes, bordas, mensal, nomes, "viridis")
+        _preparar_eixo(eixo_mes, "Volume Mensal por Status", bordas, topo.max())
+        # Uma única legenda para os dois painéis por status (mesmas cores por posição do status)
+        figura.legend(*eixo_semana.get_legend_handles_labels(), loc="center right", fontsize=8, frameon=False)
+
+    buffer = io.BytesIO()
+    # Compressão PNG rápida: a imagem fica um pouco maior, mas a codificação é várias vezes mais rápida
+    figura.savefig(buffer, format="png", dpi=dpi, pil_kwargs={"compress_level": 1})
+    return buffer.getvalue()
+
+
+def renderizar_calendario(linhas, largura, altura, dpi=100):
+    """
+    Renderiza em PNG (bytes) o mapa de calor de tickets por dia (dia da semana × semana) e a tendência
+    com médias móveis de 7 e 28 dias e a previsão linear dos próximos dias, a partir do resumo diário.
+    """
+    global _figura_calendario
+    if _figura_calendario is None:
+        _figura_calendario = Figure(dpi=dpi)
+        FigureCanvasAgg(_figura_calendario)
+        eixo_mapa, eixo_tendencia = _figura_calendario.subplots(2, 1, sharex=True, height_ratios=(1, 2))
+        # A imagem do mapa é criada uma vez; as renderizações seguintes só trocam os dados e a extensão
+        mapa = eixo_mapa.imshow(np.zeros((7, 1)), aspect="auto", cmap="YlOrRd", interpolation="nearest",
+                                extent=(0, 1, 6.5, -0.5))
+        # Barra de cores fora da área do eixo, para que o mapa e a tendência fiquem alinhados
+        _figura_calendario.colorbar(mapa, cax=eixo_mapa.inset_axes((1.01, 0, 0.012, 1)), label="Tickets/dia")
+        eixo_mapa.set_yticks(range(7), DIAS_SEMANA)
+        eixo_mapa.set_title("Tickets por Dia da Semana e Semana", fontsize=12)
+        _configurar_eixo_datas(eixo_tendencia)
+        eixo_mapa.tick_params(labelbottom=False)
+        eixo_tendencia.set_title("Tendência Diária e Previsão", fontsize=12)
+        eixo_tendencia.set_ylabel("Tickets por dia")
+        _figura_calendario.subplots_adjust(left=0.06, right=0.93, top=0.9, bottom=0.07, hspace=0.2)
+        _figura_calendario.suptitle("Calendário e Tendência de Tickets", fontsize=16)
+    figura = _figura_calendario
+    figura.set_size_inches(largura / dpi, altura / dpi)
+    eixo_mapa, eixo_tendencia = figura.axes[:2]
+    mapa = eixo_mapa.images[0]
+    for artista in eixo_tendencia.lines + eixo_tendencia.texts:
+        artista.remove()
+    if eixo_tendencia.get_legend() is not None:
+        eixo_tendencia.get_legend().remove()
+
+    inicio, diarios = serie_diaria(linhas)
+    if len(diarios) == 0:
+        mapa.set_data(np.full((7, 1), np.nan))
+        eixo_tendencia.text(0.5, 0.5, "Não há dados para o calendário.", transform=eixo_tendencia.transAxes,
+                            ha="center", va="center")
+    else:
+        primeira, grade = matriz_calendario(inicio, diarios)
+        esquerda, direita = mdates.date2num(dias_para_datas([primeira, primeira + grade.shape[1] * 7]))
+        mapa.set_data(grade)
+        mapa.set_extent((esquerda, direita, 6.5, -0.5))
+        mapa.set_clim(0, max(np.nanmax(grade), 1))
+
+        datas = mdates.date2num(dias_para_datas(inicio + np.arange(len(diarios))))
+        eixo_tendencia.plot(datas, diarios, color="lightgray", linewidth=0.6, alpha=0.7, label="Diário")
+        for janela, cor in zip(JANELAS_TENDENCIA, ("tab:blue", "tab:orange")):
+            eixo_tendencia.plot(datas, media_movel(diarios, janela), color=cor, linewidth=1.5,
+                                label=f"Média móvel {janela} dias")
+        previsao = previsao_linear(media_movel(diarios, JANELAS_TENDENCIA[0]), DIAS_AJUSTE_PREVISAO, DIAS_PREVISAO)
+        datas_previsao = mdates.date2num(dias_para_datas(inicio + len(diarios) + np.arange(DIAS_PREVISAO)))
+        eixo_tendencia.plot(datas_previsao, previsao, color="tab:red", linestyle="--", linewidth=1.5,
+                            label=f"Previsão ({DIAS_PREVISAO} dias)")
+        eixo_tendencia.set_xlim(esquerda, datas_previsao[-1] + 1)
+        eixo_tendencia.set_ylim(0, max(diarios.max(), previsao.max(), 1) * 1.05)
+        eixo_tendencia.legend(loc="upper left", fontsize=8)
+
+    buffer = io.BytesIO()
+    figura.savefig(buffer, format="png", dpi=dpi, pil_kwargs={"compress_level": 1})
+    return buffer.getvalue()
+
+
+class CacheImagens:
+    """
+    Cache de imagens PNG em memória (LRU) e em disco, por chave (período, versão dos dados, tamanho).
+    Se a pasta não puder ser criada (banco em pasta somente leitura ou de rede), o cache fica só em memória.
+    """
+
+    def __init__(self, pasta, limite_memoria=32):
+        self.limite_memoria = limite_memoria
+        self._memoria = OrderedDict()
+        try:
+            os.makedirs(pasta, exist_ok=True)
+        except OSError:
+            pasta = None
+        self.pasta = pasta
+
+    def __len__(self):
+        """Quantidade de imagens em memória."""
+        return len(self._memoria)
+
+    @staticmethod
+    def _prefixo(periodo):
+        return re.sub(r"[^\w-]", "_", periodo) + "_"
+
+    def _arquivo(self, chave):
+        periodo, versao, largura, altura = chave
+        return os.path.join(self.pasta, f"{self._prefixo(periodo)}{versao}_{largura}x{altura}.png")
+
+    def obter(self, chave):
+        """Retorna a imagem da chave (memória, depois disco) ou None."""
+        if chave in self._memoria:
+            self._memoria.move_to_end(chave)
+            return self._memoria[chave]
+        if self.pasta is None:
+            return None
+        try:
+            with open(self._arquivo(chave), "rb") as arquivo:
+                imagem = arquivo.read()
+        except OSError:
+            return None
+        self._guardar_memoria(chave, imagem)
+        return imagem
+
+    def guardar(self, chave, imagem):
+        """Guarda a imagem em memória e em disco, removendo do disco as versões antigas do mesmo período."""
+        self._guardar_memoria(chave, imagem)
+        if self.pasta is None:
+            return
+        periodo, versao = chave[0], chave[1]
+        prefixo = self._prefixo(periodo)
+        try:
+            for nome in os.listdir(self.pasta):
+                if nome.startswith(prefixo) and not nome.startswith(f"{prefixo}{versao}_"):
+                    os.remove(os.path.join(self.pasta, nome))
+            temporario = self._arquivo(chave) + ".tmp"
+            with open(temporario, "wb") as arquivo:
+                arquivo.write(imagem)
+            os.replace(temporario, self._arquivo(chave))
+        except OSError:
+            pass  # O cache em disco é opcional; a imagem continua disponível em memória
+
+    def _guardar_memoria(self, chave, imagem):
+        self._memoria[chave] = imagem
+        self._memoria.move_to_end(chave)
+        while len(self._memoria) > self.limite_memoria:
+            self._memoria.popitem(last=False)
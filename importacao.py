@@ -0,0 +1,166 @@
+import numbers
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import pandas as pd
+
+from banco_dados import hash_conteudo
+from compressao import abrir_arquivo
+
+# Colunas esperadas nos arquivos de importação (sem acentos)
+COLUNAS_OBRIGATORIAS = ['data', 'numero_ticket', 'descricao']
+STATUS_PADRAO = 'Em Andamento'
+EXTENSOES_IMPORTACAO = ('.xlsx', '.csv', '.csv.gz', '.csv.zst')
+# Datas seriais do Excel: dias desde 30/12/1899, até 11/04/2262 (a maior data em datetime64[ns])
+ORIGEM_EXCEL = '1899-12-30'
+SERIAL_EXCEL_MAXIMO = 132320
+
+
+def ler_arquivo(caminho):
+    """Lê um arquivo .xlsx ou .csv (compactado ou não) para um DataFrame."""
+    if caminho.lower().endswith('.xlsx'):
+        return pd.read_excel(caminho)
+    # O codec (.gz/.zst) é escolhido pela extensão e descompactado em fluxo
+    with abrir_arquivo(caminho, 'rt', encoding='utf-8-sig') as arquivo:
+        return pd.read_csv(arquivo)
+
+
+def _texto(coluna):
+    """Converte uma coluna para texto, tratando vazios e números vindos do Excel (ex.: 460601.0)."""
+    return coluna.fillna('').astype(str).str.strip().str.replace(r'^(\d+)\.0$', r'\1', regex=True)
+
+
+def _numero(valor):
+    """Indica se o valor da coluna de data é um número (data serial do Excel)."""
+    return isinstance(valor, numbers.Real) and not isinstance(valor, bool)
+
+
+def validar_registros(df):
+    """
+    Valida e normaliza um DataFrame importado de forma vetorizada.
+    Retorna (registros, erros): tuplas prontas para inserir e uma lista de (linha, motivo).
+    """
+    df = df.rename(columns=lambda c: str(c).strip().lower())
+    faltando = [col for col in COLUNAS_OBRIGATORIAS if col not in df.columns]
+    if faltando:
+        raise ValueError(f"A coluna obrigatória '{faltando[0]}' não foi encontrada no arquivo.")
+
+    # Datas em DD/MM/AAAA têm prioridade; o restante (ISO ou datas do Excel) é convertido em seguida.
+    # Tudo em datetime64[ns], para que as conversões de cada tipo possam ser gravadas na mesma série
+    datas = pd.to_datetime(df['data'], format='%d/%m/%Y', errors='coerce').astype('datetime64[ns]')
+    pendentes = datas.isna() & df['data'].notna()
+    if pendentes.any():
+        restantes = df.loc[pendentes, 'data']
+        # Números são datas seriais do Excel (dias desde 30/12/1899); os demais, textos ou datas já convertidas
+        seriais = restantes.map(_numero).astype(bool)
+        dias = restantes[seriais].astype(float)
+        convertidas = pd.concat([
+            # Fora do intervalo (negativos, valores enormes) a data é inválida, como um texto sem data
+            pd.to_datetime(dias.where(dias.between(1, SERIAL_EXCEL_MAXIMO)), unit='D', origin=ORIGEM_EXCEL,
+                           errors='coerce'),
+            pd.to_datetime(restantes[~seriais], errors='coerce'),
+        ])
+        datas.loc[convertidas.index] = convertidas.astype('datetime64[ns]')
+
+    numeros = _texto(df['numero_ticket'])
+    descricoes = _texto(df['descricao'])
+    acoes = _texto(df['acao_realizada']) if 'acao_realizada' in df.columns else pd.Series('', index=df.index)
+    status = _texto(df['status']) if 'status' in df.columns else pd.Series('', index=df.index)
+    status = status.mask(status == '', STATUS_PADRAO)
+
+    invalida_data = datas.isna()
+    invalido_campos = (numeros == '') | (descricoes == '')
+    validos = ~(invalida_data | invalido_campos)
+
+    erros = []
+    # Linha no arquivo: +2 por causa do cabeçalho e da contagem a partir de 1
+    for posicao in (~validos).to_numpy().nonzero()[0]:
+        motivo = "data inválida" if invalida_data.iloc[posicao] else "Nº Ticket/Descrição vazios"
+        erros.append((int(posicao) + 2, motivo))
+
+    registros = list(zip(
+        datas[validos].dt.strftime('%d/%m/%Y'),
+        numeros[validos],
+        descricoes[validos],
+        acoes[validos],
+        status[validos],
+    ))
+    return registros, erros
+
+
+def processar_arquivo(caminho):
+    """Lê e valida um arquivo. Executado nos processos do pool, por isso retorna apenas dados simples."""
+    resultado = {'arquivo': caminho, 'registros': [], 'hashes': [], 'erros': [], 'erro': None}
+    try:
+        resultado['registros'], resultado['erros'] = validar_registros(ler_arquivo(caminho))
+        # O hash de conteúdo também é calculado aqui, em paralelo, para a verificação de duplicados
+        resultado['hashes'] = [hash_conteudo(numero, data, descricao, acao)
+                               for data, numero, descricao, acao, _ in resultado['registros']]
+    except Exception as e:
+        resultado['erro'] = str(e)
+    return resultado
+
+
+def gravar_resultado(resultado, db, ignorar_duplicados=True):
+    """
+    Grava os registros validados de um arquivo em uma transação. Os duplicados (já existentes no banco
+    ou repetidos no próprio arquivo) são descartados com uma única consulta em lote pelos hashes.
+    Preenche 'importados' e 'duplicados' no resultado.
+    """
+    registros, hashes = resultado['registros'], resultado['hashes']
+    resultado['importados'] = resultado['duplicados'] = 0
+    if resultado['erro'] or not registros:
+        return resultado
+
+    if ignorar_duplicados:
+        vistos = db.fetch_existing_hashes(set(hashes))
+        novos = []
+        for registro, h in zip(registros, hashes):
+            if h not in vistos:
+                vistos.add(h)
+                novos.append((registro, h))
+        resultado['duplicados'] = len(registros) - len(novos)
+        registros, hashes = [r for r, _ in novos], [h for _, h in novos]
+
+    if registros and not db.add_records(registros, hashes):
+        resultado['erro'] = "Falha ao gravar os registros no banco de dados."
+        return resultado
+    resultado['importados'] = len(registros)
+    return resultado
+
+
+def criar_executor(quantidade_arquivos, max_workers=None):
+    """Cria o pool de processos dimensionado pelo número de arquivos e de núcleos disponíveis."""
+    workers = max_workers or min(quantidade_arquivos, os.cpu_count() or 1)
+    return ProcessPoolExecutor(max_workers=max(workers, 1))
+
+
+def importar_arquivos(caminhos, db, ao_progresso=None, max_workers=None):
+    """
+    Importa vários arquivos: a leitura e a validação rodam em paralelo no pool de processos,
+    e um único escritor (este laço) grava cada lote validado em uma transação, na ordem em que ficam prontos.
+    'ao_progresso' é chamado com o resultado de cada arquivo após a gravação.
+    """
+    resultados = []
+
+    def gravar(resultado):
+        gravar_resultado(resultado, db)
+        if ao_progresso:
+            ao_progresso(resultado)
+        resultados.append(resultado)
+
+    # Um único arquivo não compensa o custo de iniciar processos
+    if len(caminhos) <= 1 or max_workers == 1:
+        for caminho in caminhos:
+            gravar(processar_arquivo(caminho))
+        return resultados
+
+    with criar_executor(len(caminhos), max_workers) as executor:
+        futuros = {executor.submit(processar_arquivo, caminho): caminho for caminho in caminhos}
+        for futuro in as_completed(futuros):
+            try:
+                resultado = futuro.result()
+            except Exception as e:
+                resultado = {'arquivo': futuros[futuro], 'registros': [], 'hashes': [], 'erros': [], 'erro': str(e)}
+            gravar(resultado)
+    return resultados
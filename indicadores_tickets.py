@@ -0,0 +1,165 @@
+import argparse
+import csv
+import json
+import os
+import sqlite3
+import sys
+from datetime import date, datetime
+from pathlib import Path
+
+import numpy as np
+
+from analise import (PERIODOS, STATUS_TRATADOS, contar_periodo_status, contar_por_status, dia_de, dias_para_datas,
+                     indicadores_tratados, media_movel, resumo_para_arrays, rotulo_periodo)
+from banco_dados import dia_sql
+from contagem_distinta import desserializar, distintos_por_periodo, esbocos_por_dia
+from compressao import abrir_arquivo
+
+# Indicadores de tickets pela linha de comando (ex.: job noturno), com os mesmos cálculos dos balões
+# e gráficos do aplicativo. Lê o resumo diário (dia × status) e calcula tudo de forma vetorizada.
+#
+# Exemplos:
+#   python indicadores_tickets.py --db tickets.db
+#   python indicadores_tickets.py --periodo semana --periodo mes --janela 4 -o indicadores.json
+#   python indicadores_tickets.py --periodo dia --formato csv -o diario.csv.gz
+
+
+def _data(texto):
+    for formato in ("%d/%m/%Y", "%Y-%m-%d"):
+        try:
+            return datetime.strptime(texto, formato).date()
+        except ValueError:
+            continue
+    raise argparse.ArgumentTypeError(f"Data inválida: '{texto}'. Use DD/MM/AAAA ou AAAA-MM-DD.")
+
+
+def criar_parser():
+    parser = argparse.ArgumentParser(description="Calcula os indicadores de tickets a partir do banco de dados.")
+    parser.add_argument("--db", default="tickets.db", help="Caminho do banco SQLite (padrão: tickets.db).")
+    parser.add_argument("-o", "--saida", default="-", help="Arquivo de saída ou '-' para a saída padrão (padrão: -).")
+    parser.add_argument("--formato", choices=("json", "csv"), default="json", help="Formato de saída (padrão: json).")
+    parser.add_argument("--data", type=_data, default=date.today(),
+                        help="Data de referência para hoje/semana/mês, DD/MM/AAAA (padrão: hoje).")
+    parser.add_argument("--periodo", action="append", choices=PERIODOS,
+                        help="Períodos das contagens (pode ser repetido; padrão: mes).")
+    parser.add_argument("--janela", type=int, default=3,
+                        help="Quantidade de períodos da média móvel (padrão: 3).")
+    parser.add_argument("--sem-distintos", action="store_true",
+                        help="Não calcula a estimativa de tickets distintos por período (HyperLogLog).")
+    return parser
+
+
+def ler_resumo_diario(conn):
+    """
+    Linhas (dia, status, total) do resumo diário. Em bancos ainda sem o resumo (nunca abertos pela
+    versão atual do aplicativo), agrega os registros diretamente, sem alterar o banco.
+    """
+    existe = conn.execute("SELECT 1 FROM sqlite_master WHERE type='table' AND name='resumo_diario'").fetchone()
+    if existe:
+        return conn.execute("SELECT dia, status, total FROM resumo_diario ORDER BY dia").fetchall()
+    return conn.execute(
+        f"SELECT dia, status, COUNT(*) FROM (SELECT {dia_sql()} AS dia, COALESCE(status, '') AS status FROM registros) "
+        f"WHERE dia IS NOT NULL GROUP BY dia, status ORDER BY dia"
+    ).fetchall()
+
+
+def ler_esbocos(conn):
+    """
+    Esboços diários de tickets distintos: os gravados pelo aplicativo e, para os dias pendentes (ou bancos ainda
+    sem esboços), montados em memória a partir dos registros. Retorna (dias, matriz [dia, registrador]).
+    """
+    dia = dia_sql()
+    existe = conn.execute("SELECT 1 FROM sqlite_master WHERE type='table' AND name='esboco_diario'").fetchone()
+    if existe:
+        gravados = conn.execute(
+            "SELECT dia, registradores FROM esboco_diario WHERE dia NOT IN (SELECT dia FROM esboco_pendente)").fetchall()
+        linhas = conn.execute(
+            f"SELECT {dia}, numero_ticket FROM registros WHERE {dia} IN (SELECT dia FROM esboco_pendente)").fetchall()
+    else:
+        gravados = []
+        linhas = conn.execute(f"SELECT {dia}, numero_ticket FROM registros WHERE {dia} IS NOT NULL").fetchall()
+    dias, esbocos = esbocos_por_dia([linha[0] for linha in linhas], [linha[1] for linha in linhas])
+    if gravados:
+        dias = np.concatenate([dias, [linha[0] for linha in gravados]])
+        esbocos = np.vstack([esbocos, *(desserializar(linha[1]) for linha in gravados)])
+        ordem = np.argsort(dias, kind="stable")
+        dias, esbocos = dias[ordem], esbocos[ordem]
+    return dias, esbocos
+
+
+def calcular_indicadores(linhas, referencia, periodos, janela, esbocos=None):
+    """
+    Monta o dicionário de indicadores a partir das linhas do resumo diário. Com os esboços diários,
+    cada período inclui também a estimativa de tickets distintos.
+    """
+    dias, status, totais, nomes = resumo_para_arrays(linhas)
+    tratados = indicadores_tratados(dias, status, nomes, dia_de(referencia), totais)
+    inicio_semana, inicio_mes = dias_para_datas([tratados.pop("inicio_semana"), tratados.pop("inicio_mes")]).astype(object)
+    resultado = {
+        "referencia": referencia.strftime("%d/%m/%Y"),
+        "status_tratados": list(STATUS_TRATADOS),
+        "total": tratados.pop("total"),
+        "tratados": {**tratados, "inicio_semana": inicio_semana.strftime("%d/%m/%Y"),
+                     "inicio_mes": inicio_mes.strftime("%d/%m/%Y")},
+        "por_status": dict(zip(nomes, contar_por_status(status, len(nomes), totais).tolist())),
+        "por_periodo": {},
+    }
+    for periodo in periodos:
+        chaves, matriz = contar_periodo_status(dias, status, periodo, len(nomes), totais)
+        soma = matriz.sum(axis=1)
+        medias = media_movel(soma, janela)
+        distintos = dict(zip(*(v.tolist() for v in distintos_por_periodo(*esbocos, periodo)))) if esbocos else {}
+        resultado["por_periodo"][periodo] = [
+            {"periodo": rotulo_periodo(chave, periodo), "total": int(total), "media_movel": round(float(media), 2),
+             **({"distintos_aprox": distintos.get(int(chave), 0)} if esbocos else {}),
+             "por_status": dict(zip(nomes, linha.tolist()))}
+            for chave, total, media, linha in zip(chaves, soma, medias, matriz)
+        ]
+    return resultado
+
+
+def escrever_csv(resultado, arquivo):
+    """Uma linha por período com as colunas de cada status, o total e a média móvel."""
+    nomes = list(resultado["por_status"])
+    writer = csv.writer(arquivo)
+    writer.writerow(["tipo_periodo", "periodo", *nomes, "total", "media_movel", "distintos_aprox"])
+    for periodo, linhas in resultado["por_periodo"].items():
+        for linha in linhas:
+            writer.writerow([periodo, linha["periodo"], *(linha["por_status"][n] for n in nomes),
+                             linha["total"], linha["media_movel"], linha.get("distintos_aprox", "")])
+
+
+def main(argv=None):
+    args = criar_parser().parse_args(argv)
+    if not os.path.exists(args.db):
+        print(f"Banco de dados não encontrado: {args.db}", file=sys.stderr)
+        return 2
+
+    # Somente leitura: não bloqueia gravações do aplicativo
+    conn = sqlite3.connect(Path(args.db).resolve().as_uri() + "?mode=ro", uri=True)
+    try:
+        linhas = ler_resumo_diario(conn)
+        esbocos = None if args.sem_distintos else ler_esbocos(conn)
+    except sqlite3.Error as e:
+        print(f"Erro ao ler o banco de dados: {e}", file=sys.stderr)
+        return 1
+    finally:
+        conn.close()
+
+    resultado = calcular_indicadores(linhas, args.data, args.periodo or ["mes"], max(args.janela, 1), esbocos)
+    destino = sys.stdout.buffer if args.saida == "-" else args.saida
+    try:
+        with abrir_arquivo(destino, "wt", codec=None if args.saida == "-" else "auto", encoding="utf-8") as arquivo:
+            if args.formato == "csv":
+                escrever_csv(resultado, arquivo)
+            else:
+                json.dump(resultado, arquivo, ensure_ascii=False, indent=2)
+                arquivo.write("\n")
+    except BrokenPipeError:
+        # Saída interrompida pelo consumidor (ex.: '| head'); encerra silenciosamente
+        sys.stderr.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
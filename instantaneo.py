@@ -0,0 +1,88 @@
+import json
+import os
+from datetime import date
+
+from analise import dia_de, inicio_mes
+from banco_dados import DatabaseManager
+from compressao import abrir_arquivo
+
+# Instantâneo do painel: valores dos balões, primeira página da tabela e agregados dos gráficos,
+# marcados com a versão dos dados. Permite desenhar a janela logo na abertura, antes de ler o banco,
+# enquanto a leitura completa é feita em segundo plano.
+
+FORMATO_INSTANTANEO = 1
+LINHAS_INSTANTANEO = 200
+
+
+def caminho_instantaneo(db_name):
+    """Arquivo do instantâneo, ao lado do banco de dados."""
+    pasta = os.path.dirname(os.path.abspath(db_name))
+    return os.path.join(pasta, "cache_graficos", os.path.splitext(os.path.basename(db_name))[0] + "_painel.json.gz")
+
+
+def carregar_instantaneo(caminho):
+    """Lê o instantâneo; retorna None se não existir, estiver corrompido ou for de outro formato."""
+    try:
+        with abrir_arquivo(caminho, "rt", encoding="utf-8") as arquivo:
+            dados = json.load(arquivo)
+    except (OSError, EOFError, ValueError):
+        return None
+    if not isinstance(dados, dict) or dados.get("formato") != FORMATO_INSTANTANEO:
+        return None
+    return dados
+
+
+def salvar_instantaneo(caminho, versao, cartoes, registros, agregados):
+    """Grava o instantâneo de forma atômica (arquivo temporário + substituição)."""
+    dados = {
+        "formato": FORMATO_INSTANTANEO,
+        "versao": versao,
+        "cartoes": cartoes,
+        "registros": [list(registro) for registro in registros[:LINHAS_INSTANTANEO]],
+        "agregados": agregados,
+    }
+    temporario = caminho + ".tmp"
+    try:
+        os.makedirs(os.path.dirname(caminho), exist_ok=True)
+        with abrir_arquivo(temporario, "wt", codec="gzip", encoding="utf-8") as arquivo:
+            json.dump(dados, arquivo, ensure_ascii=False)
+        os.replace(temporario, caminho)
+    except OSError:
+        pass  # O instantâneo é opcional; na próxima abertura o painel é lido do banco
+
+
+def _distintos_mes(db):
+    """(primeiro dia do mês corrente, tickets distintos desde então, contagem exata)."""
+    primeiro_dia = int(inicio_mes(dia_de(date.today())))
+    return (primeiro_dia, *db.count_distinct_tickets(primeiro_dia))
+
+
+def contar_distintos_mes(db_name):
+    """
+    Tickets distintos do mês, executada em segundo plano: acima do limite da contagem exata, a leitura
+    refaz os esboços dos dias alterados (gravação no banco), o que não pode acontecer na thread da interface.
+    """
+    erros = []
+    resultado = _distintos_mes(DatabaseManager(db_name, on_error=erros.append))
+    if erros:
+        raise erros[0]
+    return resultado
+
+
+def ler_painel(db_name):
+    """
+    Leitura completa do painel, executada em segundo plano (sem acesso à interface):
+    versão dos dados, todos os registros (resumidos, como na tabela), o resumo diário e os
+    tickets distintos do mês.
+    """
+    erros = []
+    db = DatabaseManager(db_name, on_error=erros.append)
+    resultado = {
+        "versao": db.get_data_version(),
+        "registros": db.fetch_all_records(summary=True) or [],
+        "resumo_diario": db.fetch_daily_status_counts() or [],
+        "distintos_mes": _distintos_mes(db),
+    }
+    if erros:
+        raise erros[0]
+    return resultado
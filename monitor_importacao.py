@@ -0,0 +1,193 @@
+import argparse
+import hashlib
+import json
+import logging
+import multiprocessing
+import os
+import shutil
+import sys
+import time
+from datetime import datetime
+
+from banco_dados import DatabaseManager
+from importacao import EXTENSOES_IMPORTACAO, importar_arquivos
+
+# Importação automática: monitora uma pasta e importa os arquivos que chegam do sistema parceiro.
+# Roda em um processo próprio, sem interface, e grava no mesmo tickets.db do aplicativo.
+#
+# Exemplo:
+#   python monitor_importacao.py --pasta "C:/Importacao/Entrada" --db tickets.db
+#
+# Arquivos processados vão para as subpastas 'concluidos' ou 'erros', cada um com um relatório .json.
+
+log = logging.getLogger("monitor_importacao")
+
+
+def calcular_hash(caminho, tamanho_bloco=1 << 20):
+    """Calcula o SHA-256 do conteúdo do arquivo, lendo em blocos."""
+    sha = hashlib.sha256()
+    with open(caminho, "rb") as arquivo:
+        for bloco in iter(lambda: arquivo.read(tamanho_bloco), b""):
+            sha.update(bloco)
+    return sha.hexdigest()
+
+
+class MonitorImportacao:
+    def __init__(self, pasta, db, espera=2.0, max_workers=None):
+        self.pasta = pasta
+        self.db = db
+        self.espera = espera  # Segundos sem alteração para considerar o arquivo completo
+        self.max_workers = max_workers
+        self.pasta_concluidos = os.path.join(pasta, "concluidos")
+        self.pasta_erros = os.path.join(pasta, "erros")
+        os.makedirs(self.pasta_concluidos, exist_ok=True)
+        os.makedirs(self.pasta_erros, exist_ok=True)
+        # Impressões digitais já calculadas: (caminho, tamanho, mtime) -> hash, para não reler arquivos
+        self._hashes = {}
+        # Arquivos já tratados que não puderam sair da pasta (bloqueados, sem permissão): (caminho, tamanho, mtime)
+        self._retidos = set()
+
+    def _arquivos_prontos(self):
+        """Lista os arquivos suportados da pasta que não são alterados há pelo menos 'espera' segundos."""
+        agora = time.time()
+        prontos = []
+        with os.scandir(self.pasta) as entradas:
+            for entrada in entradas:
+                if not entrada.is_file() or not entrada.name.lower().endswith(EXTENSOES_IMPORTACAO):
+                    continue
+                info = entrada.stat()
+                if agora - info.st_mtime >= self.espera:
+                    prontos.append((entrada.path, info.st_size, info.st_mtime_ns))
+        return sorted(prontos, key=lambda item: item[2])
+
+    def _impressao_digital(self, caminho, tamanho, mtime):
+        chave = (caminho, tamanho, mtime)
+        if chave not in self._hashes:
+            self._hashes[chave] = calcular_hash(caminho)
+        return self._hashes[chave]
+
+    def _finalizar(self, caminho, destino, relatorio):
+        """Move o arquivo para a pasta de destino e grava o relatório ao lado dele."""
+        nome = os.path.basename(caminho)
+        alvo = os.path.join(destino, nome)
+        if os.path.exists(alvo):
+            base, ext = nome.split(".", 1) if "." in nome else (nome, "")
+            alvo = os.path.join(destino, f"{base}_{datetime.now():%Y%m%d%H%M%S}{'.' + ext if ext else ''}")
+        # Registrado antes de mover: se o arquivo ficar na pasta, as próximas varreduras o ignoram até que ele
+        # seja alterado, em vez de importá-lo ou rejeitá-lo de novo a cada ciclo
+        chaves = {chave for chave in self._hashes if chave[0] == caminho}
+        self._retidos |= chaves
+        try:
+            shutil.move(caminho, alvo)
+            self._retidos -= chaves
+        except OSError as e:
+            log.error("Não foi possível mover %s: %s (ignorado até ser alterado)", nome, e)
+            alvo = caminho
+        relatorio["arquivo_final"] = alvo
+        with open(alvo + ".relatorio.json", "w", encoding="utf-8") as arquivo:
+            json.dump(relatorio, arquivo, ensure_ascii=False, indent=2)
+        self._hashes = {k: v for k, v in self._hashes.items() if k[0] != caminho}
+
+    def processar_pendentes(self):
+        """Importa os arquivos prontos da pasta. Retorna a quantidade de arquivos tratados."""
+        prontos = self._arquivos_prontos()
+        # Os retidos que foram alterados ou removidos deixam de constar (a nova versão é tratada normalmente)
+        self._retidos &= set(prontos)
+        prontos = [item for item in prontos if item not in self._retidos]
+        if not prontos:
+            return 0
+
+        digitais = {}
+        for caminho, tamanho, mtime in prontos:
+            try:
+                digitais[caminho] = (self._impressao_digital(caminho, tamanho, mtime), tamanho, mtime)
+            except OSError as e:
+                # Arquivo ainda bloqueado pelo processo que o está copiando; tenta na próxima varredura
+                log.warning("Arquivo indisponível %s: %s", os.path.basename(caminho), e)
+
+        # Consulta em lote das impressões digitais já importadas
+        ja_importados = self.db.fetch_imported_hashes({d[0] for d in digitais.values()})
+        novos, vistos = [], set()
+        for caminho, (hash_conteudo, tamanho, mtime) in digitais.items():
+            if hash_conteudo in ja_importados or hash_conteudo in vistos:
+                log.info("Ignorado (conteúdo já importado): %s", os.path.basename(caminho))
+                self._finalizar(caminho, self.pasta_concluidos, {
+                    "arquivo": os.path.basename(caminho), "hash_conteudo": hash_conteudo,
+                    "situacao": "ignorado", "motivo": "conteúdo já importado anteriormente",
+                    "processado_em": datetime.now().isoformat(timespec="seconds"),
+                })
+                continue
+            vistos.add(hash_conteudo)
+            novos.append(caminho)
+
+        def ao_progresso(resultado):
+            caminho = resultado["arquivo"]
+            hash_conteudo, tamanho, mtime = digitais[caminho]
+            relatorio = {
+                "arquivo": os.path.basename(caminho),
+                "hash_conteudo": hash_conteudo,
+                "tamanho": tamanho,
+                "modificado_em": datetime.fromtimestamp(mtime / 1e9).isoformat(timespec="seconds"),
+                "processado_em": datetime.now().isoformat(timespec="seconds"),
+                "registros_importados": resultado["importados"],
+                "registros_duplicados": resultado["duplicados"],
+                "linhas_rejeitadas": [{"linha": linha, "motivo": motivo} for linha, motivo in resultado["erros"]],
+            }
+            if resultado["erro"]:
+                relatorio.update(situacao="erro", motivo=resultado["erro"])
+                log.error("Falha ao importar %s: %s", relatorio["arquivo"], resultado["erro"])
+                self._finalizar(caminho, self.pasta_erros, relatorio)
+                return
+            self.db.register_imported_file(hash_conteudo, relatorio["arquivo"], tamanho, mtime,
+                                           resultado["importados"], len(resultado["erros"]))
+            relatorio["situacao"] = "importado"
+            log.info("Importado %s: %d registro(s), %d duplicado(s), %d linha(s) rejeitada(s)",
+                     relatorio["arquivo"], resultado["importados"], resultado["duplicados"], len(resultado["erros"]))
+            self._finalizar(caminho, self.pasta_concluidos, relatorio)
+
+        if novos:
+            importar_arquivos(novos, self.db, ao_progresso=ao_progresso, max_workers=self.max_workers)
+        return len(digitais)
+
+    def executar(self, intervalo=5.0):
+        """Varre a pasta continuamente até ser interrompido (Ctrl+C)."""
+        log.info("Monitorando %s (intervalo de %.0fs)", self.pasta, intervalo)
+        while True:
+            try:
+                self.processar_pendentes()
+            except Exception:
+                log.exception("Erro inesperado ao processar a pasta monitorada")
+            time.sleep(intervalo)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Importa automaticamente os arquivos que chegam em uma pasta.")
+    parser.add_argument("--pasta", required=True, help="Pasta monitorada.")
+    parser.add_argument("--db", default="tickets.db", help="Caminho do banco SQLite (padrão: tickets.db).")
+    parser.add_argument("--intervalo", type=float, default=5.0, help="Segundos entre as varreduras (padrão: 5).")
+    parser.add_argument("--espera", type=float, default=2.0,
+                        help="Segundos sem alteração para considerar um arquivo completo (padrão: 2).")
+    parser.add_argument("--workers", type=int, help="Processos de leitura em paralelo (padrão: núcleos disponíveis).")
+    parser.add_argument("--uma-vez", action="store_true", help="Processa os arquivos presentes e encerra.")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    if not os.path.isdir(args.pasta):
+        log.error("Pasta não encontrada: %s", args.pasta)
+        return 2
+
+    db = DatabaseManager(args.db, on_error=lambda e: log.error("Erro de banco de dados: %s", e))
+    monitor = MonitorImportacao(args.pasta, db, espera=args.espera, max_workers=args.workers)
+    try:
+        if args.uma_vez:
+            monitor.processar_pendentes()
+        else:
+            monitor.executar(args.intervalo)
+    except KeyboardInterrupt:
+        log.info("Monitor encerrado.")
+    return 0
+
+
+if __name__ == "__main__":
+    multiprocessing.freeze_support()
+    sys.exit(main())
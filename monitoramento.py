@@ -0,0 +1,286 @@
+import bisect
+import functools
+import hashlib
+import json
+import logging
+import os
+import re
+import sys
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from logging.handlers import RotatingFileHandler
+
+# Monitoramento das consultas do DatabaseManager: tempo, linhas e impressão digital de cada comando
+# (o SQL com os valores literais trocados por '?'), agrupados por comando e por método público.
+# Cada grupo guarda um histograma das últimas JANELA_HISTOGRAMA chamadas; os comandos acima do limite
+# vão para o log de consultas lentas (JSON por linha) com o EXPLAIN QUERY PLAN.
+#
+# Ligado por padrão (o custo é de alguns microssegundos por chamada). Variáveis de ambiente:
+#   TICKETS_MONITORAMENTO=0          desliga
+#   TICKETS_CONSULTA_LENTA_MS=250    limite das consultas lentas, em milissegundos
+#   TICKETS_LOG_CONSULTAS=arquivo    log de consultas lentas (padrão: consultas_lentas.log ao lado do banco)
+# Ou no código: DatabaseManager(..., monitor=MonitorConsultas(limite_lento_ms=100)).
+
+LIMITE_LENTO_MS = 250.0
+JANELA_HISTOGRAMA = 1000
+CONSULTAS_LENTAS_RECENTES = 100
+NOME_LOG = "consultas_lentas.log"
+TAMANHO_LOG = 5 * 1024 * 1024
+
+# Limites superiores das faixas do histograma, em milissegundos (a última faixa é "acima de 10 s")
+FAIXAS_MS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+_LITERAL_TEXTO = re.compile(r"'(?:[^']|'')*'")
+_LITERAL_NUMERO = re.compile(r"(?<![\w.])-?\d+(?:\.\d+)?\b")
+_LISTA_PARAMETROS = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_ESPACOS = re.compile(r"\s+")
+_COMANDOS_COM_PLANO = ("SELECT", "WITH", "INSERT", "UPDATE", "DELETE", "REPLACE")
+
+log = logging.getLogger("consultas_lentas")
+
+
+@functools.lru_cache(maxsize=2048)
+def impressao_digital(sql):
+    """
+    Forma normalizada do comando: valores literais viram '?', listas de parâmetros viram '(...)' e os
+    espaços são unificados. Comandos que diferem só nos valores (ou na quantidade de itens do IN) se agrupam.
+    """
+    texto = _LITERAL_TEXTO.sub("?", sql)
+    texto = _LITERAL_NUMERO.sub("?", texto)
+    texto = _LISTA_PARAMETROS.sub("(...)", texto)
+    return _ESPACOS.sub(" ", texto).strip()
+
+
+def codigo_impressao(impressao):
+    """Identificador curto da impressão digital, para procurar no log."""
+    return hashlib.blake2b(impressao.encode("utf-8"), digest_size=6).hexdigest()
+
+
+class Histograma:
+    """Contagem das últimas 'janela' durações por faixa de tempo, além dos totais desde o início."""
+
+    def __init__(self, janela=JANELA_HISTOGRAMA):
+        self.faixas = [0] * (len(FAIXAS_MS) + 1)
+        self.recentes = deque(maxlen=janela)
+        self.chamadas = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.linhas = 0
+
+    def adicionar(self, ms, linhas):
+        if len(self.recentes) == self.recentes.maxlen:
+            self.faixas[self.recentes[0]] -= 1
+        faixa = bisect.bisect_left(FAIXAS_MS, ms)
+        self.recentes.append(faixa)
+        self.faixas[faixa] += 1
+        self.chamadas += 1
+        self.total_ms += ms
+        self.max_ms = max(self.max_ms, ms)
+        self.linhas += linhas or 0
+
+    def percentil(self, fracao):
+        """Limite superior da faixa que contém o percentil (estimativa pelo histograma da janela)."""
+        alvo = fracao * len(self.recentes)
+        acumulado = 0
+        for faixa, quantidade in enumerate(self.faixas):
+            acumulado += quantidade
+            if quantidade and acumulado >= alvo:
+                return FAIXAS_MS[faixa] if faixa < len(FAIXAS_MS) else float("inf")
+        return 0.0
+
+    def resumo(self):
+        return {
+            "chamadas": self.chamadas,
+            "total_ms": round(self.total_ms, 3),
+            "media_ms": round(self.total_ms / self.chamadas, 3) if self.chamadas else 0.0,
+            "max_ms": round(self.max_ms, 3),
+            "p50_ms": self.percentil(0.5),
+            "p95_ms": self.percentil(0.95),
+            "linhas": self.linhas,
+            "histograma": {f"<={limite}": quantidade for limite, quantidade in zip(FAIXAS_MS, self.faixas)} |
+                          {f">{FAIXAS_MS[-1]}": self.faixas[-1]},
+        }
+
+
+class MonitorConsultas:
+    """Estatísticas por comando e por método do DatabaseManager; seguro para uso em várias threads."""
+
+    def __init__(self, limite_lento_ms=LIMITE_LENTO_MS, caminho_log=None, janela=JANELA_HISTOGRAMA):
+        self.limite_lento_ms = limite_lento_ms
+        self.caminho_log = caminho_log
+        self.janela = janela
+        self.consultas = {}
+        self.metodos = {}
+        self.lentas = deque(maxlen=CONSULTAS_LENTAS_RECENTES)
+        self._trava = threading.Lock()
+        self._local = threading.local()
+        self._arquivos_log = set()
+
+    # Método público em execução na thread atual, para atribuir a ele os comandos executados
+    def entrar(self, metodo):
+        anterior = getattr(self._local, "metodo", None)
+        self._local.metodo = metodo
+        return anterior
+
+    def sair(self, metodo, anterior, segundos, resultado):
+        self._local.metodo = anterior
+        linhas = len(resultado) if isinstance(resultado, list) else None
+        with self._trava:
+            histograma = self.metodos.get(metodo)
+            if histograma is None:
+                histograma = self.metodos[metodo] = Histograma(self.janela)
+            histograma.adicionar(segundos * 1000, linhas)
+
+    def registrar(self, db_name, sql, params, segundos, linhas, conn=None):
+        """Registra a execução de um comando; acima do limite, grava no log com o plano da consulta."""
+        impressao = impressao_digital(sql)
+        ms = segundos * 1000
+        with self._trava:
+            histograma = self.consultas.get(impressao)
+            if histograma is None:
+                histograma = self.consultas[impressao] = Histograma(self.janela)
+            histograma.adicionar(ms, linhas)
+        if ms >= self.limite_lento_ms:
+            self._registrar_lenta(db_name, sql, impressao, params, ms, linhas, conn)
+
+    def _registrar_lenta(self, db_name, sql, impressao, params, ms, linhas, conn):
+        plano = None
+        if conn is not None and params is not None and sql.lstrip().upper().startswith(_COMANDOS_COM_PLANO):
+            try:
+                plano = [linha[3] for linha in conn.execute(f"EXPLAIN QUERY PLAN {sql}", params)]
+            except Exception:
+                plano = None  # O plano é informativo; não interfere no comando já executado
+        entrada = {
+            "quando": datetime.now().isoformat(timespec="milliseconds"),
+            "banco": os.path.basename(db_name),
+            "metodo": getattr(self._local, "metodo", None),
+            "codigo": codigo_impressao(impressao),
+            "impressao": impressao,
+            "ms": round(ms, 3),
+            "linhas": linhas,
+            "plano": plano,
+        }
+        with self._trava:
+            self.lentas.append(entrada)
+        self._configurar_log(db_name)
+        log.info(json.dumps(entrada, ensure_ascii=False))
+
+    def _configurar_log(self, db_name):
+        caminho = self.caminho_log or os.path.join(os.path.dirname(os.path.abspath(db_name)), NOME_LOG)
+        if caminho in self._arquivos_log:
+            return
+        with self._trava:
+            if caminho in self._arquivos_log:
+                return
+            self._arquivos_log.add(caminho)
+            try:
+                handler = RotatingFileHandler(caminho, maxBytes=TAMANHO_LOG, backupCount=1, encoding="utf-8", delay=True)
+            except OSError:
+                return  # Pasta sem permissão de escrita: as lentas continuam disponíveis em memória
+            handler.setFormatter(logging.Formatter("%(message)s"))
+            log.addHandler(handler)
+            log.setLevel(logging.INFO)
+            log.propagate = False
+
+    def resumo(self):
+        """Estatísticas atuais: {'consultas': [...], 'metodos': [...]}, cada lista do maior para o menor tempo total."""
+        with self._trava:
+            consultas = [{"impressao": impressao, "codigo": codigo_impressao(impressao), **h.resumo()}
+                         for impressao, h in self.consultas.items()]
+            metodos = [{"metodo": metodo, **h.resumo()} for metodo, h in self.metodos.items()]
+        return {
+            "consultas": sorted(consultas, key=lambda c: c["total_ms"], reverse=True),
+            "metodos": sorted(metodos, key=lambda m: m["total_ms"], reverse=True),
+        }
+
+    def consultas_lentas(self):
+        """As consultas lentas mais recentes, da mais nova para a mais antiga."""
+        with self._trava:
+            return list(reversed(self.lentas))
+
+    def limpar(self):
+        with self._trava:
+            self.consultas.clear()
+            self.metodos.clear()
+            self.lentas.clear()
+
+
+def memoria_processo():
+    """Memória do próprio processo: (RSS atual, pico de RSS) em KB; None no que o sistema não informar."""
+    if sys.platform == "win32":
+        import ctypes
+        from ctypes import wintypes
+
+        class ContadoresMemoria(ctypes.Structure):
+            _fields_ = [("cb", wintypes.DWORD), ("PageFaultCount", wintypes.DWORD),
+                        ("PeakWorkingSetSize", ctypes.c_size_t), ("WorkingSetSize", ctypes.c_size_t),
+                        ("QuotaPeakPagedPoolUsage", ctypes.c_size_t), ("QuotaPagedPoolUsage", ctypes.c_size_t),
+                        ("QuotaPeakNonPagedPoolUsage", ctypes.c_size_t), ("QuotaNonPagedPoolUsage", ctypes.c_size_t),
+                        ("PagefileUsage", ctypes.c_size_t), ("PeakPagefileUsage", ctypes.c_size_t)]
+
+        contadores = ContadoresMemoria()
+        contadores.cb = ctypes.sizeof(contadores)
+        processo = ctypes.windll.kernel32.GetCurrentProcess
+        processo.restype = wintypes.HANDLE
+        if ctypes.windll.psapi.GetProcessMemoryInfo(wintypes.HANDLE(processo()), ctypes.byref(contadores), contadores.cb):
+            return contadores.WorkingSetSize // 1024, contadores.PeakWorkingSetSize // 1024
+        return None, None
+    try:
+        valores = {}
+        with open("/proc/self/status", encoding="ascii") as arquivo:
+            for linha in arquivo:
+                if linha.startswith(("VmRSS:", "VmHWM:")):
+                    nome, valor = linha.split(":", 1)
+                    valores[nome] = int(valor.split()[0])
+        return valores.get("VmRSS"), valores.get("VmHWM")
+    except OSError:
+        import resource
+        pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return None, pico // 1024 if sys.platform == "darwin" else pico  # macOS informa em bytes
+
+
+_monitor_padrao = None
+_trava_padrao = threading.Lock()
+
+
+def obter_monitor():
+    """Monitor compartilhado pelo processo, configurado pelas variáveis de ambiente; None se desligado."""
+    global _monitor_padrao
+    if os.environ.get("TICKETS_MONITORAMENTO", "1").strip().lower() in ("0", "false", "nao", "não", "off"):
+        return None
+    with _trava_padrao:
+        if _monitor_padrao is None:
+            try:
+                limite = float(os.environ.get("TICKETS_CONSULTA_LENTA_MS", LIMITE_LENTO_MS))
+            except ValueError:
+                limite = LIMITE_LENTO_MS
+            _monitor_padrao = MonitorConsultas(limite, os.environ.get("TICKETS_LOG_CONSULTAS") or None)
+        return _monitor_padrao
+
+
+def monitorado(classe, ignorar=("conectar",)):
+    """Decorador de classe: mede cada método público (tempo e linhas devolvidas) no monitor da instância."""
+    for nome, metodo in list(vars(classe).items()):
+        if nome.startswith("_") or nome in ignorar or not callable(metodo):
+            continue
+        setattr(classe, nome, _medir_metodo(nome, metodo))
+    return classe
+
+
+def _medir_metodo(nome, metodo):
+    @functools.wraps(metodo)
+    def medido(self, *args, **kwargs):
+        monitor = self.monitor
+        if monitor is None:
+            return metodo(self, *args, **kwargs)
+        anterior = monitor.entrar(nome)
+        inicio = time.perf_counter()
+        resultado = None
+        try:
+            resultado = metodo(self, *args, **kwargs)
+            return resultado
+        finally:
+            monitor.sair(nome, anterior, time.perf_counter() - inicio, resultado)
+    return medido
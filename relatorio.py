@@ -0,0 +1,235 @@
+import argparse
+import multiprocessing
+import os
+import sqlite3
+import sys
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.backends.backend_pdf import PdfPages
+from matplotlib.figure import Figure
+
+from analise import (STATUS_ESPERA, agregados_barras, dia_de, formatar_duracao, indicadores_intervalo,
+                     resumo_para_arrays)
+from banco_dados import dia_sql
+from graficos import desenhar_barras
+from indicadores_tickets import ler_resumo_diario
+
+# Relatório mensal em PDF (várias páginas) e PNG (uma imagem por página), sem interface gráfica:
+# balões do mês, gráficos por status/mês/ano e tabelas com os maiores volumes.
+# Os números vêm do resumo diário pré-calculado e de consultas pelos índices, sem percorrer a tabela.
+#
+# Exemplos:
+#   python relatorio.py --db tickets.db --saida relatorios
+#   python relatorio.py --mes 07/2025 --formato pdf --top 15
+
+FORMATOS_RELATORIO = ("pdf", "png")
+TAMANHO_PAGINA = (11.69, 8.27)  # A4 paisagem, em polegadas
+DPI_PNG = 120
+MESES_RELATORIO = 24  # Meses exibidos no gráfico mensal, terminando no mês do relatório
+
+
+def _mes(texto):
+    try:
+        return datetime.strptime(texto, "%m/%Y").date()
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Mês inválido: '{texto}'. Use MM/AAAA.")
+
+
+def mes_anterior(hoje=None):
+    """Primeiro dia do mês anterior ao de 'hoje'."""
+    hoje = hoje or date.today()
+    return (hoje.replace(day=1) - timedelta(days=1)).replace(day=1)
+
+
+def _limites_mes(mes):
+    ultimo = (mes.replace(day=28) + timedelta(days=4)).replace(day=1) - timedelta(days=1)
+    return dia_de(mes), dia_de(ultimo)
+
+
+def _tabela_existe(conn, nome):
+    return conn.execute("SELECT 1 FROM sqlite_master WHERE type='table' AND name=?", (nome,)).fetchone() is not None
+
+
+def coletar_dados(conn, mes, top=10):
+    """Lê do banco (somente leitura) tudo o que o relatório do mês precisa."""
+    primeiro, ultimo = _limites_mes(mes)
+    dia = dia_sql()
+    linhas = ler_resumo_diario(conn)
+    dias, status, totais, nomes = resumo_para_arrays(linhas)
+    dados = {
+        "mes": mes.strftime("%m/%Y"),
+        "agregados": agregados_barras(linhas),
+        "mes_atual": indicadores_intervalo(dias, status, nomes, primeiro, ultimo, totais),
+        "total_geral": int(totais.sum()),
+        "distintos": conn.execute(f"SELECT COUNT(DISTINCT TRIM(numero_ticket)) FROM registros WHERE {dia} BETWEEN ? AND ?",
+                                  (primeiro, ultimo)).fetchone()[0],
+        "top_tickets": conn.execute(
+            f"SELECT TRIM(numero_ticket), COUNT(*) FROM registros WHERE {dia} BETWEEN ? AND ? "
+            "GROUP BY 1 ORDER BY 2 DESC, 1 LIMIT ?", (primeiro, ultimo, top)).fetchall(),
+        "top_descricoes": conn.execute(
+            f"SELECT descricao, COUNT(*) FROM registros WHERE {dia} BETWEEN ? AND ? "
+            "GROUP BY 1 ORDER BY 2 DESC, 1 LIMIT ?", (primeiro, ultimo, top)).fetchall(),
+        "parados": [],
+    }
+    if _tabela_existe(conn, "status_atual"):
+        dados["parados"] = conn.execute(
+            "SELECT r.numero_ticket, s.status, s.desde FROM status_atual AS s JOIN registros AS r ON r.id = s.registro_id "
+            f"WHERE s.status IN ({', '.join('?' * len(STATUS_ESPERA))}) ORDER BY s.desde LIMIT ?",
+            (*STATUS_ESPERA, top)).fetchall()
+    rotulos, valores, _ = dados["agregados"]["Mês"]
+    anteriores = [i for i, rotulo in enumerate(rotulos) if datetime.strptime(rotulo, "%m/%Y").date() <= mes]
+    inicio = anteriores[-MESES_RELATORIO] if len(anteriores) >= MESES_RELATORIO else 0
+    fim = anteriores[-1] + 1 if anteriores else 0
+    dados["agregados"]["Mês"] = (rotulos[inicio:fim], valores[inicio:fim],
+                                 f"Tickets por Mês (últimos {MESES_RELATORIO} meses)")
+    return dados
+
+
+def _nova_pagina(titulo):
+    figura = Figure(figsize=TAMANHO_PAGINA)
+    FigureCanvasAgg(figura)
+    figura.suptitle(titulo, fontsize=16)
+    return figura
+
+
+def _pagina_resumo(dados):
+    figura = _nova_pagina(f"Resumo de Tickets - {dados['mes']}")
+    mes = dados["mes_atual"]
+    cartoes = [
+        ("Registros no Mês", mes["total"], "#4a90e2"),
+        ("Tratados no Mês", mes["tratados"], "#5cb85c"),
+        ("Tickets Distintos no Mês", dados["distintos"], "#f0ad4e"),
+        ("Total Geral de Registros", dados["total_geral"], "#9b59b6"),
+    ]
+    for i, (rotulo, valor, cor) in enumerate(cartoes):
+        x = 0.14 + i * 0.24
+        figura.text(x, 0.80, str(valor), ha="center", va="center", fontsize=24, fontweight="bold", color="white",
+                    bbox={"boxstyle": "round,pad=0.6", "facecolor": cor, "edgecolor": cor})
+        figura.text(x, 0.70, rotulo, ha="center", va="center", fontsize=11)
+
+    ax = figura.add_axes((0.08, 0.2, 0.88, 0.4))
+    rotulos = list(mes["por_status"])
+    desenhar_barras(ax, {}, "Status", rotulos, [mes["por_status"][r] for r in rotulos],
+                    f"Registros por Status em {dados['mes']}")
+    return "resumo", figura
+
+
+def _pagina_barras(dados, periodo, nome):
+    figura = _nova_pagina(f"Tickets - {dados['mes']}")
+    ax = figura.add_axes((0.07, 0.22, 0.9, 0.66))
+    rotulos, valores, titulo = dados["agregados"][periodo]
+    desenhar_barras(ax, {}, periodo, rotulos, valores, titulo)
+    return nome, figura
+
+
+def _tabela(ax, titulo, colunas, larguras, linhas):
+    ax.axis("off")
+    ax.set_title(titulo, fontsize=12, loc="left")
+    if not linhas:
+        ax.text(0, 0.9, "Sem dados no período.", fontsize=10, transform=ax.transAxes)
+        return
+    tabela = ax.table(cellText=linhas, colLabels=colunas, colWidths=larguras, loc="upper left", cellLoc="left", colLoc="left")
+    tabela.auto_set_font_size(False)
+    tabela.set_fontsize(9)
+    tabela.scale(1, 1.3)
+
+
+def _pagina_tabelas(dados):
+    figura = _nova_pagina(f"Maiores Volumes - {dados['mes']}")
+    eixos = figura.subplots(1, 3, gridspec_kw={"width_ratios": (1, 2.2, 1.6), "left": 0.03, "right": 0.98,
+                                                "top": 0.88, "bottom": 0.05, "wspace": 0.08})
+    _tabela(eixos[0], "Tickets com mais registros", ("Nº Ticket", "Registros"), (0.6, 0.4),
+            dados["top_tickets"])
+    _tabela(eixos[1], "Descrições mais frequentes", ("Descrição", "Registros"), (0.8, 0.2),
+            [(descricao if len(descricao) <= 60 else descricao[:57] + "...", total)
+             for descricao, total in dados["top_descricoes"]])
+    agora = datetime.now().timestamp()
+    _tabela(eixos[2], "Parados há mais tempo", ("Nº Ticket", "Status", "Tempo"), (0.3, 0.45, 0.25),
+            [(numero, status, formatar_duracao(agora - desde)) for numero, status, desde in dados["parados"]])
+    return "tabelas", figura
+
+
+def gerar_relatorio(db_name, pasta, mes=None, formatos=FORMATOS_RELATORIO, top=10, ao_progresso=None):
+    """
+    Gera o relatório do mês (padrão: mês anterior) na pasta informada.
+    'ao_progresso(etapa, total, descricao)' é chamado a cada etapa. Retorna a lista de arquivos gerados.
+    """
+    mes = mes or mes_anterior()
+    etapas = ["Lendo o banco de dados", "Resumo", "Por status", "Por mês", "Por ano", "Tabelas", "Gravando"]
+
+    def progresso(indice):
+        if ao_progresso:
+            ao_progresso(indice, len(etapas), etapas[indice])
+
+    progresso(0)
+    conn = sqlite3.connect(Path(db_name).resolve().as_uri() + "?mode=ro", uri=True)
+    try:
+        dados = coletar_dados(conn, mes, top)
+    finally:
+        conn.close()
+
+    paginas = []
+    construtores = [
+        lambda: _pagina_resumo(dados),
+        lambda: _pagina_barras(dados, "Total", "status"),
+        lambda: _pagina_barras(dados, "Mês", "meses"),
+        lambda: _pagina_barras(dados, "Ano", "anos"),
+        lambda: _pagina_tabelas(dados),
+    ]
+    for indice, construtor in enumerate(construtores, start=1):
+        progresso(indice)
+        paginas.append(construtor())
+
+    progresso(len(etapas) - 1)
+    os.makedirs(pasta, exist_ok=True)
+    base = os.path.join(pasta, f"relatorio_{mes:%Y-%m}")
+    arquivos = []
+    if "pdf" in formatos:
+        with PdfPages(base + ".pdf") as pdf:
+            for _, figura in paginas:
+                pdf.savefig(figura)
+        arquivos.append(base + ".pdf")
+    if "png" in formatos:
+        for numero, (nome, figura) in enumerate(paginas, start=1):
+            arquivo = f"{base}_{numero:02d}_{nome}.png"
+            figura.savefig(arquivo, dpi=DPI_PNG)
+            arquivos.append(arquivo)
+    return arquivos
+
+
+def gerar_relatorio_processo(db_name, pasta, mes, formatos, top, fila):
+    """Versão para o processo de trabalho do aplicativo: o progresso é enviado pela fila."""
+    return gerar_relatorio(db_name, pasta, mes, formatos, top,
+                           ao_progresso=lambda etapa, total, descricao: fila.put((etapa, total, descricao)))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Gera o relatório mensal de tickets em PDF e/ou PNG.")
+    parser.add_argument("--db", default="tickets.db", help="Caminho do banco SQLite (padrão: tickets.db).")
+    parser.add_argument("--saida", default="relatorios", help="Pasta de saída (padrão: relatorios).")
+    parser.add_argument("--mes", type=_mes, help="Mês do relatório, MM/AAAA (padrão: mês anterior).")
+    parser.add_argument("--formato", action="append", choices=FORMATOS_RELATORIO,
+                        help="Formato de saída (pode ser repetido; padrão: pdf e png).")
+    parser.add_argument("--top", type=int, default=10, help="Linhas das tabelas de maiores volumes (padrão: 10).")
+    args = parser.parse_args(argv)
+
+    if not os.path.exists(args.db):
+        print(f"Banco de dados não encontrado: {args.db}", file=sys.stderr)
+        return 2
+    try:
+        arquivos = gerar_relatorio(args.db, args.saida, args.mes, args.formato or FORMATOS_RELATORIO, max(args.top, 1),
+                                   ao_progresso=lambda etapa, total, descricao: print(f"[{etapa + 1}/{total}] {descricao}",
+                                                                                       file=sys.stderr))
+    except (sqlite3.Error, OSError) as e:
+        print(f"Erro ao gerar o relatório: {e}", file=sys.stderr)
+        return 1
+    for arquivo in arquivos:
+        print(arquivo)
+    return 0
+
+
+if __name__ == "__main__":
+    multiprocessing.freeze_support()
+    sys.exit(main())
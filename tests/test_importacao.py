@@ -0,0 +1,31 @@
+import pandas as pd
+
+from importacao import validar_registros
+
+# Validação dos arquivos importados (importacao.validar_registros): as linhas com data inválida são rejeitadas
+# uma a uma, qualquer que seja o tipo da coluna de data (texto, datas do Excel ou números seriais).
+
+
+def _tabela(datas):
+    return pd.DataFrame({"data": datas, "numero_ticket": [str(460600 + i) for i in range(len(datas))],
+                         "descricao": "Validado"})
+
+
+def test_datas_seriais_do_excel():
+    # read_excel devolve números quando a célula de data não está formatada como data
+    registros, erros = validar_registros(_tabela([45000, 45292.0]))
+    assert [registro[0] for registro in registros] == ["15/03/2023", "01/01/2024"]
+    assert erros == []
+
+
+def test_datas_seriais_invalidas_rejeitam_so_a_linha():
+    registros, erros = validar_registros(_tabela([45000, -5, 1e12]))
+    assert [registro[0] for registro in registros] == ["15/03/2023"]
+    assert erros == [(3, "data inválida"), (4, "data inválida")]
+
+
+def test_coluna_de_data_com_tipos_misturados():
+    datas = ["05/03/2024", "2024-03-06", 45000, pd.Timestamp("2024-03-07"), "sem data", None]
+    registros, erros = validar_registros(_tabela(datas))
+    assert [registro[0] for registro in registros] == ["05/03/2024", "06/03/2024", "15/03/2023", "07/03/2024"]
+    assert erros == [(6, "data inválida"), (7, "data inválida")]
@@ -0,0 +1,53 @@
+import os
+
+import monitor_importacao
+from banco_dados import DatabaseManager
+from monitor_importacao import MonitorImportacao
+
+# Monitor de importação (monitor_importacao.py): um arquivo que não pode ser movido para 'concluidos' ou 'erros'
+# não é importado nem rejeitado de novo a cada varredura.
+
+
+def _monitor(tmp_path):
+    pasta = tmp_path / "entrada"
+    pasta.mkdir()
+    erros = []
+    db = DatabaseManager(str(tmp_path / "tickets.db"), on_error=erros.append)
+    return pasta, db, erros, MonitorImportacao(str(pasta), db, espera=0, max_workers=1)
+
+
+def _falhar_ao_mover(monkeypatch):
+    def mover(origem, destino):
+        raise PermissionError("arquivo bloqueado")
+    monkeypatch.setattr(monitor_importacao.shutil, "move", mover)
+
+
+def test_arquivo_que_nao_sai_da_pasta_nao_e_reimportado(tmp_path, monkeypatch):
+    pasta, db, erros, monitor = _monitor(tmp_path)
+    (pasta / "lote.csv").write_text("data,numero_ticket,descricao\n01/02/2024,460601,Validado\n", encoding="utf-8")
+    _falhar_ao_mover(monkeypatch)
+
+    assert monitor.processar_pendentes() == 1
+    assert monitor.processar_pendentes() == 0
+    assert len(db.fetch_all_records()) == 1
+    assert os.path.exists(pasta / "lote.csv.relatorio.json")
+    assert not erros
+
+
+def test_arquivo_com_erro_que_nao_sai_da_pasta_volta_ao_ser_alterado(tmp_path, monkeypatch):
+    pasta, db, erros, monitor = _monitor(tmp_path)
+    arquivo = pasta / "lote.csv"
+    arquivo.write_text("numero_ticket,descricao\n460601,Validado\n", encoding="utf-8")
+    _falhar_ao_mover(monkeypatch)
+
+    assert monitor.processar_pendentes() == 1
+    assert monitor.processar_pendentes() == 0
+
+    # Corrigido no lugar: conteúdo novo, tratado na varredura seguinte
+    arquivo.write_text("data,numero_ticket,descricao\n01/02/2024,460601,Validado\n", encoding="utf-8")
+    os.utime(arquivo, ns=(0, 10 ** 18))
+    monkeypatch.undo()
+    assert monitor.processar_pendentes() == 1
+    assert len(db.fetch_all_records()) == 1
+    assert os.path.exists(pasta / "concluidos" / "lote.csv")
+    assert not erros
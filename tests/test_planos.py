@@ -0,0 +1,35 @@
+import io
+
+import pytest
+
+from benchmarks.gerador import gerar_banco
+from benchmarks.planos import imprimir, verificar
+
+# Planos das consultas do DatabaseManager (benchmarks/planos.py): uma varredura sem índice ou uma ordenação
+# temporária reintroduzida em um caminho quente, ou um método público sem cenário ou sem regra, falha o teste.
+
+LINHAS = 3000
+
+
+@pytest.fixture(scope="module")
+def resultado(tmp_path_factory):
+    banco = str(tmp_path_factory.mktemp("planos") / "planos.db")
+    gerar_banco(banco, LINHAS, 0)
+    return verificar(banco)
+
+
+def _relatorio(resultado):
+    saida = io.StringIO()
+    imprimir(*resultado, arquivo=saida)
+    return saida.getvalue()
+
+
+def test_planos_sem_violacoes(resultado):
+    verificacoes, _, _ = resultado
+    assert verificacoes
+    assert not any(item["violacoes"] for item in verificacoes), _relatorio(resultado)
+
+
+def test_todos_os_metodos_tem_cenario_e_regra(resultado):
+    _, sem_cenario, sem_regra = resultado
+    assert not sem_cenario and not sem_regra, _relatorio(resultado)